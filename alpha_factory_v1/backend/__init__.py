@@ -5,43 +5,173 @@ Minimal ASGI entry‑point that works *with or without* FastAPI.
 
 Routes
 ------
-/api/logs   → JSON list with the last 100 log lines.
+/api/logs   → JSON list with the last 100 log lines (``?limit=``, paging
+              via ``?before=`` / ``?after=`` cursors, see below).
+/api/logs/stream → Server‑Sent Events following the log from a cursor.
 /api/csrf   → One‑time CSRF token (WebSocket handshake).
 /ws/trace   → Live trace WebSocket (only when FastAPI is present).
 /metrics    → Prometheus metrics (when FastAPI **and** prometheus‑client are present).
+
+Log cursors
+-----------
+A cursor is ``"<log file name>:<byte offset>"``.  ``/api/logs`` answers
+with ``X-Log-Cursor`` (start of the oldest line returned → pass as
+``before`` for the previous page) and ``X-Log-End`` (just past the newest
+line → pass as ``after`` or to the stream).  Pages are read by seeking
+from the cursor, so a request costs O(lines returned), not O(file).  The
+stream sends each line as an SSE event whose ``id`` is the cursor after
+it; browsers resume from it (``Last-Event-ID``) on reconnect.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
+import os
 import secrets                         # ← NEW
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from .tail import forward_lines, reverse_lines
 
 # ────────────────────────── log helpers ────────────────────────────────────
 LOG_DIR = Path("/tmp/alphafactory")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-def _read_logs(max_lines: int = 100) -> List[str]:
+LOG_PAGE_MAX = 1000
+LOG_POLL_SEC = float(os.getenv("AF_LOG_POLL_SEC", "0.5"))
+LOG_HEARTBEAT_SEC = 15.0
+
+
+def _latest_log() -> Optional[Path]:
     log_files = sorted(LOG_DIR.glob("*.log"))
-    if not log_files:
-        return []
-    return log_files[-1].read_text(errors="replace").splitlines()[-max_lines:]
+    return log_files[-1] if log_files else None
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[Path, int]]:
+    """``"name:offset"`` → (path, offset); only files inside LOG_DIR."""
+    if not cursor:
+        return None
+    name, _, offset = cursor.rpartition(":")
+    path = LOG_DIR / name
+    if not name or "/" in name or path.suffix != ".log" or not offset.isdigit() or not path.is_file():
+        return None
+    return path, int(offset)
+
+
+def _log_page(
+    limit: int = 100, before: Optional[str] = None, after: Optional[str] = None
+) -> Tuple[List[str], Dict[str, str]]:
+    """One page of log lines plus the ``X-Log-Cursor`` / ``X-Log-End`` headers."""
+    limit = max(0, min(limit, LOG_PAGE_MAX))
+    forward = _parse_cursor(after)  # a bad ``after`` must not turn ``before`` into a forward page
+    anchor = forward or _parse_cursor(before)
+    path = anchor[0] if anchor else _latest_log()
+    if path is None:
+        return [], {}
+    with open(path, "rb") as fh:
+        if forward:
+            lines, end = forward_lines(fh, forward[1], limit)
+            start = lines[0][0] if lines else end
+        else:
+            lines = []
+            for item in reverse_lines(fh, end=anchor[1] if anchor else None):
+                if len(lines) >= limit:
+                    break
+                lines.append(item)
+            lines.reverse()
+            start = lines[0][0] if lines else (anchor[1] if anchor else 0)
+            end = lines[-1][0] + len(lines[-1][1]) + 1 if lines else start
+    headers = {"X-Log-Cursor": f"{path.name}:{start}", "X-Log-End": f"{path.name}:{end}"}
+    return [line.decode(errors="replace") for _, line in lines], headers
+
+
+def _read_logs(max_lines: int = 100) -> List[str]:
+    return _log_page(max_lines)[0]
+
+
+async def _follow_logs(cursor: Optional[str] = None) -> AsyncIterator[bytes]:
+    """SSE events for every line appended after *cursor* (default: now).
+
+    The file is kept open and only the bytes past the cursor are read;
+    when a newer log file appears the old one is drained first.
+    """
+    anchor = _parse_cursor(cursor)
+    path = anchor[0] if anchor else _latest_log()
+    offset = anchor[1] if anchor else None
+    idle = 0.0
+    fh = None
+    try:
+        while True:
+            if path is None:
+                path, offset = _latest_log(), 0
+            if path is not None and fh is None:
+                fh = open(path, "rb")
+                if offset is None:  # "now": start past the last complete line
+                    last = next(reverse_lines(fh), None)
+                    offset = last[0] + len(last[1]) + 1 if last else 0
+            lines: list = []
+            if fh is not None:
+                if os.fstat(fh.fileno()).st_size < offset:  # truncated in place
+                    offset = 0
+                lines, offset = forward_lines(fh, offset, LOG_PAGE_MAX)
+            for pos, line in lines:
+                text = line.decode(errors="replace").replace("\r", "")
+                yield f"id: {path.name}:{pos + len(line) + 1}\ndata: {text}\n\n".encode()  # type: ignore[union-attr]
+            if lines:
+                idle = 0.0
+                continue
+            newest = _latest_log()
+            if newest is not None and newest != path:  # rotated: old file drained
+                if fh is not None:
+                    fh.close()
+                path, offset, fh = newest, 0, None
+                continue
+            await asyncio.sleep(LOG_POLL_SEC)
+            idle += LOG_POLL_SEC
+            if idle >= LOG_HEARTBEAT_SEC:  # keep proxies from closing the stream
+                idle = 0.0
+                yield b": keep-alive\n\n"
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+def _query(scope) -> Dict[str, str]:
+    return {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
 
 # Tiny in‑memory buffer holding single‑use CSRF tokens (shared with trace_ws)
 _api_buffer: List[str] = []            # ← NEW
 
 # ───────────────────── preferred FastAPI branch ────────────────────────────
 try:
-    from fastapi import FastAPI
+    from fastapi import FastAPI, Header, Response
+    from fastapi.responses import StreamingResponse
 
     fast_app = FastAPI(title="Alpha‑Factory API")
 
     # .—/api/logs───────────────────────────────────────────────────────────.
     @fast_app.get("/api/logs")
-    async def api_logs() -> List[str]:
-        """Return the most recent (≤100) log lines."""
-        return _read_logs()
+    async def api_logs(
+        response: Response, limit: int = 100, before: Optional[str] = None, after: Optional[str] = None
+    ) -> List[str]:
+        """Return ≤*limit* log lines: the newest, or the page next to a cursor."""
+        lines, headers = _log_page(limit, before, after)
+        response.headers.update(headers)
+        return lines
+
+    @fast_app.get("/api/logs/stream")
+    async def api_logs_stream(
+        cursor: Optional[str] = None, last_event_id: Optional[str] = Header(None)
+    ) -> StreamingResponse:
+        """Follow the log as Server‑Sent Events."""
+        return StreamingResponse(
+            _follow_logs(last_event_id or cursor),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
 
     # .—/api/csrf  (token for WebSocket handshake)──────────────────────────.
     @fast_app.get("/api/csrf")          # ← NEW ENDPOINT
@@ -76,15 +206,48 @@ except ModuleNotFoundError:  # pragma: no cover
             return
 
         path = scope.get("path", "/")
+        query = _query(scope)
+        headers = []
 
+        if path == "/api/logs/stream":
+            await _stream(scope, receive, send, query)
+            return
         if path == "/api/logs":
-            body = json.dumps(_read_logs()).encode()
+            limit = query.get("limit", "100")
+            lines, extra = _log_page(int(limit) if limit.isdigit() else 100, query.get("before"), query.get("after"))
+            body = json.dumps(lines).encode()
             ctype = b"application/json"
+            headers = [(k.lower().encode(), v.encode()) for k, v in extra.items()]
         else:
             # NB: payload must be ASCII for bytes literal → use regular hyphen
             body = b"Alpha-Factory online"
             ctype = b"text/plain"
 
-        headers = [(b"content-type", ctype)]
+        headers.append((b"content-type", ctype))
         await send({"type": "http.response.start", "status": 200, "headers": headers})
         await send({"type": "http.response.body", "body": body})
+
+    async def _stream(scope, receive, send, query) -> None:
+        """SSE without Starlette: chunked body until the client disconnects."""
+        last_id = dict(scope.get("headers") or []).get(b"last-event-id", b"").decode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        })
+        gone = asyncio.ensure_future(receive())  # resolves with http.disconnect
+        events = _follow_logs(last_id or query.get("cursor"))
+        try:
+            while True:
+                nxt = asyncio.ensure_future(events.__anext__())
+                await asyncio.wait({nxt, gone}, return_when=asyncio.FIRST_COMPLETED)
+                if not nxt.done():
+                    nxt.cancel()
+                    with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                        await nxt  # let the generator unwind before closing it
+                    break
+                await send({"type": "http.response.body", "body": nxt.result(), "more_body": True})
+        finally:
+            gone.cancel()
+            await events.aclose()  # runs _follow_logs' finally → closes the file
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -2,11 +2,19 @@
 import abc
 import datetime
 import logging
+import os
+import threading
+import time
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from .instrumentation import phase
+from .pipeline import StagePipeline
 from .tracer import Tracer
 
+_PIPELINE_AGENTS = {a.strip() for a in os.getenv("ALPHA_PIPELINE_AGENTS", "").split(",") if a.strip()}
+_PIPELINE_DEPTH = int(os.getenv("ALPHA_PIPELINE_DEPTH", "1"))
+
 class AgentBase(abc.ABC):
     """
     Shared skeleton for every domain agent:
@@ -16,9 +24,23 @@ class AgentBase(abc.ABC):
         • act()     → execute vetted tasks
 
     Each phase is traced and persisted so evaluation harnesses can
-    replay or diff behaviour across versions.
+    replay or diff behaviour across versions (see ``backend.replay``).
+
+    Pipelined mode (opt‑in: ``PIPELINED = True`` or the agent name in
+    ``ALPHA_PIPELINE_AGENTS``): ``run_cycle`` runs ``observe`` and hands
+    the result to think → vet → act stage threads joined by bounded
+    queues (``PIPELINE_DEPTH``, ``backend.pipeline``), so the next cycle's
+    ``observe`` overlaps this cycle's ``think`` / ``act``.  Cycles still
+    finish in order; ``pipeline_stats()`` shows per‑stage utilisation.
+    Since ``run_cycle`` returns before the cycle is done, each cycle's
+    outcome (observe → act latency, any stage failing) is reported to the
+    health loop by the stages themselves.  ``close()`` finishes the
+    cycles in flight and stops the stage threads.
     """
 
+    PIPELINED = False
+    PIPELINE_DEPTH = _PIPELINE_DEPTH
+
     # ────────────────────────────────────────────────────────────────
     def __init__(self, name: str, model, memory, gov):
         self.id = str(uuid.uuid4())
@@ -29,6 +51,8 @@ class AgentBase(abc.ABC):
 
         self.log = logging.getLogger(name)
         self.tracer = Tracer(self.memory)
+        self._pipeline: Optional[StagePipeline] = None
+        self._pipeline_lock = threading.Lock()  # cycles may start on several threads
 
     # ───────── framework hooks (must be implemented) ───────────────
     @abc.abstractmethod
@@ -44,22 +68,34 @@ class AgentBase(abc.ABC):
         ...
 
     # ───────── single life‑cycle ───────────────────────────────────
+    @property
+    def pipelined(self) -> bool:
+        return self.PIPELINED or self.name in _PIPELINE_AGENTS
+
     def run_cycle(self) -> None:
+        if self.pipelined:
+            return self._run_cycle_pipelined()
         ts = datetime.datetime.utcnow().isoformat()
         self.log.info("%s cycle start", self.name)
 
+        cycle = self.tracer.begin_cycle(self.name)  # all phases sampled together
+
         try:
-            observations = self.observe()
-            self.tracer.record(self.name, "observe", observations)
+            with phase(self.name, "observe") as ph:
+                observations = ph.out(self.observe())
+            self.tracer.record(self.name, "observe", observations, timing=ph.timing, cycle=cycle)
 
-            ideas = self.think(observations)
-            self.tracer.record(self.name, "think", ideas)
+            with phase(self.name, "think") as ph:
+                ideas = ph.out(self.think(observations))
+            self.tracer.record(self.name, "think", ideas, timing=ph.timing, cycle=cycle)
 
-            vetted = self.gov.vet_plans(self, ideas)
-            self.tracer.record(self.name, "vet", vetted)
+            with phase(self.name, "vet") as ph:
+                vetted = ph.out(self.gov.vet_plans(self, ideas))
+            self.tracer.record(self.name, "vet", vetted, timing=ph.timing, cycle=cycle)
 
-            self.act(vetted)
-            self.tracer.record(self.name, "act", vetted)
+            with phase(self.name, "act") as ph:
+                self.act(vetted)
+            self.tracer.record(self.name, "act", vetted, timing=ph.timing, cycle=cycle)
 
         except Exception as err:
             self.log.exception("Cycle error: %s", err)
@@ -69,3 +105,77 @@ class AgentBase(abc.ABC):
 
         self.log.info("%s cycle end", self.name)
 
+    # ───────── pipelined life‑cycle ────────────────────────────────
+    def _traced(self, name: str, cycle: str, fn, arg, *, record_input: bool = False):
+        with phase(self.name, name) as ph:
+            out = fn(arg)
+            if not record_input:
+                ph.out(out)
+        self.tracer.record(self.name, name, arg if record_input else out, timing=ph.timing, cycle=cycle)
+        return out
+
+    def _cycle_done(self, t0: float, ok: bool) -> None:
+        from backend.agents import record_cycle  # backend.agents imports this module
+
+        record_cycle(self.name, (time.perf_counter() - t0) * 1000, ok)
+
+    def _stage_failed(self, stage: str, item, err: BaseException) -> None:
+        self.log.error("Cycle error in %s: %s", stage, err, exc_info=err)
+        self.memory.write(
+            self.name, "error", {"msg": str(err), "ts": datetime.datetime.utcnow().isoformat(), "stage": stage}
+        )
+        if item is not None:  # (cycle, t0, payload)
+            self._cycle_done(item[1], False)
+
+    def _start_pipeline(self) -> StagePipeline:
+        def vet(ideas):
+            return self.gov.vet_plans(self, ideas)
+
+        def act(it):
+            self._traced("act", it[0], self.act, it[2], record_input=True)
+            self._cycle_done(it[1], True)
+
+        stages = [
+            ("think", lambda it: (it[0], it[1], self._traced("think", it[0], self.think, it[2]))),
+            ("vet", lambda it: (it[0], it[1], self._traced("vet", it[0], vet, it[2]))),
+            ("act", act),
+        ]
+        return StagePipeline(
+            self.name, stages, depth=self.PIPELINE_DEPTH, on_error=self._stage_failed, sources=("observe",)
+        ).start()
+
+    def _run_cycle_pipelined(self) -> None:
+        pipeline = self._pipeline
+        if pipeline is None:
+            with self._pipeline_lock:
+                if self._pipeline is None:
+                    self._pipeline = self._start_pipeline()
+                pipeline = self._pipeline
+        cycle = self.tracer.begin_cycle(self.name)
+        t0 = time.perf_counter()
+        try:
+            with phase(self.name, "observe") as ph:
+                observations = ph.out(self.observe())
+            self.tracer.record(self.name, "observe", observations, timing=ph.timing, cycle=cycle)
+        except Exception as err:
+            self._stage_failed("observe", (cycle, t0, None), err)
+            return
+        busy = time.perf_counter() - t0
+        blocked = pipeline.submit((cycle, t0, observations))  # waits only if think is backed up
+        pipeline.account("observe", busy, blocked)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for pipelined cycles still in flight (no‑op when sequential)."""
+        return True if self._pipeline is None else self._pipeline.drain(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish pipelined cycles in flight, then stop the stage threads."""
+        with self._pipeline_lock:
+            pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline.drain(timeout)
+            pipeline.close(timeout)
+
+    def pipeline_stats(self) -> Optional[Dict[str, Any]]:
+        """Per‑stage items, busy / blocked time, utilisation and bottleneck."""
+        return None if self._pipeline is None else self._pipeline.stats()
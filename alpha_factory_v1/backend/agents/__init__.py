@@ -12,24 +12,36 @@ participates in Alpha-Factory.  It safely loads local `*_agent.py` files,
 PEP-621 entry-points, *and* (optionally) wheels streamed via Google ADK’s
 Agent2Agent mesh – all while remaining 100 % importable on a fresh
 Python standard-library-only environment.
+
+Local agents are discovered **lazily**: their source is parsed (never
+imported) and the resulting name / capabilities / module path are kept in
+a manifest cache keyed by file mtime + size.  `list_agents()` and
+`capability_agents()` are answered from that manifest; the module itself –
+and its torch / faiss / ortools / rdkit imports – is only loaded by
+`get_agent()`.  Each such import is timed against `AGENT_IMPORT_BUDGET_MS`
+and summarised by `import_report()`.
 """
 ##############################################################################
 #                              std-lib imports                               #
 ##############################################################################
+import ast
+import asyncio
 import importlib
 import importlib.util
 import inspect
 import json
 import logging
+import math
 import os
 import pkgutil
 import queue
+import sys
 import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from types import ModuleType
-from typing import Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 ##############################################################################
 #                optional heavy deps (never hard-fail at import)             #
@@ -39,11 +51,6 @@ try:
 except ModuleNotFoundError:                           # pragma: no cover
     import importlib_metadata                         # type: ignore
 
-try:                                                  # Kafka telemetry
-    from kafka import KafkaProducer                   # type: ignore
-except ModuleNotFoundError:                           # pragma: no cover
-    KafkaProducer = None                              # type: ignore
-
 try:                                                  # Prometheus counter
     from prometheus_client import Counter             # type: ignore
 except ModuleNotFoundError:                           # pragma: no cover
@@ -54,17 +61,25 @@ try:                                                  # ADK remote wheel pull-in
 except ModuleNotFoundError:                           # pragma: no cover
     adk = None                                        # type: ignore
 
+from backend.event_bus import get_bus          # batched Kafka / local ring
+from backend.instrumentation import phase      # wall / cpu / alloc per phase
+
 ##############################################################################
 #                              configuration                                 #
 ##############################################################################
 _OPENAI_READY   = bool(os.getenv("OPENAI_API_KEY"))
-_KAFKA_BROKER   = os.getenv("ALPHA_KAFKA_BROKER")
 _DISABLED       = {x.strip().lower()
                    for x in os.getenv("DISABLED_AGENTS", "").split(",")
                    if x.strip()}
 _ERR_THRESHOLD  = int(os.getenv("AGENT_ERR_THRESHOLD", 3))
 _HOT_DIR        = Path(os.getenv("AGENT_HOT_DIR", "")).expanduser()
-_HEARTBEAT_INT  = int(os.getenv("AGENT_HEARTBEAT_SEC", 10))
+_HEARTBEAT_INT  = int(os.getenv("AGENT_HEARTBEAT_SEC", 10))   # health window length
+_LAZY_IMPORT    = os.getenv("AGENT_LAZY_IMPORT", "true").lower() != "false"
+_MANIFEST_PATH  = Path(os.getenv(
+    "AGENT_MANIFEST_CACHE",
+    Path(os.getenv("XDG_CACHE_HOME", "~/.cache")) / "alpha_factory" / "agent_manifest.json",
+)).expanduser()
+_IMPORT_BUDGET_MS = float(os.getenv("AGENT_IMPORT_BUDGET_MS", 2000))
 
 ##############################################################################
 #                                  logging                                   #
@@ -78,12 +93,13 @@ logger.setLevel(logging.INFO)
 @dataclass(frozen=True)
 class AgentMetadata:
     name:            str
-    cls:             Type            # reference to Agent class (or Stub)
+    cls:             Optional[Type] = None   # Agent class (or Stub); None until imported
     version:         str  = "0.1.0"
     capabilities:    List[str] = field(default_factory=list)
     compliance_tags: List[str] = field(default_factory=list)
     requires_api_key: bool = False
     err_count:       int  = 0
+    module:          Optional[str] = None    # import path for lazy entries
 
     # serialisation helpers -------------------------------------------------
     def as_dict(self) -> Dict:
@@ -98,9 +114,16 @@ class AgentMetadata:
     def to_json(self) -> str:
         return json.dumps(self.as_dict(), separators=(",", ":"))
 
+    # lazy class resolution -------------------------------------------------
+    def load(self) -> Type:
+        """Return the agent class, importing its module on first use."""
+        if self.cls is None:
+            object.__setattr__(self, "cls", _import_agent_class(self))
+        return self.cls               # type: ignore[return-value]
+
     # instantiation helper --------------------------------------------------
     def instantiate(self, **kwargs):
-        return self.cls(**kwargs)     # type: ignore[arg-type]
+        return self.load()(**kwargs)  # type: ignore[operator]
 
 
 class CapabilityGraph(Dict[str, List[str]]):
@@ -126,6 +149,10 @@ class StubAgent:                               # pragma: no cover
 AGENT_REGISTRY:    Dict[str, AgentMetadata] = {}
 CAPABILITY_GRAPH:  CapabilityGraph          = CapabilityGraph()
 _HEALTH_Q:         "queue.Queue[tuple[str,float,bool]]" = queue.Queue()
+_IMPORT_TIMES:     Dict[str, Tuple[float, List[str]]] = {}   # module ➜ (ms, new deps)
+_HEALTH:           Dict[str, Dict[str, Any]] = {}            # last closed window per agent
+_HEALTH_EMIT       = True       # process workers leave the summaries to the parent
+_IMPORT_LOCK       = threading.RLock()
 
 if Counter:
     _err_counter = Counter("af_agent_exceptions_total",
@@ -135,21 +162,9 @@ if Counter:
 ##############################################################################
 #                     lightweight helper functions                           #
 ##############################################################################
-def _kafka_producer():
-    if not _KAFKA_BROKER or KafkaProducer is None:
-        return None
-    return KafkaProducer(bootstrap_servers=_KAFKA_BROKER,
-                         value_serializer=lambda v: v.encode() if isinstance(v, str) else v)
-
-_PRODUCER = _kafka_producer()
-
 def _emit_kafka(topic: str, payload: str):
-    if _PRODUCER:
-        try:
-            _PRODUCER.send(topic, payload)
-            _PRODUCER.flush()
-        except Exception:                      # noqa: BLE001
-            logger.exception("Kafka emit failed (topic=%s)", topic)
+    # batched & non-blocking: see backend.event_bus (no per-message flush)
+    get_bus().publish(topic, payload)
 
 def _should_register(meta: AgentMetadata) -> bool:
     if meta.name.lower() in _DISABLED:
@@ -168,18 +183,37 @@ from backend.agent_base import AgentBase      # local import to avoid cycles
 def _register(meta: AgentMetadata, *, overwrite: bool = False):
     if not _should_register(meta):
         return
-    if meta.name in AGENT_REGISTRY and not overwrite:
+    prev = AGENT_REGISTRY.get(meta.name)
+    if prev is not None and prev.cls is None and meta.cls is not None:
+        # the lazily-listed module was just imported and self-registered:
+        # upgrade the manifest placeholder in place, no re-announcement
+        object.__setattr__(prev, "cls", meta.cls)
+        if meta.capabilities != prev.capabilities:
+            _index(prev, drop=True)
+            AGENT_REGISTRY[meta.name] = meta
+            _index(meta)
+        return
+    if prev is not None and not overwrite:
         logger.error("Duplicate agent name '%s'", meta.name)
         return
 
+    if prev is not None:
+        _index(prev, drop=True)
     AGENT_REGISTRY[meta.name] = meta
-    for cap in meta.capabilities:
-        CAPABILITY_GRAPH.add(cap, meta.name)
+    _index(meta)
 
     logger.info("✓ agent %-18s caps=%s", meta.name, ",".join(meta.capabilities))
     _emit_kafka("agent.manifest", meta.to_json())
 
 
+def _index(meta: AgentMetadata, *, drop: bool = False):
+    for cap in meta.capabilities:
+        if not drop:
+            CAPABILITY_GRAPH.add(cap, meta.name)
+        elif meta.name in CAPABILITY_GRAPH.get(cap, []):
+            CAPABILITY_GRAPH[cap].remove(meta.name)
+
+
 def _inspect_module(mod: ModuleType) -> Optional[AgentMetadata]:
     for _, obj in inspect.getmembers(mod, inspect.isclass):
         if issubclass(obj, AgentBase) and obj is not AgentBase:
@@ -194,18 +228,184 @@ def _inspect_module(mod: ModuleType) -> Optional[AgentMetadata]:
     return None
 
 
+##############################################################################
+#              manifest cache – list agents without importing them           #
+##############################################################################
+_SCAN_VERSION  = 2          # bump when _scan_source output changes (invalidates the cache)
+_LITERAL_ATTRS = {"NAME": "name", "CAPABILITIES": "capabilities",
+                  "COMPLIANCE_TAGS": "compliance_tags",
+                  "REQUIRES_API_KEY": "requires_api_key",
+                  "__version__": "version"}
+
+
+def _scan_source(path: Path) -> Optional[Dict[str, Any]]:
+    """Extract agent metadata from *path* by parsing (not importing) it.
+
+    Returns ``None`` when the module does not spell its metadata out as
+    literals – such modules fall back to an eager import.  ``requires``
+    lists the top-level packages the module imports unconditionally
+    (outside ``try``), so a missing one keeps the agent off the registry.
+    """
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    entry: Dict[str, Any] = {}
+    requires = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            requires.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module != "__future__":
+            requires.add(node.module.split(".")[0])    # type: ignore[union-attr]
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {getattr(b, "id", getattr(b, "attr", None)) for b in node.bases}
+        if "AgentBase" not in bases:
+            continue
+        entry["name"] = node.name.replace("Agent", "").lower()
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+                key = _LITERAL_ATTRS.get(getattr(stmt.targets[0], "id", ""))
+                if key:
+                    try:
+                        entry[key] = ast.literal_eval(stmt.value)
+                    except ValueError:
+                        return None
+        break
+    if not entry:
+        return None
+    entry["requires"] = sorted(requires)
+    # version is usually given to the module-level register_agent(...) call
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call)
+                and getattr(node.func, "id", None) == "AgentMetadata"):
+            for kw in node.keywords:
+                if kw.arg == "version" and isinstance(kw.value, ast.Constant):
+                    entry["version"] = kw.value.value
+    return entry
+
+
+def _load_manifest() -> Dict[str, Any]:
+    try:
+        return json.loads(_MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest: Dict[str, Any]):
+    try:
+        _MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _MANIFEST_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+        os.replace(tmp, _MANIFEST_PATH)
+    except OSError as exc:
+        logger.debug("Agent manifest not cached (%s)", exc)
+
+
+def _missing_requirements(requires: List[str]) -> List[str]:
+    missing = []
+    for name in requires:
+        try:
+            if importlib.util.find_spec(name) is None:
+                missing.append(name)
+        except (ImportError, ValueError):
+            missing.append(name)
+    return missing
+
+
+def _demote(meta: AgentMetadata, exc: BaseException):
+    """Swap a lazily-listed agent whose module fails to import for a stub.
+
+    The stub keeps the name visible (``+stub`` version) but advertises no
+    capabilities, so routing never selects it.
+    """
+    logger.error("Agent %s unavailable – %s: %s", meta.name, type(exc).__name__, exc)
+    if AGENT_REGISTRY.get(meta.name) is meta:
+        _index(meta, drop=True)
+        AGENT_REGISTRY[meta.name] = AgentMetadata(
+            name=meta.name,
+            cls=StubAgent,
+            version=meta.version + "+stub",
+            compliance_tags=meta.compliance_tags,
+            module=meta.module,
+        )
+
+
+def _import_agent_class(meta: AgentMetadata) -> Type:
+    """Import *meta.module*, time it, and return the registered class."""
+    with _IMPORT_LOCK:
+        current = AGENT_REGISTRY.get(meta.name)
+        if current is not None and current.cls is not None:
+            return current.cls
+        before = set(sys.modules)
+        t0 = time.perf_counter()
+        try:
+            mod = importlib.import_module(meta.module)    # type: ignore[arg-type]
+        except Exception as exc:                          # noqa: BLE001
+            _demote(meta, exc)
+            raise
+        ms = (time.perf_counter() - t0) * 1000
+        deps = sorted({m.split(".")[0] for m in set(sys.modules) - before}
+                      - {meta.module.split(".")[0]})      # type: ignore[union-attr]
+        _IMPORT_TIMES[meta.module] = (ms, deps)           # type: ignore[index]
+        if ms > _IMPORT_BUDGET_MS:
+            logger.warning("Importing %s took %.0f ms (budget %.0f ms) – pulled in %s",
+                           meta.module, ms, _IMPORT_BUDGET_MS, ", ".join(deps) or "-")
+        else:
+            logger.debug("Imported %s in %.0f ms", meta.module, ms)
+
+        current = AGENT_REGISTRY.get(meta.name)
+        if current is not None and current.cls is not None:
+            return current.cls
+        found = _inspect_module(mod)                      # module did not self-register
+        if found is None or found.cls is None:
+            exc = ImportError(f"{meta.module} defines no AgentBase subclass")
+            _demote(meta, exc)
+            raise exc
+        return found.cls
+
+
+def import_report() -> List[Dict[str, Any]]:
+    """Agent module import costs so far, slowest first."""
+    return [
+        {"module": mod, "ms": round(ms, 1), "over_budget": ms > _IMPORT_BUDGET_MS, "deps": deps}
+        for mod, (ms, deps) in sorted(_IMPORT_TIMES.items(), key=lambda kv: -kv[1][0])
+    ]
+
+
 def _discover_local():
     pkg_root = Path(__file__).parent
     prefix   = f"{__name__}."
+    manifest = _load_manifest() if _LAZY_IMPORT else {}
+    dirty    = False
     for _, mod_name, is_pkg in pkgutil.iter_modules([str(pkg_root)]):
         if is_pkg or not mod_name.endswith("_agent"):
             continue
+        path = pkg_root / f"{mod_name}.py"
         try:
+            if _LAZY_IMPORT and path.is_file():
+                st  = path.stat()
+                key = [st.st_mtime_ns, st.st_size, _SCAN_VERSION]
+                hit = manifest.get(str(path))
+                if hit and hit.get("key") == key:
+                    entry = hit["entry"]
+                else:
+                    entry = _scan_source(path)
+                    manifest[str(path)] = {"key": key, "entry": entry}
+                    dirty = True
+                if entry is not None:
+                    entry   = dict(entry)
+                    missing = _missing_requirements(entry.pop("requires", []))
+                    if missing:
+                        logger.info("Skipping %s (missing %s)", mod_name, ", ".join(missing))
+                    else:
+                        _register(AgentMetadata(module=prefix + mod_name, **entry))
+                    continue
             meta = _inspect_module(importlib.import_module(prefix + mod_name))
             if meta:
                 _register(meta)
         except Exception:                      # noqa: BLE001
             logger.exception("Import error %s", mod_name)
+    if dirty:
+        _save_manifest(manifest)
 
 
 def _discover_entrypoints():
@@ -269,37 +469,121 @@ def _discover_adk():
 ##############################################################################
 #                       health & quarantine loop                             #
 ##############################################################################
+_HIST_GROWTH = 1.12
+_HIST_BOUNDS = [0.1 * _HIST_GROWTH ** i for i in range(152)]
+
+
+class LatencyHistogram:
+    """Fixed log-scale buckets (12 % wide, 0.1 ms … ~45 min) – O(1) add."""
+    _GROWTH = _HIST_GROWTH
+    _BOUNDS = _HIST_BOUNDS
+
+    __slots__ = ("counts", "n", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self._BOUNDS) + 1)
+        self.n      = 0
+        self.max    = 0.0
+
+    def add(self, ms: float):
+        i = 0 if ms <= 0.1 else min(len(self._BOUNDS), math.ceil(math.log(ms / 0.1, self._GROWTH)))
+        self.counts[i] += 1
+        self.n  += 1
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                upper = self._BOUNDS[i] if i < len(self._BOUNDS) else self.max
+                return min(upper, self.max)
+        return self.max
+
+
+class _HealthWindow:
+    __slots__ = ("count", "errors", "hist")
+
+    def __init__(self):
+        self.count  = 0
+        self.errors = 0
+        self.hist   = LatencyHistogram()
+
+    def summary(self, name: str, start: float, end: float) -> Dict[str, Any]:
+        return {
+            "name":       name,
+            "window_s":   round(end - start, 3),
+            "count":      self.count,
+            "errors":     self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "p50_ms":     round(self.hist.quantile(0.50), 3),
+            "p95_ms":     round(self.hist.quantile(0.95), 3),
+            "p99_ms":     round(self.hist.quantile(0.99), 3),
+            "max_ms":     round(self.hist.max, 3),
+            "ts":         end,
+        }
+
+
+def _quarantine_check(name: str, ok: bool):
+    meta = AGENT_REGISTRY.get(name)
+    if meta and not ok:
+        if Counter:
+            _err_counter.labels(agent=name).inc()
+        # bump error counter (mutable via object.__setattr__)
+        object.__setattr__(meta, "err_count", meta.err_count + 1)
+        if meta.err_count >= _ERR_THRESHOLD:
+            logger.error("Quarantining agent '%s' after %d errors ⛔",
+                         name, meta.err_count)
+            # replace with stub to keep capability graph consistent
+            stub_meta = AgentMetadata(
+                name=meta.name,
+                cls=StubAgent,
+                version=meta.version + "+stub",
+                capabilities=meta.capabilities,
+                compliance_tags=meta.compliance_tags,
+            )
+            _register(stub_meta, overwrite=True)
+
+
+def _close_window(windows: Dict[str, _HealthWindow], start: float, end: float):
+    """Publish the window; agents that did not report in it drop out of ``_HEALTH``."""
+    global _HEALTH
+    closed = {name: win.summary(name, start, end) for name, win in windows.items()}
+    _HEALTH = closed  # swapped whole: readers never see a half-updated map
+    if _HEALTH_EMIT:
+        for summary in closed.values():
+            _emit_kafka("agent.heartbeat", json.dumps(summary))
+
+
 def _health_loop():
+    """Fold cycle results into per-agent windows; one summary per window."""
+    windows: Dict[str, _HealthWindow] = {}
+    start = time.time()
     while True:
+        end = start + _HEARTBEAT_INT
         try:
-            name, latency_ms, ok = _HEALTH_Q.get(timeout=_HEARTBEAT_INT)
+            name, latency_ms, ok = _HEALTH_Q.get(timeout=max(0.0, end - time.time()))
         except queue.Empty:
-            continue
-
-        meta = AGENT_REGISTRY.get(name)
-        if meta and not ok:
-            if Counter:
-                _err_counter.labels(agent=name).inc()
-            # bump error counter (mutable via object.__setattr__)
-            object.__setattr__(meta, "err_count", meta.err_count + 1)
-            if meta.err_count >= _ERR_THRESHOLD:
-                logger.error("Quarantining agent '%s' after %d errors ⛔",
-                             name, meta.err_count)
-                # replace with stub to keep capability graph consistent
-                stub_meta = AgentMetadata(
-                    name=meta.name,
-                    cls=StubAgent,
-                    version=meta.version + "+stub",
-                    capabilities=meta.capabilities,
-                    compliance_tags=meta.compliance_tags,
-                )
-                _register(stub_meta, overwrite=True)
-
-        payload = json.dumps({"name": name,
-                              "latency_ms": latency_ms,
-                              "ok": ok,
-                              "ts": time.time()})
-        _emit_kafka("agent.heartbeat", payload)
+            name = None
+
+        if name is not None:
+            _quarantine_check(name, ok)
+            win = windows.get(name)
+            if win is None:
+                win = windows[name] = _HealthWindow()
+            win.count += 1
+            win.errors += not ok
+            win.hist.add(latency_ms)
+
+        now = time.time()
+        if now >= end:
+            if windows or _HEALTH:
+                _close_window(windows, start, now)
+                windows = {}
+            start = now
 
 threading.Thread(target=_health_loop,
                  daemon=True, name="agent-health").start()
@@ -312,22 +596,43 @@ def list_agents(detail: bool = False):
     return [m.as_dict() if detail else m.name for m in metas]
 
 def capability_agents(capability: str):
-    """Return agents that expose the given capability."""
+    """Return agents that expose the given capability.
+
+    To pick *one* by load / latency / health use ``backend.router.route``.
+    """
     return CAPABILITY_GRAPH.get(capability, []).copy()
 
+def health_snapshot(name: Optional[str] = None):
+    """Latest closed-window health summary for *name* (or all agents).
+
+    Keys: ``count``, ``errors``, ``error_rate``, ``p50_ms``, ``p95_ms``,
+    ``p99_ms``, ``max_ms``, ``window_s``, ``ts``.  Agents without a
+    completed cycle in the last window are absent.
+    """
+    if name is not None:
+        return _HEALTH.get(name)
+    return dict(_HEALTH)
+
+def record_cycle(name: str, latency_ms: float, ok: bool):
+    """Feed one cycle outcome to the health loop (for out-of-band runners)."""
+    _HEALTH_Q.put((name, latency_ms, ok))
+
 def get_agent(name: str, **kwargs):
+    meta  = AGENT_REGISTRY[name]
+    meta.load()                                  # may upgrade the registry entry
     meta  = AGENT_REGISTRY[name]
     agent = meta.instantiate(**kwargs)
 
-    # health instrumentation wrapper ----------------------------------
-    if hasattr(agent, "run_cycle") and inspect.iscoroutinefunction(agent.run_cycle):
-        orig = agent.run_cycle
+    # health + phase instrumentation (sync and async agents alike) ----
+    orig = getattr(agent, "run_cycle", None)
+    if inspect.iscoroutinefunction(orig):
 
         async def _wrapped(*a, **kw):            # type: ignore[no-untyped-def]
             t0  = time.perf_counter()
             ok  = True
             try:
-                return await orig(*a, **kw)      # type: ignore[misc]
+                with phase(meta.name, "cycle", cpu=False):   # CPU is shared across awaits
+                    return await orig(*a, **kw)  # type: ignore[misc]
             except Exception:                    # noqa: BLE001
                 ok = False
                 raise
@@ -335,6 +640,25 @@ def get_agent(name: str, **kwargs):
                 _HEALTH_Q.put((meta.name, (time.perf_counter()-t0)*1000, ok))
 
         agent.run_cycle = _wrapped               # type: ignore[assignment]
+    elif callable(orig):
+        # pipelined AgentBase: run_cycle returns after observe, the stages
+        # report the whole cycle themselves (AgentBase._cycle_done)
+        self_reported = bool(getattr(agent, "pipelined", False))
+
+        def _wrapped_sync(*a, **kw):             # type: ignore[no-untyped-def]
+            t0  = time.perf_counter()
+            ok  = True
+            try:
+                with phase(meta.name, "cycle"):
+                    return orig(*a, **kw)
+            except Exception:                    # noqa: BLE001
+                ok = False
+                raise
+            finally:
+                if not self_reported:
+                    record_cycle(meta.name, (time.perf_counter()-t0)*1000, ok)
+
+        agent.run_cycle = _wrapped_sync          # type: ignore[assignment]
 
     return agent
 
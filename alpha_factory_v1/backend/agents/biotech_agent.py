@@ -46,7 +46,6 @@ NEVER raise at import time.
 
 --------------------------------------------------------------------"""
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -112,6 +111,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase                     # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish                    # pylint: disable=import-error
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -127,21 +128,6 @@ def _now() -> str:                                 # ISO-UTC
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
-def _digest(payload: Any) -> str:                  # deterministic SHA-256
-    return hashlib.sha256(
-        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
-    ).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:  # MCP envelope
-    return {
-        "mcp_version": "0.2",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
 # ───────────────────────────────── CONFIG ────────────────────────────────────
 @dataclass
 class BTConfig:
@@ -265,7 +251,7 @@ class BiotechAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -289,7 +275,7 @@ class BiotechAgent(AgentBase):
 
     @tool(description="Summarise latest alpha opportunities discovered by the agent.")
     def alpha_dashboard(self) -> str:                            # noqa: D401
-        return json.dumps(_wrap_mcp(self.NAME, self._latest_alpha[-50:]))
+        return wrap_mcp(self.NAME, self._latest_alpha[-50:]).to_json()
 
     # ── orchestrator cycle ───────────────────────────────────────────────
     async def run_cycle(self):                                   # noqa: D401
@@ -329,7 +315,7 @@ class BiotechAgent(AgentBase):
         else:
             answer = f"(offline) Relevant facts:\n{context}"
         payload = {"question": query, "answer": answer, "citations": context}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     async def _exp_async(self, args: Dict[str, Any]):
         objective = args.get("objective", "N/A")
@@ -342,11 +328,11 @@ class BiotechAgent(AgentBase):
             "RNA-seq differential expression analysis",
         ]
         proposal = {"objective": objective, "budget": budget, "steps": steps}
-        return json.dumps(_wrap_mcp(self.NAME, proposal))
+        return wrap_mcp(self.NAME, proposal).to_json()
 
     async def _pathway_async(self, entity: str):
         rows = await self.kg.query_pathway(entity)
-        return json.dumps(_wrap_mcp(self.NAME, rows or {"error": "entity_not_found"}))
+        return wrap_mcp(self.NAME, rows or {"error": "entity_not_found"}).to_json()
 
     # ── data ingest helpers ──────────────────────────────────────────────
     async def _ingest_pubmed(self, term: str):
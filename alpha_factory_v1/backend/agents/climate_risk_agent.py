@@ -50,7 +50,6 @@ Security & compliance
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import math
@@ -58,9 +57,8 @@ import os
 import random
 import time
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import List, Optional
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Soft‑optional dependencies — IMPORT FAILURES ARE SILENT.
@@ -104,6 +102,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish  # re‑use event bus
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -176,28 +176,6 @@ else:
             return x  # passthrough
 
 
-# ────────────────────────────────────────────────────────────────────────────────
-# Helper utilities                                                                 
-# ────────────────────────────────────────────────────────────────────────────────
-
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.1",
-        "agent": agent,
-        "ts": _now_iso(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
-
 # ────────────────────────────────────────────────────────────────────────────────
 # ClimateRiskAgent                                                                
 # ────────────────────────────────────────────────────────────────────────────────
@@ -231,7 +209,7 @@ class ClimateRiskAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -247,7 +225,7 @@ class ClimateRiskAgent(AgentBase):
     @tool(description="Dollar VaR for next 10 years under default SSP scenario.")
     def portfolio_var(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._compute_var(self.cfg.ssp_default))
+        return loop.run_until_complete(self._compute_var(self.cfg.ssp_default)).to_json()
 
     @tool(description="Ranked adaptation cap‑ex plan that halves VaR.")
     def adaptation_plan(self) -> str:  # noqa: D401
@@ -257,7 +235,7 @@ class ClimateRiskAgent(AgentBase):
     @tool(description="Stress test portfolio VaR under provided SSP (e.g. SSP5‑8.5). Parameter: ssp (str)")
     def stress_test(self, *, ssp: str) -> str:  # type: ignore  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._compute_var(ssp))
+        return loop.run_until_complete(self._compute_var(ssp)).to_json()
 
     # ────────────────────────────────────────────────────────────────
     # Orchestrator cycle                                               
@@ -266,7 +244,7 @@ class ClimateRiskAgent(AgentBase):
     async def run_cycle(self):  # noqa: D401
         await self._ingest_feeds()
         envelope = await self._compute_var(self.cfg.ssp_default)
-        _publish("cr.var", json.loads(envelope))
+        _publish("cr.var", envelope)
         if self._producer:
             self._producer.send("climate.var", envelope)
 
@@ -294,7 +272,7 @@ class ClimateRiskAgent(AgentBase):
     # Risk estimation & planning                                       
     # ────────────────────────────────────────────────────────────────
 
-    async def _compute_var(self, ssp: str) -> str:
+    async def _compute_var(self, ssp: str) -> MCPEnvelope:
         # Placeholder: Monte‑Carlo hazard * loss ratio * asset value
         portfolio_value = 1_000_000_000  # USD; replace with CSV parse
         hazard_scalar = random.random()  # noqa: S311 pseudo draw
@@ -305,7 +283,7 @@ class ClimateRiskAgent(AgentBase):
             "portfolio_value_usd": portfolio_value,
             "VaR_horizon_10y_usd": var,
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload)
 
     async def _plan_adaptations(self) -> str:
         actions = [
@@ -339,7 +317,7 @@ class ClimateRiskAgent(AgentBase):
                 actions = json.loads(resp.choices[0].message.content)
             except Exception as exc:  # noqa: BLE001
                 logger.warning("OpenAI plan ranking failed: %s", exc)
-        return json.dumps(_wrap_mcp(self.NAME, {"plan": actions}))
+        return wrap_mcp(self.NAME, {"plan": actions}).to_json()
 
     # ────────────────────────────────────────────────────────────────
     # ADK mesh heartbeat                                               
@@ -42,7 +42,6 @@ Optional dependencies (auto‑detected):
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -103,6 +102,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import‑error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish  # reuse orchestrator event bus
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -146,10 +147,6 @@ class CTConfig:
 # Utility helpers
 # ---------------------------------------------------------------------------
 
-def _sha256(text: str) -> str:  # noqa: D401
-    return hashlib.sha256(text.encode()).hexdigest()
-
-
 def _utc_now() -> str:  # noqa: D401
     return datetime.now(timezone.utc).isoformat()
 
@@ -212,7 +209,7 @@ class CyberThreatAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -227,7 +224,7 @@ class CyberThreatAgent(AgentBase):
     @tool(description="Return JSON residual cyber‑risk (USD) + top open threats.")
     def audit(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._risk_snapshot())
+        return loop.run_until_complete(self._risk_snapshot()).to_json()
 
     @tool(description="Generate JSON patch/mitigation plan sequence ordered to maximise risk‑reduction under change‑window constraints.")
     def patch_plan(self) -> str:  # noqa: D401
@@ -241,7 +238,7 @@ class CyberThreatAgent(AgentBase):
     async def run_cycle(self):  # noqa: D401
         await self._refresh_feeds()
         envelope = await self._risk_snapshot()
-        _publish("ct.risk", json.loads(envelope))
+        _publish("ct.risk", envelope)
         if self._producer:
             self._producer.send(self.cfg.exp_topic, envelope)
 
@@ -268,7 +265,7 @@ class CyberThreatAgent(AgentBase):
     # Risk estimation helpers
     # ------------------------------------------------------------------
 
-    async def _risk_snapshot(self) -> str:
+    async def _risk_snapshot(self) -> MCPEnvelope:
         cves = self._parse_cves()
         assets = self._load_assets()
         threats = self._score_threats(cves, assets)
@@ -280,16 +277,14 @@ class CyberThreatAgent(AgentBase):
             "top_threats": threats[:5],
             "mitigations": mitigations,
         }
-        envelope = self._wrap_mcp(payload)
-        return json.dumps(envelope)
+        return wrap_mcp(self.NAME, payload)
 
     async def _plan_patches(self) -> str:
-        threats = json.loads(await self._risk_snapshot())["payload"]["top_threats"]
+        threats = (await self._risk_snapshot()).payload["top_threats"]
         plan = sorted(threats, key=lambda t: t["risk_usd"], reverse=True)
         for i, item in enumerate(plan, 1):
             item["sequence"] = i
-        envelope = self._wrap_mcp({"patch_plan": plan})
-        return json.dumps(envelope)
+        return wrap_mcp(self.NAME, {"patch_plan": plan}).to_json()
 
     # ------------------------------------------------------------------
     # Parsing CVE feed
@@ -369,19 +364,6 @@ class CyberThreatAgent(AgentBase):
             logger.warning("OpenAI mitigation synthesis failed: %s", exc)
             return []
 
-    # ------------------------------------------------------------------
-    # Governance helpers
-    # ------------------------------------------------------------------
-
-    def _wrap_mcp(self, payload):
-        return {
-            "mcp_version": "0.1",
-            "agent": self.NAME,
-            "ts": _utc_now(),
-            "digest": _sha256(json.dumps(payload, separators=(",", ":"))),
-            "payload": payload,
-        }
-
     # ------------------------------------------------------------------
     # ADK mesh registration (optional)
     # ------------------------------------------------------------------
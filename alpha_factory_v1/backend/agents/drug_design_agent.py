@@ -107,6 +107,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent  # pylint: disable=import-error
 from backend.orchestrator import _publish  # pylint: disable=import-error
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -366,7 +368,7 @@ class DrugDesignAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         if self.cfg.adk_mesh and adk:
             asyncio.create_task(self._register_mesh())
@@ -378,7 +380,7 @@ class DrugDesignAgent(AgentBase):
     @tool(description="Generate a novel lead molecule with predicted properties and rationale.")
     def propose_lead(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._propose_async())
+        return loop.run_until_complete(self._propose_async()).to_json()
 
     @tool(
         description="Score a SMILES for potency & developability. Input: JSON \"{\"smi\": \"...\"}\" or raw SMILES."
@@ -397,7 +399,7 @@ class DrugDesignAgent(AgentBase):
 
     async def run_cycle(self):  # noqa: D401
         env = await self._propose_async()
-        _publish("dd.lead", json.loads(env))
+        _publish("dd.lead", env)
         if self._producer:
             self._producer.send(self.cfg.exp_topic, env)
 
@@ -405,7 +407,7 @@ class DrugDesignAgent(AgentBase):
     # Internals
     # ------------------------------------------------------------------
 
-    async def _propose_async(self) -> str:
+    async def _propose_async(self) -> MCPEnvelope:
         selfies_str = self._planner.plan()
         if sf and Chem:
             try:
@@ -423,13 +425,13 @@ class DrugDesignAgent(AgentBase):
             "flagged": flagged,
             "rationale": rationale,
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload)
 
     async def _score_async(self, smi: str) -> str:
         props = self._surrogate.predict(smi)
         flagged = not _passes_filters(smi)
         payload = {"smiles": smi, "properties": props, "flagged": flagged}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     async def _llm_rationale(self, props: Dict[str, float], flagged: bool) -> str:
         if openai is None:
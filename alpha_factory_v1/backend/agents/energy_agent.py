@@ -41,7 +41,6 @@ public API exposed by ``EnergyAgent``.
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import math
@@ -102,6 +101,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish  # reuse event-bus helper
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -123,25 +124,6 @@ class EnergyConfig:
     openai_enabled: bool = bool(os.getenv("OPENAI_API_KEY"))
     adk_mesh: bool = bool(os.getenv("ADK_MESH"))
 
-# ---------------------------------------------------------------------------
-# Helpers ---------------------------------------------------------------------
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def _sha(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
-
-
-def _mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.1",
-        "ts": _now_iso(),
-        "agent": agent,
-        "digest": _sha(payload),
-        "payload": payload,
-    }
-
 # ---------------------------------------------------------------------------
 # Surrogate load / PV model ---------------------------------------------------
 class _SurrogateModel:
@@ -220,7 +202,7 @@ class EnergyAgent(AgentBase):
         self._producer = (
             KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
             if self.cfg.kafka_broker and KafkaProducer
             else None
@@ -237,7 +219,7 @@ class EnergyAgent(AgentBase):
     @tool(description="24-h battery/DR optimal dispatch schedule (JSON).")
     def optimise_dispatch(self) -> str:
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._dispatch())
+        return loop.run_until_complete(self._dispatch()).to_json()
 
     @tool(description="Generate PPA/forward-curve hedge strategy JSON.")
     def hedge_strategy(self) -> str:
@@ -248,7 +230,7 @@ class EnergyAgent(AgentBase):
     async def run_cycle(self):
         await self._refresh_price_feed()
         envelope = await self._dispatch()
-        _publish("energy.dispatch", json.loads(envelope))
+        _publish("energy.dispatch", envelope)
         if self._producer:
             self._producer.send(self.cfg.price_topic, envelope)
 
@@ -296,13 +278,13 @@ class EnergyAgent(AgentBase):
             {"ts": ts[i].isoformat(), "load_kw": float(load[i]), "pv_kw": float(pv[i])}
             for i in range(horizon)
         ]
-        return json.dumps(_mcp(self.NAME, forecast))
+        return wrap_mcp(self.NAME, forecast).to_json()
 
-    async def _dispatch(self) -> str:
+    async def _dispatch(self) -> MCPEnvelope:
         prices = [30 + 15 * math.sin(2 * math.pi * h / 24) + random.uniform(-5, 5) for h in range(24)]  # noqa: S311
         load = [500 + 150 * math.sin(2 * math.pi * h / 24) for h in range(24)]
         plan = _battery_optim(prices, load)
-        return json.dumps(_mcp(self.NAME, plan))
+        return wrap_mcp(self.NAME, plan)
 
     async def _hedge(self) -> str:
         hedge = {
@@ -326,7 +308,7 @@ class EnergyAgent(AgentBase):
                 hedge = json.loads(resp.choices[0].message.content)
             except Exception as exc:  # noqa: BLE001
                 logger.warning("OpenAI hedge synthesis failed: %s", exc)
-        return json.dumps(_mcp(self.NAME, hedge))
+        return wrap_mcp(self.NAME, hedge).to_json()
 
     # ---------------------- ADK mesh registration ------------------------ #
     async def _register_mesh(self):
@@ -55,7 +55,6 @@ from __future__ import annotations
 # STD LIB IMPORTS — ALWAYS AVAILABLE                                 #
 #######################################################################
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -64,9 +63,9 @@ import statistics
 import time
 from contextlib import suppress
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, MutableMapping, Optional, Sequence
+from typing import Dict, List, MutableMapping, Optional, Sequence
 
 #######################################################################
 # SOFT‑OPTIONAL THIRD‑PARTY — NEVER CRASH IF MISSING                 #
@@ -104,6 +103,8 @@ with suppress(ModuleNotFoundError):
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish  # event bus
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 try:
     from backend.market_data import MarketDataService  # pylint: disable=import-error
@@ -133,20 +134,6 @@ def _env_float(var: str, default: float) -> float:
     except ValueError:
         return default
 
-def _now() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()).hexdigest()
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.2",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
 
 #######################################################################
 # CONFIGURATION DATACLASS                                             #
@@ -240,9 +227,9 @@ class _Planner:
     def rollout(self, portfolio, prices: Dict[str, float], target_w: Dict[str, float]):
         """Return planned orders list w/ expected slippage and pnl."""
         orders = []
+        port_val = portfolio.value(prices) or 1.0  # one valuation for the whole plan
         for sym, tgt in target_w.items():
             pos_qty = portfolio.position(sym)
-            port_val = portfolio.value(prices) or 1.0
             tgt_qty = tgt * port_val / prices[sym]
             delta = tgt_qty - pos_qty
             if abs(delta) * prices[sym] < 1:
@@ -310,6 +297,8 @@ class FinanceAgent(AgentBase):
     REQUIRES_API_KEY = False
 
     CYCLE_SECONDS = FinConfig().cycle_seconds
+    PRIORITY = 9  # rebalances are time‑critical; never shed
+    DEADLINE_SECONDS = 30
 
     # ------------------------------------------------------------------
     def __init__(self, cfg: FinConfig | None = None):
@@ -318,7 +307,7 @@ class FinanceAgent(AgentBase):
 
         # Market Data & Portfolio services (fallback mocks if missing)
         self.market = MarketDataService(self.cfg.universe) if MarketDataService else None
-        self.portfolio = Portfolio() if Portfolio else _MockPortfolio()
+        self.portfolio = Portfolio(agent=self.NAME) if Portfolio else _MockPortfolio()
 
         self.factor_model = _FactorModel()
         self.planner = _Planner(self.cfg.planner_depth)
@@ -331,7 +320,7 @@ class FinanceAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
 
         # Prometheus metrics
@@ -352,18 +341,18 @@ class FinanceAgent(AgentBase):
 
     @tool(description="Return current factor scores & target weights (JSON).")
     def alpha_signals(self) -> str:  # noqa: D401
-        return json.dumps(_wrap_mcp(self.NAME, self.factor_model.scores))
+        return wrap_mcp(self.NAME, self.factor_model.scores).to_json()
 
     @tool(description="Return current portfolio risk report (JSON).")
     def risk_report(self) -> str:  # noqa: D401
-        return json.dumps(_wrap_mcp(self.NAME, self.risk))
+        return wrap_mcp(self.NAME, self.risk).to_json()
 
     @tool(description="Rebalance portfolio; args: {'execute': bool}. Return planned orders JSON.")
     def rebalance_portfolio(self, args_json: str = "{}") -> str:  # noqa: D401
         args = json.loads(args_json or "{}")
         execute = bool(args.get("execute", False))
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._rebalance_async(execute))
+        return loop.run_until_complete(self._rebalance_async(execute)).to_json()
 
     @tool(description="Run instantaneous stress‑test scenario; args: {'shock_pct':float}")
     def stress_test(self, args_json: str = "{}") -> str:  # noqa: D401
@@ -372,7 +361,7 @@ class FinanceAgent(AgentBase):
         returns = [shock for _ in range(252)]
         svar = _cf_var(returns) * (self.portfolio.value() if self.portfolio else 1.0)
         payload = {"scenario_pct": shock, "svar_usd": svar}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     ###################################################################
     # MAIN LOOP                                                       #
@@ -391,10 +380,10 @@ class FinanceAgent(AgentBase):
         self._update_risk(returns)
 
         if not self._risk_breached():
-            orders_json = await self._rebalance_async(execute=True)
-            _publish("fin.orders", json.loads(orders_json))
+            orders = await self._rebalance_async(execute=True)
+            _publish("fin.orders", orders)
             if self._producer:
-                self._producer.send(self.cfg.tx_topic, orders_json)
+                self._producer.send(self.cfg.tx_topic, orders)
 
         if self.step_hist:
             self.step_hist.observe(time.perf_counter() - start)
@@ -442,7 +431,7 @@ class FinanceAgent(AgentBase):
             return True
         return False
 
-    async def _rebalance_async(self, execute: bool = False) -> str:
+    async def _rebalance_async(self, execute: bool = False) -> MCPEnvelope:
         prices = await self.market.last_prices(self.cfg.universe) if self.market else {}
         targets = self.factor_model.top_buckets()
         orders = self.planner.rollout(self.portfolio, prices, targets)
@@ -450,11 +439,19 @@ class FinanceAgent(AgentBase):
         # Optionally execute orders immediately
         if execute and hasattr(self.market, "broker"):
             broker = getattr(self.market, "broker")
-            for o in orders:
-                await broker.submit_order(o["sym"], o["qty"], o["side"])
-                self.portfolio.record_fill(o["sym"], o["qty"], o["est_fill_px"], o["side"])
+            fills = []
+            try:
+                for o in orders:
+                    await broker.submit_order(o["sym"], o["qty"], o["side"])
+                    fills.append((o["sym"], o["qty"], o["est_fill_px"], o["side"]))
+            finally:  # book what the broker accepted, even if a later submit fails
+                if hasattr(self.portfolio, "record_fills"):
+                    self.portfolio.record_fills(fills)
+                else:  # _MockPortfolio
+                    for f in fills:
+                        self.portfolio.record_fill(*f)
         payload = {"orders": orders, "executed": execute}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload)
 
     ###################################################################
     # ADK MESH                                                        #
@@ -38,7 +38,6 @@ Author: Alpha‑Factory Core Team — April 2025
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -93,6 +92,8 @@ from backend.trace_ws import hub  # pylint: disable=import-error
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent  # pylint: disable=import-error
 from backend.orchestrator import _publish  # pylint: disable=import-error
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -118,19 +119,6 @@ def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.2",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
 # ---------------------------------------------------------------------------
 # Configuration -------------------------------------------------------------
 # ---------------------------------------------------------------------------
@@ -203,7 +191,7 @@ class ManufacturingAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -220,25 +208,25 @@ class ManufacturingAgent(AgentBase):
     def build_schedule(self, req_json: str) -> str:  # noqa: D401
         req = json.loads(req_json)
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._build_async(req))
+        return loop.run_until_complete(self._build_async(req)).to_json()
 
     @tool(description="Repair an existing schedule with new job set. Arg JSON {\"baseline\": {...}, \"jobs_add\": [...], \"due_dates\": [...]} ")
     def reschedule_delta(self, req_json: str) -> str:  # noqa: D401
         req = json.loads(req_json)
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._delta_async(req))
+        return loop.run_until_complete(self._delta_async(req)).to_json()
 
     @tool(description="Energy & CO₂ report for schedule. Arg JSON schedule object")
     def energy_report(self, sched_json: str) -> str:  # noqa: D401
         sched = json.loads(sched_json)
         payload = self._energy_calc(sched.get("ops", []), sched.get("energy_rate", {}))
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     @tool(description="Monte‑Carlo what‑if. Arg JSON {\"jobs_base\": [...], \"nbr_samples\":int}")
     def what_if(self, req_json: str) -> str:  # noqa: D401
         req = json.loads(req_json)
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._what_if_async(req))
+        return loop.run_until_complete(self._what_if_async(req)).to_json()
 
     # ------------------------------------------------------------------
     # Orchestrator lifecycle -------------------------------------------
@@ -253,10 +241,10 @@ class ManufacturingAgent(AgentBase):
     # Core scheduling ---------------------------------------------------
     # ------------------------------------------------------------------
 
-    async def _build_async(self, req: Dict[str, Any]):
+    async def _build_async(self, req: Dict[str, Any]) -> MCPEnvelope:
         jobs: List[List[Dict[str, Any]]] = req.get("jobs", [])
         if not jobs:
-            return json.dumps(_wrap_mcp(self.NAME, {"error": "no_jobs"}))
+            return wrap_mcp(self.NAME, {"error": "no_jobs"})
 
         due_dates: Optional[List[int]] = req.get("due_dates")
         maintenance = req.get("maintenance", [])  # list of {machine,start,end}
@@ -277,14 +265,15 @@ class ManufacturingAgent(AgentBase):
                 _lateness.labels(job_id=j_id).set(max(0, end - dd))
             _energy_g.set(payload["energy"]["kwh"])
 
-        # Streams ------------------------------------------------------
-        _publish("mf.schedule", payload)
+        # Streams (one envelope, serialised once for bus and Kafka) ----
+        env = wrap_mcp(self.NAME, payload)
+        _publish("mf.schedule", env)
         if self._producer:
-            self._producer.send(self.cfg.sched_topic, json.dumps(payload))
+            self._producer.send(self.cfg.sched_topic, env.to_bytes())
 
         # Trace graph --------------------------------------------------
-        await hub.broadcast({"label": "📅 schedule", "type": "planner", "meta": {"ops": len(sched["ops"])}})
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        hub.publish({"label": "📅 schedule", "type": "planner", "agent": self.NAME, "meta": {"ops": len(sched["ops"])}})
+        return env
 
     def _solve_cp(self, jobs, due_dates, maintenance):
         horizon = sum(sum(int(op["proc"]) for op in job) for job in jobs) * 2
@@ -351,7 +340,7 @@ class ManufacturingAgent(AgentBase):
         horizon_res = max(op["end"] for op in gantt)
         return {"horizon": horizon_res, "ops": gantt}
 
-    async def _delta_async(self, req: Dict[str, Any]):
+    async def _delta_async(self, req: Dict[str, Any]) -> MCPEnvelope:
         base = req.get("baseline", {}).get("ops", [])
         add = req.get("jobs_add", [])
         if not base:
@@ -368,7 +357,7 @@ class ManufacturingAgent(AgentBase):
         req2 = {**req, "jobs": jobs}
         return await self._build_async(req2)
 
-    async def _what_if_async(self, req: Dict[str, Any]):
+    async def _what_if_async(self, req: Dict[str, Any]) -> MCPEnvelope:
         base_jobs = req.get("jobs_base", [])
         samples = int(req.get("nbr_samples", 10))
         results = []
@@ -380,8 +369,7 @@ class ManufacturingAgent(AgentBase):
                 ]
                 for job in base_jobs
             ]
-            res = json.loads(await self._build_async({"jobs": perturbed}))
-            results.append(res["payload"] if "payload" in res else res)
+            results.append((await self._build_async({"jobs": perturbed})).payload)
         # simple stats
         mkspan = [max(op["end"] for op in r["ops"]) for r in results]
         payload = {
@@ -389,7 +377,7 @@ class ManufacturingAgent(AgentBase):
             "makespan_mean": float(np.mean(mkspan) if np is not None else sum(mkspan) / samples),
             "makespan_p95": float(np.percentile(mkspan, 95) if np is not None else sorted(mkspan)[int(0.95 * samples) - 1]),
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload)
 
     # ------------------------------------------------------------------
     # Energy calc -------------------------------------------------------
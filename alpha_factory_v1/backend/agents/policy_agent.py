@@ -39,7 +39,6 @@ from __future__ import annotations
 
 import asyncio
 import difflib
-import hashlib
 import json
 import logging
 import os
@@ -103,6 +102,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # type: ignore
 from backend.agents import AgentMetadata, register_agent  # type: ignore
 from backend.orchestrator import _publish  # type: ignore
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -114,20 +115,6 @@ def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.2",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
-
 def _chunks(text: str, max_len: int = 512) -> List[str]:
     """Sentence‑aware chunker (≈512 tokens)."""
     sents = re.split(r"(?<=[.!?])\s+", text)
@@ -268,7 +255,7 @@ class PolicyAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -290,20 +277,20 @@ class PolicyAgent(AgentBase):
     def compare_versions(self, req_json: str) -> str:  # noqa: D401
         req = json.loads(req_json)
         diff = self._diff(req.get("old", ""), req.get("new", ""))
-        return json.dumps(_wrap_mcp(self.NAME, {"diff": diff}))
+        return wrap_mcp(self.NAME, {"diff": diff}).to_json()
 
     @tool(description="Classify snippet into ISO 37301 risk categories. Arg JSON {'text':str}")
     def risk_tag(self, req_json: str) -> str:  # noqa: D401
         text = json.loads(req_json).get("text", "")
         risks = self._classify_risk(text)
-        return json.dumps(_wrap_mcp(self.NAME, {"risks": risks}))
+        return wrap_mcp(self.NAME, {"risks": risks}).to_json()
 
     @tool(description="Low‑level retrieval tool. Arg JSON {'query':str,'k':int}")
     def statute_search(self, req_json: str) -> str:  # noqa: D401
         args = json.loads(req_json)
         loop = asyncio.get_event_loop()
         hits = loop.run_until_complete(self.retriever.search(args.get("query", ""), int(args.get("k", 5))))
-        return json.dumps(_wrap_mcp(self.NAME, hits))
+        return wrap_mcp(self.NAME, hits).to_json()
 
     # ── Lifecycle (passive) ─────────────────────────────────────────────
     async def run_cycle(self):  # noqa: D401
@@ -335,7 +322,7 @@ class PolicyAgent(AgentBase):
             self._qps.inc()
         if self._producer:
             self._producer.send(self.cfg.exp_topic, json.dumps({"query": query, "ts": _now()}))
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     def _diff(self, old: str, new: str):
         diff = difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", fromfile="old", tofile="new")
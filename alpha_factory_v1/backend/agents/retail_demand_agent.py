@@ -32,7 +32,6 @@ unavailable the agent silently falls back to local stubs.
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import math
@@ -89,6 +88,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish  # structured‑event helper
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -182,19 +183,6 @@ def _calc_reorder(df_fc: "pd.DataFrame", service_lvl: float) -> List[Dict[str, A
 # Governance helpers  --------------------------------------------------------
 # ---------------------------------------------------------------------------
 
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    return {
-        "mcp_version": "0.1",
-        "agent": agent,
-        "ts": datetime.now(timezone.utc).isoformat(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
 
 # ---------------------------------------------------------------------------
 # RetailDemandAgent  ---------------------------------------------------------
@@ -224,7 +212,7 @@ class RetailDemandAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -240,12 +228,12 @@ class RetailDemandAgent(AgentBase):
     @tool(description="Return SKU‑level weekly demand forecast (mean & std dev) for the next horizon_weeks")
     def forecast(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._forecast_async())
+        return loop.run_until_complete(self._forecast_async()).to_json()
 
     @tool(description="Generate a reorder plan that meets the configured service level (>98 % by default)")
     def reorder_plan(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._plan_async())
+        return loop.run_until_complete(self._plan_async()).to_json()
 
     # ------------------------------------------------------------------
     # Orchestrator life‑cycle
@@ -254,7 +242,7 @@ class RetailDemandAgent(AgentBase):
     async def run_cycle(self):  # noqa: D401
         await self._refresh_datasets()
         envelope = await self._plan_async()
-        _publish("retail.reorder", json.loads(envelope))
+        _publish("retail.reorder", envelope)
         if self._producer:
             self._producer.send(self.cfg.tx_topic, envelope)
 
@@ -289,9 +277,9 @@ class RetailDemandAgent(AgentBase):
     # Forecast helper
     # ------------------------------------------------------------------
 
-    async def _forecast_async(self) -> str:
+    async def _forecast_async(self) -> MCPEnvelope:
         if pd is None:
-            return json.dumps(_wrap_mcp(self.NAME, []))
+            return wrap_mcp(self.NAME, [])
         horizon = self.cfg.horizon_weeks
         today = datetime.now(timezone.utc).date()
         rows: List[Dict[str, Any]] = []
@@ -308,17 +296,16 @@ class RetailDemandAgent(AgentBase):
         df["mean"], df["hi"], df["lo"] = mu, hi, lo
         df["std"] = (df["hi"] - df["lo"]) / 2.56  # 90 % interval ≈ ±1.28σ
         forecast = df.to_dict(orient="records")
-        return json.dumps(_wrap_mcp(self.NAME, forecast))
+        return wrap_mcp(self.NAME, forecast)
 
     # ------------------------------------------------------------------
     # Reorder planning helper
     # ------------------------------------------------------------------
 
-    async def _plan_async(self) -> str:
+    async def _plan_async(self) -> MCPEnvelope:
         if pd is None:
-            return json.dumps(_wrap_mcp(self.NAME, []))
-        fc_payload = json.loads(await self._forecast_async())
-        df_fc = pd.DataFrame(fc_payload["payload"])
+            return wrap_mcp(self.NAME, [])
+        df_fc = pd.DataFrame((await self._forecast_async()).payload)
         df_fc["on_hand"] = df_fc["mean"] * random.uniform(0.2, 0.5)
         recs = _calc_reorder(df_fc, self.cfg.service_level)
 
@@ -337,7 +324,7 @@ class RetailDemandAgent(AgentBase):
                 recs = json.loads(chat.choices[0].message.content)
             except Exception as exc:  # noqa: BLE001
                 logger.warning("OpenAI rationale generation failed: %s", exc)
-        return json.dumps(_wrap_mcp(self.NAME, recs))
+        return wrap_mcp(self.NAME, recs)
 
     # ------------------------------------------------------------------
     # ADK mesh registration
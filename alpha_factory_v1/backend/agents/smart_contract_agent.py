@@ -33,7 +33,6 @@ DO NOT EDIT BELOW THIS LINE UNLESS THROUGH CANMORE.
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -43,10 +42,10 @@ import subprocess
 import sys
 import tempfile
 from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
 from pathlib import Path
 from shlex import quote
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional
 
 # ---------------------------------------------------------------------------
 # Soft‑optional dependencies — import‑guarded to keep cold‑start <50 ms
@@ -97,6 +96,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -118,26 +119,6 @@ def _env_float(key: str, default: float) -> float:
         return default
 
 
-def _now() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def _digest(obj: Any) -> str:
-    return hashlib.sha256(
-        json.dumps(obj, separators=(",", ":"), sort_keys=True).encode()
-    ).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    """Wrap arbitrary payload in Model Context Protocol envelope."""
-    return {
-        "mcp_version": "0.1",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
 # ---------------------------------------------------------------------------
 # Config dataclass
 # ---------------------------------------------------------------------------
@@ -208,7 +189,7 @@ class SmartContractAgent(AgentBase):
         self._producer = (
             KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
             if self.cfg.kafka_broker and KafkaProducer
             else None
@@ -231,7 +212,7 @@ class SmartContractAgent(AgentBase):
         src: Optional[str] = args.get("source")
         addr: Optional[str] = args.get("address")
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._audit_async(src, addr))
+        return loop.run_until_complete(self._audit_async(src, addr)).to_json()
 
     @tool(
         description="Suggest gas‑saving refactors. Input: JSON {\"source\": str, \"budget_gwei\": int?}"
@@ -261,7 +242,7 @@ class SmartContractAgent(AgentBase):
         sample = next(self.cfg.data_root.glob("*.sol"), None)
         if sample:
             env = await self._audit_async(sample.read_text(), None)
-            _publish("sc.audit", json.loads(env))
+            _publish("sc.audit", env)
             if self._producer:
                 self._producer.send(self.cfg.tx_topic, env)
 
@@ -271,13 +252,13 @@ class SmartContractAgent(AgentBase):
 
     async def _audit_async(
         self, source: Optional[str] = None, address: Optional[str] = None
-    ) -> str:
+    ) -> MCPEnvelope:
         if not source and not address:
-            return json.dumps(_wrap_mcp(self.NAME, {"error": "no_input"}))
+            return wrap_mcp(self.NAME, {"error": "no_input"})
 
         src = source or await self._fetch_source(address)  # type: ignore[arg-type]
         if not src:
-            return json.dumps(_wrap_mcp(self.NAME, {"error": "source_not_found"}))
+            return wrap_mcp(self.NAME, {"error": "source_not_found"})
 
         vulns: list[str] = []
         gas_usage: int | None = None
@@ -310,14 +291,14 @@ class SmartContractAgent(AgentBase):
             "risk_VaR": risk,
             "chain_id": self.cfg.chain_id,
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload)
 
     async def _optimize_async(self, source: str, budget: int) -> str:
         """Heuristic + LLM suggestions for gas optimisation."""
         suggestions: list[str] = []
 
         if not source:
-            return json.dumps(_wrap_mcp(self.NAME, []))
+            return wrap_mcp(self.NAME, []).to_json()
 
         patterns = {
             r"require\(([^,]+),": "Replace `require` strings with custom errors (SAVE ~20 gas)",
@@ -349,7 +330,7 @@ class SmartContractAgent(AgentBase):
         # Remove duplicates while preserving order
         seen = set()
         suggestions = [s for s in suggestions if not (s in seen or seen.add(s))]
-        return json.dumps(_wrap_mcp(self.NAME, {"suggestions": suggestions[:10]}))
+        return wrap_mcp(self.NAME, {"suggestions": suggestions[:10]}).to_json()
 
     async def _gas_async(self, bytes_len: int) -> str:
         price = await self._get_gas_price()
@@ -361,7 +342,7 @@ class SmartContractAgent(AgentBase):
             "p95_gwei": hist[int(0.95 * len(hist))],
             "tx_cost_eth": cost_eth,
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     # ------------------------------------------------------------------
     # Internal helpers
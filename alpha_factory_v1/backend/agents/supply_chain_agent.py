@@ -29,7 +29,6 @@ are absent it degrades gracefully to public datasets & in‑memory stubs.
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -84,6 +83,7 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import‑error
 from backend.agents import AgentMetadata, register_agent  # pylint: disable=import‑error
 from backend.orchestrator import _publish  # re‑use event bus hook
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -186,14 +186,14 @@ class SupplyChainAgent(AgentBase):  # noqa: D101
     @tool(description="Run an end‑to‑end supply‑chain replanning cycle and return JSON recommendations.")
     def replan(self) -> str:  # noqa: D401
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._plan_cycle())
+        return loop.run_until_complete(self._plan_cycle()).to_json()
 
     # ------------------------ orchestrator hook ----------------------- #
 
     async def run_cycle(self):  # noqa: D401
         await self._refresh_datasets()
         envelope = await self._plan_cycle()
-        _publish("sc.recommend", json.loads(envelope))
+        _publish("sc.recommend", envelope)
 
     # ------------------------ data ingestion ------------------------- #
 
@@ -213,13 +213,12 @@ class SupplyChainAgent(AgentBase):  # noqa: D101
 
     # ------------------------- planning ------------------------------ #
 
-    async def _plan_cycle(self) -> str:  # noqa: D401
+    async def _plan_cycle(self) -> MCPEnvelope:  # noqa: D401
         g = self._build_network()
         plan = _min_cost_flow(g)
         recs = self._postprocess(plan)
-        mcp = self._wrap_mcp(recs)
         logger.info("[SC] issued %d actions", len(recs))
-        return json.dumps(mcp)
+        return wrap_mcp(self.NAME, recs)
 
     def _build_network(self) -> nx.DiGraph:  # noqa: D401
         g = nx.DiGraph()
@@ -259,18 +258,6 @@ class SupplyChainAgent(AgentBase):  # noqa: D101
                 logger.warning("OpenAI enrichment failed: %s", exc)
         return recs
 
-    # -------------------- governance wrappers ------------------------ #
-
-    def _wrap_mcp(self, payload: Any) -> Dict[str, Any]:  # noqa: D401
-        raw = json.dumps(payload, separators=(",", ":"))
-        return {
-            "mcp_version": "0.1",
-            "ts": time.time(),
-            "agent": self.NAME,
-            "digest": hashlib.sha256(raw.encode()).hexdigest(),
-            "payload": payload,
-        }
-
     # -------------------- ADK mesh handshake ------------------------ #
 
     async def _register_mesh(self):  # noqa: D401
@@ -33,7 +33,6 @@ Copyright © 2025 Montreal.AI — Apache‑2.0 licence.
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -100,6 +99,8 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.agent_base import AgentBase  # pylint: disable=import-error
 from backend.agents import AgentMetadata, register_agent
 from backend.orchestrator import _publish
+from backend.event_bus import encode  # envelopes / pre-encoded values pass through
+from backend.mcp import MCPEnvelope, wrap_mcp  # shared single-serialisation envelope
 
 logger = logging.getLogger(__name__)
 
@@ -118,24 +119,6 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
-def _digest(payload: Any) -> str:
-    return hashlib.sha256(
-        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
-    ).hexdigest()
-
-
-def _wrap_mcp(agent: str, payload: Any) -> Dict[str, Any]:
-    """Wrap a payload in a Model Context Protocol envelope."""
-
-    return {
-        "mcp_version": "0.1",
-        "agent": agent,
-        "ts": _now(),
-        "digest": _digest(payload),
-        "payload": payload,
-    }
-
-
 # ==========================================================================
 # Configuration                                                             |
 # ==========================================================================
@@ -246,6 +229,7 @@ class TalentMatchAgent(AgentBase):
     REQUIRES_API_KEY = False
 
     CYCLE_SECONDS = TMConfig().cycle_seconds
+    PRIORITY = 2  # batch resume ingestion; first to yield under overload
 
     def __init__(self, cfg: TMConfig | None = None):
         self.cfg = cfg or TMConfig()
@@ -265,7 +249,7 @@ class TalentMatchAgent(AgentBase):
         if self.cfg.kafka_broker and KafkaProducer:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.cfg.kafka_broker,
-                value_serializer=lambda v: json.dumps(v).encode(),
+                value_serializer=encode,
             )
         else:
             self._producer = None
@@ -328,7 +312,7 @@ class TalentMatchAgent(AgentBase):
         jd = args.get("jd", "")
         topk = int(args.get("topk", 5))
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._recommend_async(jd, topk))
+        return loop.run_until_complete(self._recommend_async(jd, topk)).to_json()
 
     @tool(description="Similarity & skill gap between JD and resume. Arg: JSON {\"jd\":str, \"resume\":str}")
     def score_match(self, args_json: str) -> str:  # noqa: D401
@@ -358,7 +342,7 @@ class TalentMatchAgent(AgentBase):
         await self._ingest_events()
         jd = "Senior ML Engineer with RL & distributed systems"
         env = await self._recommend_async(jd, 5)
-        _publish("tm.reco", json.loads(env))
+        _publish("tm.reco", env)
         if self._producer:
             self._producer.send(self.cfg.tx_topic, env)
 
@@ -407,7 +391,7 @@ class TalentMatchAgent(AgentBase):
     #   Core async tasks
     # -------------------------------------------------------------
 
-    async def _recommend_async(self, jd: str, topk: int):
+    async def _recommend_async(self, jd: str, topk: int) -> MCPEnvelope:
         vec = self._embedder.encode([jd])
         sims = self._index.query(vec, topk)
         recs = []
@@ -420,7 +404,7 @@ class TalentMatchAgent(AgentBase):
                 "predicted_PAT": round(pat, 2),
                 "headline": meta.get("summary", "")[:120],
             })
-        return json.dumps(_wrap_mcp(self.NAME, recs))
+        return wrap_mcp(self.NAME, recs)
 
     async def _score_async(self, jd: str, resume: str):
         v1, v2 = self._embedder.encode([jd, resume])
@@ -434,7 +418,7 @@ class TalentMatchAgent(AgentBase):
             "cloud": bool(re.search("cloud", jd, re.I)) and not re.search("cloud", resume, re.I),
         }
         payload = {"similarity": round(sim, 3), "gap": gap}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     async def _dei_async(self, ids: List[str]):
         demo = [self._meta.get(cid, {}) for cid in ids]
@@ -450,16 +434,16 @@ class TalentMatchAgent(AgentBase):
             "diversity_ratio": round(ratio, 2),
             "passes_4:5_rule": compliant,
         }
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     async def _offer_async(self, cid: str, offer_usd: float):
         meta = self._meta.get(cid)
         if not meta:
-            return json.dumps(_wrap_mcp(self.NAME, {"error": "unknown_id"}))
+            return wrap_mcp(self.NAME, {"error": "unknown_id"}).to_json()
         baseline = 0.6  # base hire probability
         prob = min(0.95, baseline + (offer_usd - 100_000) / 400_000)
         payload = {"candidate_id": cid, "offer_usd": offer_usd, "hire_prob": round(prob, 3)}
-        return json.dumps(_wrap_mcp(self.NAME, payload))
+        return wrap_mcp(self.NAME, payload).to_json()
 
     # -------------------------------------------------------------
     #   ADK mesh
@@ -0,0 +1,309 @@
+"""backend.event_bus
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Batched, non‑blocking event bus behind ``orchestrator._publish`` and
+``backend.agents._emit_kafka``.
+
+``publish()`` only serialises the payload and appends it to a per‑topic
+buffer; a single background thread drains the buffers when either the
+*linger* deadline of the oldest record expires or a topic reaches its
+*max batch* size.  Network I/O therefore never happens on the event loop
+and no call ever waits for a broker round‑trip.
+
+* **Kafka** (optional) – records are handed to ``KafkaProducer`` with
+  batch‑level compression; the producer is flushed once on shutdown, not
+  per message.
+* **Local ring** – every record is also kept in a bounded in‑memory ring
+  so in‑process consumers (dashboards, tests, offline runs without a
+  broker) can read the stream via :meth:`EventBus.read`.
+* **Metrics** – enqueue→dispatch latency and dropped records (overflow,
+  send errors) are exported to Prometheus when available.
+
+Environment
+-----------
+ALPHA_KAFKA_BROKER        bootstrap servers (absent → ring only)
+ALPHA_BUS_LINGER_MS       max time a record waits for its batch (50)
+ALPHA_BUS_MAX_BATCH       records per topic that trigger a flush (500)
+ALPHA_BUS_MAX_PENDING     per‑topic buffer bound; oldest dropped (10000)
+ALPHA_BUS_RING_SIZE       records kept for local consumers (10000)
+ALPHA_BUS_COMPRESSION     Kafka compression codec (gzip | lz4 | zstd | none)
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from kafka import KafkaProducer  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    KafkaProducer = None  # type: ignore
+
+try:
+    from prometheus_client import Counter, Histogram  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Counter = Histogram = None  # type: ignore
+
+try:
+    import orjson as _orjson
+
+    def _dumps(obj: Any) -> bytes:  # noqa: D401
+        return _orjson.dumps(
+            obj, default=str, option=_orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY
+        )
+except ModuleNotFoundError:  # pragma: no cover
+    _orjson = None
+
+    def _dumps(obj: Any) -> bytes:  # noqa: D401
+        return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+logger = logging.getLogger("alpha_factory.event_bus")
+
+ENV = os.getenv
+
+# ----------------------------------------------------------------------------
+# Metrics (no‑ops if prometheus_client unavailable)
+# ----------------------------------------------------------------------------
+if Counter and Histogram:
+    MET_BUS_LAT = Histogram(
+        "event_bus_publish_latency_ms",
+        "Time from publish() to hand‑off to the transport",
+        ["topic"],
+        buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+    )
+    MET_BUS_DROP = Counter("event_bus_dropped_total", "Records dropped by the event bus", ["topic", "reason"])
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def observe(self, *_a):
+            pass
+
+        def inc(self, *_a):
+            pass
+
+    MET_BUS_LAT = MET_BUS_DROP = _Noop()
+
+
+class BusRecord(NamedTuple):
+    seq: int
+    topic: str
+    ts: float
+    value: bytes
+
+
+def encode(payload: Any) -> bytes:
+    """Serialise *payload* once; pre‑encoded values pass straight through."""
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode()
+    to_bytes = getattr(payload, "to_bytes", None)
+    if callable(to_bytes):
+        return to_bytes()
+    return _dumps(payload)
+
+
+class EventBus:
+    """Per‑topic batching publisher with a local ring for consumers."""
+
+    def __init__(
+        self,
+        broker: Optional[str] = None,
+        *,
+        linger_ms: float = 50.0,
+        max_batch: int = 500,
+        max_pending: int = 10_000,
+        ring_size: int = 10_000,
+        compression: Optional[str] = "gzip",
+    ) -> None:
+        self.linger = linger_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(self.max_batch, max_pending)
+
+        self._pending: Dict[str, Deque[Tuple[float, bytes]]] = {}
+        self._ring: Deque[BusRecord] = deque(maxlen=ring_size)
+        self._seq = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._inflight = 0  # batches popped but not yet dispatched
+        self._force = False  # flush(): ignore linger
+        self.dropped = 0
+
+        self._producer: Any = None
+        if broker and KafkaProducer is not None:
+            codec = None if (compression or "none").lower() == "none" else compression
+            try:
+                self._producer = KafkaProducer(
+                    bootstrap_servers=broker,
+                    compression_type=codec,
+                    linger_ms=int(linger_ms),
+                )
+            except Exception:  # noqa: BLE001
+                logger.exception("Kafka producer unavailable – using local ring only")
+
+        self._thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> "EventBus":
+        return cls(
+            ENV("ALPHA_KAFKA_BROKER"),
+            linger_ms=float(ENV("ALPHA_BUS_LINGER_MS", "50")),
+            max_batch=int(ENV("ALPHA_BUS_MAX_BATCH", "500")),
+            max_pending=int(ENV("ALPHA_BUS_MAX_PENDING", "10000")),
+            ring_size=int(ENV("ALPHA_BUS_RING_SIZE", "10000")),
+            compression=ENV("ALPHA_BUS_COMPRESSION", "gzip"),
+        )
+
+    # ------------------------------------------------------------------ #
+    # producer side                                                      #
+    # ------------------------------------------------------------------ #
+    def publish(self, topic: str, payload: Any) -> bool:
+        """Queue *payload* for *topic*; never blocks on I/O.
+
+        Returns ``False`` if the bus is closed.  When the topic buffer is
+        full the *oldest* record is dropped (and counted).
+        """
+        value = encode(payload)
+        with self._cond:
+            if self._closed:
+                MET_BUS_DROP.labels(topic, "closed").inc()
+                return False
+            buf = self._pending.get(topic)
+            if buf is None:
+                buf = self._pending[topic] = deque()
+            if len(buf) >= self.max_pending:
+                buf.popleft()
+                self.dropped += 1
+                MET_BUS_DROP.labels(topic, "overflow").inc()
+            buf.append((time.monotonic(), value))
+            if len(buf) == 1 or len(buf) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    # ------------------------------------------------------------------ #
+    # consumer side                                                      #
+    # ------------------------------------------------------------------ #
+    def read(self, topic: Optional[str] = None, after: int = 0, limit: int = 1000) -> List[BusRecord]:
+        """Return up to *limit* ring records with ``seq > after`` (oldest first)."""
+        with self._cond:
+            snapshot = list(self._ring)
+        out = [r for r in snapshot if r.seq > after and (topic is None or r.topic == topic)]
+        return out[:limit]
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every buffered record has been dispatched."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._force = True
+            self._cond.notify()
+            while (self._inflight or any(self._pending.values())) and time.monotonic() < deadline:
+                self._cond.wait(0.01)
+            self._force = False
+        if self._producer is not None:
+            try:
+                self._producer.flush(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:  # noqa: BLE001
+                logger.exception("Kafka flush failed")
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    # ------------------------------------------------------------------ #
+    # dispatcher thread                                                  #
+    # ------------------------------------------------------------------ #
+    def _take_ready(self, now: float) -> Tuple[List[Tuple[str, List[Tuple[float, bytes]]]], Optional[float]]:
+        """Pop batches that are full or lingered long enough (lock held)."""
+        ready: List[Tuple[str, List[Tuple[float, bytes]]]] = []
+        wait: Optional[float] = None
+        for topic, buf in self._pending.items():
+            if not buf:
+                continue
+            due = buf[0][0] + self.linger
+            if len(buf) >= self.max_batch or due <= now or self._closed or self._force:
+                n = min(len(buf), self.max_batch)
+                ready.append((topic, [buf.popleft() for _ in range(n)]))
+                if buf:
+                    wait = 0.0
+            else:
+                wait = due - now if wait is None else min(wait, due - now)
+        return ready, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                ready, wait = self._take_ready(time.monotonic())
+                if not ready:
+                    if self._closed:
+                        return
+                    self._cond.wait(wait)
+                    continue
+                self._inflight += len(ready)
+            for topic, batch in ready:
+                try:
+                    self._dispatch(topic, batch)
+                finally:
+                    with self._cond:
+                        self._inflight -= 1
+                        self._cond.notify_all()  # wake flush() waiters
+
+    def _dispatch(self, topic: str, batch: List[Tuple[float, bytes]]) -> None:
+        now_mono, now_wall = time.monotonic(), time.time()
+        records = [BusRecord(next(self._seq), topic, now_wall, value) for _, value in batch]
+        with self._cond:
+            self._ring.extend(records)
+
+        if self._producer is not None:
+            for _, value in batch:
+                try:
+                    self._producer.send(topic, value)
+                except Exception:  # noqa: BLE001
+                    self.dropped += 1
+                    MET_BUS_DROP.labels(topic, "send_error").inc()
+                    logger.exception("Kafka send failed (topic=%s)", topic)
+        elif logger.isEnabledFor(logging.DEBUG):
+            for _, value in batch:
+                logger.debug("EVT %-24s %s", topic, value.decode(errors="replace"))
+
+        lat = MET_BUS_LAT.labels(topic)
+        for enq, _ in batch:
+            lat.observe((now_mono - enq) * 1000)
+
+
+# ----------------------------------------------------------------------------
+# Process‑wide singleton
+# ----------------------------------------------------------------------------
+_BUS: Optional[EventBus] = None
+_BUS_LOCK = threading.Lock()
+
+
+def get_bus() -> EventBus:
+    """Return the shared bus, creating it from the environment on first use."""
+    global _BUS
+    if _BUS is None:
+        with _BUS_LOCK:
+            if _BUS is None:
+                _BUS = EventBus.from_env()
+                atexit.register(_BUS.close)
+    return _BUS
+
+
+def publish(topic: str, payload: Any) -> bool:
+    """Shortcut for ``get_bus().publish(topic, payload)``."""
+    return get_bus().publish(topic, payload)
+
+
+__all__ = ["BusRecord", "EventBus", "encode", "get_bus", "publish"]
@@ -119,8 +119,8 @@ class FinanceAgent:
             else _pct_change_py(hist)
         )
 
-        last_prices = (
-            hist.iloc[-1].to_dict()
+        last_prices = self._book_prices(
+            hist.iloc[-1]
             if _HAS_SCI and isinstance(hist, pd.DataFrame)
             else {k: v[-1] for k, v in hist.items()}
         )
@@ -194,21 +194,27 @@ class FinanceAgent:
     #                           EXECUTION                                #
     # ------------------------------------------------------------------ #
     async def _execute_orders(self, targets: Dict[str, float]) -> None:
-        for symbol, tgt_w in targets.items():
-            pos_qty = self.portfolio.position(symbol)
-            price = await self.market.last_price(symbol)
-            port_val = self.portfolio.value(
-                await self.market.last_prices(self.universe)
-            )
-            tgt_dollar = tgt_w * port_val
-            tgt_qty = tgt_dollar / price
-            delta = tgt_qty - pos_qty
-            if abs(delta) * price < 1:  # ignore dust
-                continue
-            side = "BUY" if delta > 0 else "SELL"
-            await self.broker.submit_order(symbol, abs(delta), side)
-            self.portfolio.record_fill(symbol, abs(delta), price, side)
-            if Gauge:
+        fills = []
+        last = await self.market.last_prices(self.universe)
+        port_val = self.portfolio.value(last)  # once per rebalance, not per symbol
+        try:
+            for symbol, tgt_w in targets.items():
+                pos_qty = self.portfolio.position(symbol)
+                price = last[symbol] if symbol in last else await self.market.last_price(symbol)
+                tgt_dollar = tgt_w * port_val
+                tgt_qty = tgt_dollar / price
+                delta = tgt_qty - pos_qty
+                if abs(delta) * price < 1:  # ignore dust
+                    continue
+                side = "BUY" if delta > 0 else "SELL"
+                await self.broker.submit_order(symbol, abs(delta), side)
+                fills.append((symbol, abs(delta), price, side))
+        finally:
+            # one log write + one trace event for the whole rebalance – also
+            # when a submit fails midway, so the ledger matches the broker
+            self.portfolio.record_fills(fills)
+        if Gauge:
+            for symbol, _, price, _ in fills:
                 self.pnl_gauge.labels(symbol=symbol).set(
                     self.portfolio.unrealised_pnl(symbol, price)
                 )
@@ -221,14 +227,20 @@ class FinanceAgent:
         start = end - timedelta(days=self.lookback)
         return await self.market.history(self.universe, start, end)
 
+    def _book_prices(self, last):
+        """*last* prices as a vector aligned with the position book (its fast path).
+
+        A pandas Series is re‑indexed in one vectorised step; anything else
+        is returned unchanged (the book maps it symbol by symbol).
+        """
+        book = getattr(self.portfolio, "book", None)
+        if book is not None and _HAS_SCI and isinstance(last, pd.Series):
+            return last.reindex(book.symbols).to_numpy(dtype=float)
+        return last
+
     def _current_weights(self, last_prices) -> Dict[str, float]:
-        port_val = self.portfolio.value(last_prices)
-        if port_val == 0:
-            return {s: 0.0 for s in self.universe}
-        return {
-            s: (self.portfolio.position(s) * last_prices[s]) / port_val
-            for s in self.universe
-        }
+        held = self.portfolio.weights(last_prices)  # whole book in one pass
+        return {s: held.get(s, 0.0) for s in self.universe}
 
     # ------------------------------------------------------------------ #
     #                               UTILS                                #
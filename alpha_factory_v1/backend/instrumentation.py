@@ -0,0 +1,165 @@
+"""backend.instrumentation
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Always‑on, low‑overhead phase instrumentation for every agent.
+
+A *phase* is one step of an agent cycle (``observe`` / ``think`` /
+``vet`` / ``act`` for :class:`backend.agent_base.AgentBase`, ``cycle``
+for the whole ``run_cycle`` of any agent).  For each phase we record:
+
+* **wall time**   – ``time.perf_counter``
+* **CPU time**    – ``time.thread_time`` of the executing thread (sync
+  code only: across an ``await`` other coroutines would be billed too)
+* **allocations** – net change of ``sys.getallocatedblocks()``; process
+  wide, so concurrent threads add noise, but it costs one C call
+* **payload size** – bytes of the phase output, measured here only when
+  it is free (``len`` of str / bytes / MCP envelopes, which are encoded
+  once and cached).  Anything else is left out of ``timing`` and the
+  tracer fills it in from the encode its writer thread already does –
+  so only sampled spans pay for it, and never on the cycle thread.
+
+Numbers go to Prometheus histograms and are returned as a ``timing``
+dict that :class:`backend.tracer.Tracer` attaches to the phase span.
+Per phase the overhead is a handful of clock reads.
+
+Usage::
+
+    with phase(self.name, "observe") as ph:
+        obs = ph.out(self.observe())
+    self.tracer.record(self.name, "observe", obs, timing=ph.timing)
+
+Environment
+-----------
+ALPHA_INSTRUMENT   set to ``0`` to disable (context manager becomes a no‑op)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from prometheus_client import Histogram  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Histogram = None  # type: ignore
+
+from .event_bus import encode
+
+ENABLED = os.getenv("ALPHA_INSTRUMENT", "1") != "0"
+
+# ----------------------------------------------------------------------------
+# Metrics (no‑ops if prometheus_client unavailable)
+# ----------------------------------------------------------------------------
+_MS_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 30000, 120000)
+
+if Histogram:
+    MET_PHASE_WALL = Histogram("agent_phase_wall_ms", "Wall time per agent phase", ["agent", "phase"], buckets=_MS_BUCKETS)
+    MET_PHASE_CPU = Histogram("agent_phase_cpu_ms", "Thread CPU time per agent phase", ["agent", "phase"], buckets=_MS_BUCKETS)
+    MET_PHASE_ALLOC = Histogram(
+        "agent_phase_alloc_blocks", "Net allocated blocks per agent phase", ["agent", "phase"],
+        buckets=(0, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+    )
+    MET_PHASE_BYTES = Histogram(
+        "agent_phase_payload_bytes", "Encoded size of a phase output", ["agent", "phase"],
+        buckets=(64, 256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216),
+    )
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def observe(self, *_a):
+            pass
+
+    MET_PHASE_WALL = MET_PHASE_CPU = MET_PHASE_ALLOC = MET_PHASE_BYTES = _Noop()
+
+
+def _known_size(obj: Any) -> Optional[int]:
+    """Byte size of *obj* if it is already encoded, else ``None``."""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode())
+    to_bytes = getattr(obj, "to_bytes", None)
+    if callable(to_bytes):
+        try:
+            return len(to_bytes())
+        except TypeError:  # e.g. int.to_bytes needs arguments
+            pass
+    return None
+
+
+def payload_size(obj: Any) -> int:
+    """Encoded byte size of *obj*; 0 if it cannot be encoded."""
+    size = _known_size(obj)
+    if size is not None:
+        return size
+    try:
+        return len(encode(obj))
+    except (TypeError, ValueError):
+        return 0
+
+
+def observe_size(agent: str, name: str, size: int) -> None:
+    """Record a phase payload size measured outside :class:`phase`."""
+    MET_PHASE_BYTES.labels(agent, name).observe(size)
+
+
+_MISSING = object()
+
+
+class phase:  # noqa: N801 – used like a function: ``with phase(...)``
+    """Measure one agent phase; see module docstring."""
+
+    __slots__ = ("agent", "name", "cpu", "timing", "_payload", "_t0", "_c0", "_b0")
+
+    def __init__(self, agent: str, name: str, *, cpu: bool = True) -> None:
+        self.agent = agent
+        self.name = name
+        self.cpu = cpu
+        self.timing: Optional[Dict[str, Any]] = None
+        self._payload: Any = _MISSING
+
+    def out(self, payload: Any) -> Any:
+        """Remember *payload* as the phase output and return it unchanged."""
+        self._payload = payload
+        return payload
+
+    def __enter__(self) -> "phase":
+        if ENABLED:
+            self._b0 = sys.getallocatedblocks()
+            self._c0 = time.thread_time() if self.cpu else 0.0
+            self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb) -> None:
+        if not ENABLED:
+            return
+        wall = (time.perf_counter() - self._t0) * 1000
+        cpu = (time.thread_time() - self._c0) * 1000 if self.cpu else None
+        alloc = sys.getallocatedblocks() - self._b0
+        has_out = self._payload is not _MISSING
+        size = _known_size(self._payload) if has_out else None
+        self.timing = {
+            "wall_ms": round(wall, 3),
+            "cpu_ms": None if cpu is None else round(cpu, 3),
+            "alloc_blocks": alloc,
+            "payload_bytes": size,
+            "ok": exc_type is None,
+        }
+        if has_out and size is None:  # measured by the tracer writer, if sampled
+            del self.timing["payload_bytes"]
+        labels = (self.agent, self.name)
+        MET_PHASE_WALL.labels(*labels).observe(wall)
+        if cpu is not None:
+            MET_PHASE_CPU.labels(*labels).observe(cpu)
+        MET_PHASE_ALLOC.labels(*labels).observe(max(0, alloc))
+        if size is not None:
+            MET_PHASE_BYTES.labels(*labels).observe(size)
+
+
+__all__ = ["ENABLED", "observe_size", "payload_size", "phase"]
@@ -0,0 +1,278 @@
+"""backend.loop_monitor
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Event‑loop lag monitor, blocked‑loop watchdog and sampling profiler,
+served next to Prometheus on the orchestrator's ``METRICS_PORT``.
+
+* **Lag** – a tiny coroutine sleeps ``interval`` and measures how late it
+  wakes up; the delay is exported continuously (histogram + last value).
+* **Watchdog** – a helper thread checks that the lag coroutine keeps
+  ticking.  When the loop is stuck for longer than ``block_threshold``
+  (a sync ``openai.ChatCompletion.create``, a Slither subprocess …) it
+  grabs the loop thread's stack with ``sys._current_frames()``, logs it
+  with the running task's name and keeps it for ``/debug/loop``.
+* **Profiler** – ``/debug/profile?seconds=10&hz=100`` samples every
+  thread's stack for the given time and returns *collapsed stacks*
+  (``thread;outer;…;inner count`` per line) ready for ``flamegraph.pl``
+  or speedscope.  Only one profile runs at a time.
+
+Endpoints
+---------
+/metrics         Prometheus exposition (when ``prometheus_client`` exists)
+/healthz         ``ok``
+/debug/loop      JSON: lag stats + recent blocked‑loop incidents
+/debug/profile   text/plain collapsed stacks
+
+Environment
+-----------
+ALPHA_LOOP_LAG_INTERVAL_MS   lag probe period (100)
+ALPHA_LOOP_BLOCK_MS          blocked‑loop report threshold (250)
+ALPHA_PROFILE_MAX_SEC        upper bound for ``seconds`` (60)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Tally
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Counter = Gauge = Histogram = generate_latest = None  # type: ignore
+    CONTENT_TYPE_LATEST = "text/plain"
+
+logger = logging.getLogger("alpha_factory.loop_monitor")
+
+ENV = os.getenv
+
+# ----------------------------------------------------------------------------
+# Metrics (no‑ops if prometheus_client unavailable)
+# ----------------------------------------------------------------------------
+if Counter and Gauge and Histogram:
+    MET_LOOP_LAG = Histogram(
+        "event_loop_lag_ms", "Event‑loop wake‑up delay", buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+    )
+    MET_LOOP_LAG_LAST = Gauge("event_loop_lag_last_ms", "Most recent event‑loop wake‑up delay")
+    MET_LOOP_BLOCKED = Counter("event_loop_blocked_total", "Times the loop was blocked beyond the threshold")
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def observe(self, *_a):
+            pass
+
+        def inc(self, *_a):
+            pass
+
+        def set(self, *_a):
+            pass
+
+    MET_LOOP_LAG = MET_LOOP_LAG_LAST = MET_LOOP_BLOCKED = _Noop()
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+class LoopMonitor:
+    """Measure lag of *one* asyncio loop and catch the calls that block it."""
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.25, keep: int = 20) -> None:
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.incidents: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "LoopMonitor":
+        return cls(
+            interval=float(ENV("ALPHA_LOOP_LAG_INTERVAL_MS", "100")) / 1000,
+            block_threshold=float(ENV("ALPHA_LOOP_BLOCK_MS", "250")) / 1000,
+        )
+
+    # ------------------------------------------------------------------ #
+    # lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+    def start(self) -> None:
+        """Attach to the running loop (call from inside it)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = self._loop.create_task(self._probe(), name="loop-monitor")
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    # ------------------------------------------------------------------ #
+    # lag probe (on the loop)                                            #
+    # ------------------------------------------------------------------ #
+    async def _probe(self) -> None:
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, (now - t0 - self.interval) * 1000)
+            self._beat = now
+            self.last_lag_ms = lag
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+            MET_LOOP_LAG.observe(lag)
+            MET_LOOP_LAG_LAST.set(lag)
+
+    # ------------------------------------------------------------------ #
+    # watchdog (own thread)                                              #
+    # ------------------------------------------------------------------ #
+    def _watchdog(self) -> None:
+        reported = None  # beat already reported, one incident per stall
+        while not self._stop.wait(self.block_threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.block_threshold or beat == reported:
+                continue
+            reported = beat
+            self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)  # type: ignore[arg-type]
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+        task = None
+        if self._loop is not None:
+            try:
+                current = asyncio.current_task(self._loop)
+                task = current.get_name() if current is not None else None
+            except RuntimeError:
+                pass
+        incident = {"ts": time.time(), "blocked_ms": round(stalled * 1000, 1), "task": task, "stack": stack}
+        self.incidents.append(incident)
+        MET_LOOP_BLOCKED.inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms (task=%s) – stack:\n%s", stalled * 1000, task, stack
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "incidents": list(self.incidents),
+        }
+
+
+# ----------------------------------------------------------------------------
+# Sampling profiler
+# ----------------------------------------------------------------------------
+_PROFILE_LOCK = threading.Lock()
+
+
+def sample_profile(seconds: float, hz: float = 100.0) -> List[str]:
+    """Sample every thread's stack for *seconds*; return collapsed stacks.
+
+    Raises :class:`RuntimeError` if another profile is already running.
+    """
+    if not _PROFILE_LOCK.acquire(blocking=False):
+        raise RuntimeError("a profile is already running")
+    try:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        tally: _Tally = _Tally()
+        period = 1.0 / max(1.0, hz)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(tid) or f"thread-{tid}")
+                tally[";".join(reversed(stack))] += 1
+            time.sleep(period)
+        return [f"{stack} {n}" for stack, n in tally.most_common()]
+    finally:
+        _PROFILE_LOCK.release()
+
+
+# ----------------------------------------------------------------------------
+# Admin HTTP server (replaces prometheus_client.start_http_server)
+# ----------------------------------------------------------------------------
+class _AdminHandler(BaseHTTPRequestHandler):
+    monitor: Optional[LoopMonitor] = None
+    max_profile = 60.0
+
+    def _send(self, code: int, body: bytes, ctype: str = "text/plain; charset=utf-8") -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        if url.path in ("/", "/metrics"):
+            if generate_latest is None:
+                self._send(404, b"prometheus_client not installed\n")
+            else:
+                self._send(200, generate_latest(), CONTENT_TYPE_LATEST)
+        elif url.path == "/healthz":
+            self._send(200, b"ok\n")
+        elif url.path == "/debug/loop":
+            data = self.monitor.snapshot() if self.monitor else {}
+            self._send(200, json.dumps(data).encode(), "application/json")
+        elif url.path == "/debug/profile":
+            q = parse_qs(url.query)
+            try:
+                seconds = min(float(q.get("seconds", ["10"])[0]), self.max_profile)
+                hz = float(q.get("hz", ["100"])[0])
+            except ValueError:
+                self._send(400, b"seconds / hz must be numbers\n")
+                return
+            try:
+                lines = sample_profile(seconds, hz)
+            except RuntimeError as exc:
+                self._send(409, f"{exc}\n".encode())
+                return
+            self._send(200, ("\n".join(lines) + "\n").encode())
+        else:
+            self._send(404, b"not found\n")
+
+    def log_message(self, fmt: str, *args: Any) -> None:  # keep stderr quiet
+        logger.debug("admin %s - " + fmt, self.address_string(), *args)
+
+
+def start_admin_server(port: int, monitor: Optional[LoopMonitor] = None, addr: str = "") -> ThreadingHTTPServer:
+    """Serve metrics + debug endpoints on *port* from a daemon thread."""
+    handler = type("AdminHandler", (_AdminHandler,), {
+        "monitor": monitor,
+        "max_profile": float(ENV("ALPHA_PROFILE_MAX_SEC", "60")),
+    })
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="admin-http", daemon=True).start()
+    return server
+
+
+__all__ = ["LoopMonitor", "sample_profile", "start_admin_server"]
@@ -131,17 +131,13 @@ class ManufacturingAgent:
                 end = solver.Value(all_tasks[(j_id, len(jobs[j_id]) - 1)][1])
                 _delay_gauge.labels(job_id=j_id).set(max(0, end - dd))
 
-        awaitable = hub.broadcast(
+        hub.publish(  # sync ring append – no task per event
             {
                 "label": "🛠 schedule solved",
                 "type": "planner",
+                "agent": "manufacturing",
                 "meta": {"ops": len(all_tasks)},
             }
         )
-        # broadcast is fire‑and‑forget but may be awaited in tests
-        if hasattr(awaitable, "__await__"):  # pragma: no cover
-            import asyncio
-
-            asyncio.create_task(awaitable)
 
         return {"horizon": horizon, "ops": gantt}
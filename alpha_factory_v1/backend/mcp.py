@@ -0,0 +1,172 @@
+"""backend.mcp
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Shared **Model Context Protocol** envelope for every agent.
+
+The payload is serialised exactly once (canonical, key‑sorted JSON via
+``orjson`` when available).  The SHA‑256 digest is computed over those
+same bytes, and the full envelope is produced by splicing a small header
+around them — the payload is never encoded a second time.  The result
+is cached on the object, so ``_publish`` / the event bus, Kafka and the
+trace hub all reuse the identical buffer::
+
+    env = wrap_mcp("finance", {"orders": orders})
+    _publish("fin.orders", env)        # bus ships env.to_bytes()
+    return env.to_json()               # OpenAI tool result (str)
+
+``env.payload`` still references the original object for in‑process
+consumers, and ``env["payload"]`` / :meth:`as_dict` keep dict‑style
+callers working without a ``json.loads`` round‑trip.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+try:
+    import orjson as _orjson
+
+    _OPTS = _orjson.OPT_SORT_KEYS | _orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY
+
+    def _canonical(obj: Any) -> bytes:  # noqa: D401
+        return _orjson.dumps(obj, default=str, option=_OPTS)
+
+    def _dumps(obj: Any) -> bytes:  # noqa: D401
+        return _orjson.dumps(obj)
+except ModuleNotFoundError:  # pragma: no cover
+    # Same bytes as the orjson branch: UTF‑8 (not ``\u`` escapes), NaN/±inf
+    # as ``null``, non‑string keys stringified, NumPy values as lists.
+    def _plain(obj: Any) -> Any:
+        if isinstance(obj, float):
+            return obj if math.isfinite(obj) else None
+        if isinstance(obj, dict):
+            return {_key(k): _plain(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_plain(v) for v in obj]
+        return obj
+
+    def _key(k: Any) -> str:
+        if isinstance(k, str):
+            return k
+        if k is None or isinstance(k, (bool, int, float)):
+            return json.dumps(_plain(k))
+        return _default(k)
+
+    def _default(obj: Any) -> Any:
+        for attr in ("tolist", "isoformat"):  # NumPy arrays / scalars, datetimes
+            fn = getattr(obj, attr, None)
+            if callable(fn):
+                return _plain(fn())
+        return str(obj)
+
+    def _canonical(obj: Any) -> bytes:  # noqa: D401
+        return json.dumps(
+            _plain(obj), separators=(",", ":"), sort_keys=True, ensure_ascii=False, default=_default
+        ).encode()
+
+    def _dumps(obj: Any) -> bytes:  # noqa: D401
+        return json.dumps(_plain(obj), separators=(",", ":"), ensure_ascii=False).encode()
+
+MCP_VERSION = "0.2"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MCPEnvelope:
+    """Immutable MCP envelope holding *payload* with cached serialisation."""
+
+    __slots__ = ("agent", "payload", "ts", "version", "_payload_bytes", "_digest", "_bytes")
+
+    def __init__(
+        self,
+        agent: str,
+        payload: Any,
+        *,
+        ts: Optional[str] = None,
+        version: str = MCP_VERSION,
+    ) -> None:
+        self.agent = agent
+        self.payload = payload
+        self.ts = ts or _now()
+        self.version = version
+        self._payload_bytes: Optional[bytes] = None
+        self._digest: Optional[str] = None
+        self._bytes: Optional[bytes] = None
+
+    # ------------------------------------------------------------------ #
+    # serialisation (each step runs at most once)                        #
+    # ------------------------------------------------------------------ #
+    @property
+    def payload_bytes(self) -> bytes:
+        if self._payload_bytes is None:
+            self._payload_bytes = _canonical(self.payload)
+        return self._payload_bytes
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.payload_bytes).hexdigest()
+        return self._digest
+
+    def to_bytes(self) -> bytes:
+        """Envelope as UTF‑8 JSON; key order matches the legacy dict layout."""
+        if self._bytes is None:
+            self._bytes = b"".join((
+                b'{"mcp_version":', _dumps(self.version),
+                b',"agent":', _dumps(self.agent),
+                b',"ts":', _dumps(self.ts),
+                b',"digest":"', self.digest.encode(),
+                b'","payload":', self.payload_bytes,
+                b"}",
+            ))
+        return self._bytes
+
+    def to_json(self) -> str:
+        return self.to_bytes().decode()
+
+    __str__ = to_json
+
+    # ------------------------------------------------------------------ #
+    # dict compatibility                                                 #
+    # ------------------------------------------------------------------ #
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mcp_version": self.version,
+            "agent": self.agent,
+            "ts": self.ts,
+            "digest": self.digest,
+            "payload": self.payload,
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        return self.as_dict()[key]
+
+    def __repr__(self) -> str:
+        return f"MCPEnvelope(agent={self.agent!r}, ts={self.ts!r}, digest={self.digest[:12]}…)"
+
+    # pickle support for ``__slots__`` (process workers ship envelopes)
+    def __getstate__(self):
+        return (self.agent, self.payload, self.ts, self.version, self.to_bytes(), self.digest)
+
+    def __setstate__(self, state) -> None:
+        self.agent, self.payload, self.ts, self.version, self._bytes, self._digest = state
+        self._payload_bytes = None
+
+
+def wrap_mcp(agent: str, payload: Any) -> MCPEnvelope:
+    """Return an :class:`MCPEnvelope` for *payload* emitted by *agent*."""
+    return MCPEnvelope(agent, payload)
+
+
+def digest(payload: Any) -> str:
+    """Deterministic SHA‑256 of *payload* (same bytes as the envelope)."""
+    return hashlib.sha256(_canonical(payload)).hexdigest()
+
+
+__all__ = ["MCP_VERSION", "MCPEnvelope", "digest", "wrap_mcp"]
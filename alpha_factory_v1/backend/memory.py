@@ -4,49 +4,449 @@ Lightweight disk persistence used by the other components.
 The only thing that changed is the *default* directory: we now write inside
 `/tmp` (or whatever the  `AF_MEMORY_DIR`  environment variable specifies)
 instead of the system‑level  */var/alphafactory*  path that needs root.
+
+Records are appended to a segmented JSONL log:
+
+* **Group commit** – ``write()`` only queues the encoded line; a flusher
+  thread (or the first ``always`` writer that gets the lock) writes every
+  queued line with one ``write`` and at most one ``fsync``.
+* **Rotation** – the active ``events.jsonl`` is renamed to
+  ``events-<UTC stamp>.jsonl`` once it exceeds a size or age limit and is
+  optionally gzip‑compressed.
+* **Tail reads** – ``read(limit)`` seeks backwards from the end of the
+  newest segment(s) (see :mod:`backend.tail`), O(limit) not O(history).
+* **Indexed queries** – every commit also records ``(ts, agent, kind,
+  segment, offset, length)`` in an SQLite sidecar (``index.sqlite``);
+  ``query(agent=, kind=, since=, until=, limit=)`` looks matches up there
+  and reads only those lines.  Records of the active segment missing from
+  the index (a legacy file, a crash between log write and index insert,
+  another writer's lines) are indexed on open and before every commit,
+  read or query.
+* **Several writers** – instances in one or more processes may share a
+  directory: commits, rotation and reads hold an advisory lock on
+  ``events.lock`` (``fcntl.flock``), index offsets come from the real end
+  of the file (opened ``O_APPEND``), and an instance whose active file was
+  rotated by another one reopens it.
+
+Environment
+-----------
+AF_MEMORY_FSYNC         always | batch | none (batch)
+                        always – ``write()`` returns once the record is fsynced
+                        batch  – one fsync per group commit, in the background
+                        none   – flushed to the OS only
+AF_MEMORY_FLUSH_MS      group‑commit interval for batch / none (200)
+AF_MEMORY_SEGMENT_MB    rotate the active segment above this size (64)
+AF_MEMORY_SEGMENT_SEC   rotate the active segment after this age, 0 = never (0)
+AF_MEMORY_COMPRESS      gzip rotated segments (0)
 """
 
 from __future__ import annotations
 
+import atexit
+import contextlib
+import gzip
 import json
+import logging
 import os
+import shutil
+import sqlite3
 import tempfile
-from datetime import datetime
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .tail import tail_lines
+
+try:
+    import fcntl  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – Windows: single writer only
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger("alpha_factory.memory")
+
+_FSYNC_POLICIES = ("always", "batch", "none")
+_MAX_BATCH = 4096  # queued lines that wake the flusher early
+_ACTIVE = "events.jsonl"
+_LOCK = "events.lock"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY,
+    ts      TEXT NOT NULL,
+    agent   TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset  INTEGER NOT NULL,
+    length  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_ts         ON events(ts);
+CREATE INDEX IF NOT EXISTS events_agent_ts   ON events(agent, ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts    ON events(kind, ts);
+CREATE INDEX IF NOT EXISTS events_segment    ON events(segment, offset);
+"""
+
+TimeBound = Union[None, str, float, int, datetime]
+
+
+def _ts_key(value: TimeBound) -> Optional[str]:
+    """Normalise a time bound to the record ``ts`` format for comparison."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value, timezone.utc)
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds") + "Z"
 
 
 class Memory:
-    """Append‑only JSONL store; just good enough for unit‑tests & demos."""
+    """Append‑only, segmented JSONL store with group commit."""
 
-    def __init__(self, dir: str | os.PathLike | None = None) -> None:
+    def __init__(
+        self,
+        dir: str | os.PathLike | None = None,
+        *,
+        fsync: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        segment_bytes: Optional[int] = None,
+        segment_seconds: Optional[float] = None,
+        compress: Optional[bool] = None,
+    ) -> None:
         # Pick a safe, always‑writeable directory.
         if dir is None:
             dir = os.getenv("AF_MEMORY_DIR", Path(tempfile.gettempdir()) / "alphafactory")
         self.dir = Path(dir)
         self.dir.mkdir(parents=True, exist_ok=True)
 
-        self.file = self.dir / "events.jsonl"
+        self.file = self.dir / _ACTIVE
         if not self.file.exists():
             self.file.touch()
 
+        fsync = (fsync or os.getenv("AF_MEMORY_FSYNC", "batch")).lower()
+        self.fsync = fsync if fsync in _FSYNC_POLICIES else "batch"
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else float(os.getenv("AF_MEMORY_FLUSH_MS", "200")) / 1000
+        )
+        self.segment_bytes = segment_bytes or int(float(os.getenv("AF_MEMORY_SEGMENT_MB", "64")) * 1024 * 1024)
+        self.segment_seconds = (
+            segment_seconds if segment_seconds is not None else float(os.getenv("AF_MEMORY_SEGMENT_SEC", "0"))
+        )
+        self.compress = compress if compress is not None else os.getenv("AF_MEMORY_COMPRESS", "0") == "1"
+
+        self._cond = threading.Condition()  # guards the queue + counters
+        self._io_lock = threading.Lock()  # serialises commits / rotation
+        self._buf: List[Tuple[bytes, str, str, str]] = []  # (line, ts, agent, kind)
+        self._queued = 0  # records handed to write()
+        self._committed = 0  # records written (and fsynced per policy)
+        self._fh = None
+        self._lock_fh = (self.dir / _LOCK).open("ab")  # advisory lock shared by all writers
+        self._size = 0  # end of the active file as of our last commit
+        self._opened = time.time()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._db = sqlite3.connect(self._db_path(), timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        with self._locked():
+            self._catch_up()
+        _OPEN.add(self)
+
     # ------------------------------------------------------------------ I/O
     def write(self, agent: str, kind: str, data) -> None:
-        """Append one structured record to disk."""
+        """Append one structured record (durable per ``AF_MEMORY_FSYNC``)."""
         record = {
             "ts": datetime.utcnow().isoformat(timespec="seconds") + "Z",
             "agent": agent,
             "kind": kind,
             "data": data,
         }
-        with self.file.open("a", encoding="utf‑8") as fh:
-            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._append((json.dumps(record, ensure_ascii=False) + "\n").encode(), record["ts"], agent, kind)
+
+    def write_encoded(self, agent: str, kind: str, data: bytes) -> None:
+        """Like :meth:`write` for a ``data`` value already serialised as one-line JSON.
+
+        The bytes are spliced into the record as they are – not parsed or
+        encoded again.
+        """
+        ts = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        head = json.dumps({"ts": ts, "agent": agent, "kind": kind}, ensure_ascii=False)
+        self._append(head[:-1].encode() + b', "data": ' + data + b"}\n", ts, agent, kind)
+
+    def _append(self, line: bytes, ts: str, agent: str, kind: str) -> None:
+        with self._cond:
+            self._buf.append((line, ts, agent, kind))
+            self._queued += 1
+            mine = self._queued
+            if len(self._buf) >= _MAX_BATCH:
+                self._cond.notify()
+        if self.fsync == "always" or self._closed:
+            self._commit(upto=mine)
+        elif self._flusher is None:
+            self._start_flusher()
+
+    def flush(self) -> None:
+        """Commit everything queued so far."""
+        self._commit()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._commit()
+        with self._io_lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._lock_fh.close()
+        _OPEN.discard(self)
 
     def read(self, limit: int = 100):
         """Return *limit* most‑recent records (newest‑last)."""
-        with self.file.open(encoding="utf‑8") as fh:
-            lines = fh.readlines()[-limit:]
+        with self._locked():  # read‑your‑writes; no rotation between file and segments
+            self._commit_locked()
+            lines = tail_lines(self.file, limit)
+            for seg in reversed(self.segments()):
+                if len(lines) >= limit:
+                    break
+                lines = self._segment_tail(seg, limit - len(lines)) + lines
         return [json.loads(l) for l in lines]
 
+    def query(
+        self,
+        agent: Optional[str] = None,
+        kind: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """The *limit* most‑recent records matching every given filter (newest‑last).
 
-__all__ = ["Memory"]
+        *kind* ending in ``*`` matches a prefix (``"trace:*"``); *since* /
+        *until* are inclusive and accept ISO strings, datetimes or POSIX
+        timestamps.
+        """
+        where, args = [], []
+        if agent is not None:
+            where.append("agent = ?")
+            args.append(agent)
+        if kind is not None:
+            if kind.endswith("*"):
+                where.append("kind >= ? AND kind < ?")
+                prefix = kind[:-1]
+                args += [prefix, prefix + "\U0010ffff"]
+            else:
+                where.append("kind = ?")
+                args.append(kind)
+        for op, bound in ((">=", _ts_key(since)), ("<=", _ts_key(until))):
+            if bound is not None:
+                where.append(f"ts {op} ?")
+                args.append(bound)
+        sql = "SELECT segment, offset, length FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(max(0, int(limit)))
+
+        with self._locked():  # no rotation between lookup and read
+            self._commit_locked()
+            hits = self._db.execute(sql, args).fetchall()[::-1]
+            return [json.loads(l) for l in self._fetch(hits)]
 
+    def segments(self) -> List[Path]:
+        """Rotated segments, oldest first (the active file is not included)."""
+        return sorted(self.dir.glob("events-*.jsonl*"))
+
+    # ------------------------------------------------------------ internals
+    @staticmethod
+    def _segment_tail(path: Path, n: int) -> List[bytes]:
+        if path.suffix != ".gz":
+            return tail_lines(path, n)
+        with gzip.open(path, "rb") as fh:  # no random access – stream, keep n
+            return [l.rstrip(b"\n") for l in deque(fh, maxlen=n) if l.strip()]
+
+    def _start_flusher(self) -> None:
+        with self._cond:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="memory-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buf) < _MAX_BATCH:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self._commit()
+            except OSError as exc:  # disk full etc. – keep the process alive
+                logger.error("memory commit failed: %s", exc)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive against our other threads and every other writer of the directory."""
+        with self._io_lock:
+            if fcntl is None or self._lock_fh.closed:
+                yield
+                return
+            fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_UN)
+
+    def _commit(self, upto: Optional[int] = None) -> None:
+        with self._locked():
+            if upto is not None and self._committed >= upto:
+                return  # an earlier leader already committed our record
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        self._catch_up()  # before reads too: records other writers left unindexed
+        with self._cond:
+            batch, self._buf = self._buf, []
+            last = self._queued
+        if batch:
+            lines = [b[0] for b in batch]
+            fh = self._open()
+            self._size = os.fstat(fh.fileno()).st_size  # other writers may have appended
+            if self._maybe_rotate():
+                fh = self._open()
+            offset = os.fstat(fh.fileno()).st_size  # O_APPEND: our batch starts here
+            fh.write(b"".join(lines))
+            fh.flush()
+            if self.fsync != "none":
+                os.fsync(fh.fileno())
+            rows = []
+            for line, (_, ts, agent, kind) in zip(lines, batch):
+                rows.append((ts, agent, kind, _ACTIVE, offset, len(line) - 1))
+                offset += len(line)
+            self._size = offset
+            self._index(rows)
+        self._committed = last
+
+    def _index(self, rows: Iterable[Tuple[str, str, str, str, int, int]]) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO events(ts, agent, kind, segment, offset, length) VALUES(?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def _catch_up(self) -> None:
+        """Index records of the active file written after the last indexed one.
+
+        Cheap when nothing changed: one ``stat``.  Otherwise the index (shared
+        by every writer) says where its coverage ends, whoever wrote last.
+        """
+        try:
+            size = self.file.stat().st_size
+        except FileNotFoundError:
+            return
+        if size == self._size:
+            return
+        self._size = size
+        row = self._db.execute(
+            "SELECT MAX(offset + length + 1) FROM events WHERE segment = ?", (_ACTIVE,)
+        ).fetchone()
+        start = row[0] or 0
+        if start >= size:
+            return
+        rows = []
+        with self.file.open("rb") as fh:
+            fh.seek(start)
+            offset = start
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break  # unterminated tail of an interrupted write
+                try:
+                    rec = json.loads(line)
+                    rows.append((rec["ts"], rec["agent"], rec["kind"], _ACTIVE, offset, len(line) - 1))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("memory: unreadable record at %s:%d – not indexed", self.file, offset)
+                offset += len(line)
+        self._index(rows)
+        if rows:
+            logger.info("memory: indexed %d record(s) missing from %s", len(rows), self._db_path())
+
+    def _db_path(self) -> Path:
+        return self.dir / "index.sqlite"
+
+    def _fetch(self, hits: List[Tuple[str, int, int]]) -> List[bytes]:
+        """Read the indexed lines, one open (and one gzip pass) per segment."""
+        by_seg: Dict[str, List[Tuple[int, int, int]]] = {}
+        for i, (seg, offset, length) in enumerate(hits):
+            by_seg.setdefault(seg, []).append((offset, length, i))
+        out: List[Optional[bytes]] = [None] * len(hits)
+        for seg, spans in by_seg.items():
+            path = self.dir / seg
+            try:
+                opener = gzip.open if seg.endswith(".gz") else open
+                with opener(path, "rb") as fh:
+                    for offset, length, i in sorted(spans):  # gzip only seeks forward cheaply
+                        fh.seek(offset)
+                        out[i] = fh.read(length)
+            except FileNotFoundError:
+                logger.debug("memory: segment %s is gone – %d hit(s) skipped", seg, len(spans))
+        return [line for line in out if line]
+
+    def _open(self):
+        """Append handle on the active file, reopened if another writer rotated it."""
+        fh = self._fh
+        if fh is not None:
+            try:
+                current = os.stat(self.file).st_ino == os.fstat(fh.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if not current:
+                fh.close()
+                fh = self._fh = None
+                self._opened = time.time()  # a fresh segment
+        if fh is None:
+            fh = self._fh = self.file.open("ab")  # O_APPEND
+        return fh
+
+    def _maybe_rotate(self) -> bool:
+        too_big = self._size >= self.segment_bytes
+        too_old = self.segment_seconds > 0 and time.time() - self._opened >= self.segment_seconds
+        if not self._size or not (too_big or too_old):
+            return False
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        seg = self.dir / f"events-{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}.jsonl"
+        os.replace(self.file, seg)
+        self._relabel(_ACTIVE, seg.name)
+        if self.compress:
+            with seg.open("rb") as src, gzip.open(f"{seg}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            self._relabel(seg.name, f"{seg.name}.gz")
+            seg.unlink()
+        self._size = 0
+        self._opened = time.time()
+        return True
+
+    def _relabel(self, old: str, new: str) -> None:
+        with self._db:
+            self._db.execute("UPDATE events SET segment = ? WHERE segment = ?", (new, old))
+
+
+# Queued records are committed at interpreter exit.
+_OPEN: "weakref.WeakSet[Memory]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all() -> None:
+    for mem in list(_OPEN):
+        try:
+            mem.close()
+        except OSError:
+            pass
+
+
+__all__ = ["Memory"]
@@ -18,11 +18,36 @@ prior public API while adding:
   LLM request is wrapped in an MCP envelope for provenance.
 * **Experience‑replay event bus** – a Kafka‑backed topic (`exp.stream`) so
   any agent can publish observation/﻿action/﻿reward tuples; compatible with
-  MuZero‑style model‑based RL pipelines.
+  MuZero‑style model‑based RL pipelines.  `_publish` never blocks: records
+  are batched per topic by `backend.event_bus` and fall back to a local,
+  readable ring when Kafka is absent.
 * **Prometheus metrics & healthz HTTP probe** – enabled by
-  `METRICS_PORT` env‑var (default 9090) for live SRE dashboards.
+  `METRICS_PORT` env‑var (default 9090) for live SRE dashboards.  The
+  same port serves event‑loop lag, blocked‑loop stack traces
+  (`/debug/loop`) and an on‑demand sampling profiler returning collapsed
+  stacks (`/debug/profile?seconds=N`), see `backend.loop_monitor`.
 * **Declarative scheduling** – agents may expose `SCHED_SPEC` in cron or
-  RRULE iCal format; otherwise we fall back to per‑cycle cadence.
+  RRULE iCal format; otherwise we fall back to per‑cycle cadence.  A
+  heap‑based timer (`backend.scheduler`) sleeps until the next runner is
+  due; A2A triggers wake it immediately.
+* **Overlap control** – per‑agent `OVERLAP_POLICY` (skip | coalesce |
+  queue) and `MAX_CONCURRENCY`, a global in‑flight cap and a dedicated
+  thread pool for sync agents; skipped / late cycles are exported.
+* **Deadline‑aware load shedding** – agents declare `PRIORITY` and a
+  `DEADLINE_SECONDS` SLO; when the global cap is saturated cycles are
+  admitted earliest‑deadline‑first.  Under overload (loop lag, admission
+  queue depth or CPU load) cycles below `ALPHA_SHED_PRIORITY` are
+  postponed or shed; every decision is counted and published on
+  `agent.shed`.
+* **Process isolation** – agents with `EXECUTION = "process"` (or listed
+  in `ALPHA_PROCESS_AGENTS`) run in a persistent, CPU‑pinned worker
+  process (`backend.process_runner`) that is respawned on crash.
+* **Horizontal sharding** – with `ALPHA_SHARD_DB` set, replicas split the
+  agent set by consistent hashing with SQLite‑backed leases
+  (`backend.sharding`) and rebalance when a peer joins or dies.
+* **Lazy agent loading** – the registry is served from a source‑parsed
+  manifest cache; an agent module (and its heavy deps) is imported only
+  when this replica actually runs it.
 * **Fully offline fallback** – if *none* of the optional deps are present,
   the orchestrator still runs with core features only.
 
@@ -33,15 +58,15 @@ from __future__ import annotations
 
 import asyncio
 import datetime as _dt
-import json
 import logging
 import os
 import signal
 import ssl
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 # ----------------------------------------------------------------------------
 # Optional deps (all soft‑imports)
@@ -64,19 +89,20 @@ except ModuleNotFoundError:  # pragma: no cover
     grpc = None  # type: ignore
 
 try:
-    from kafka import KafkaProducer  # type: ignore
+    from prometheus_client import Counter, Histogram  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover
-    KafkaProducer = None  # type: ignore
-
-try:
-    from prometheus_client import Counter, Histogram, start_http_server  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    Counter = Histogram = start_http_server = None  # type: ignore
+    Counter = Histogram = None  # type: ignore
 
 # ----------------------------------------------------------------------------
 # Local imports (guaranteed)
 # ----------------------------------------------------------------------------
-from backend.agents import get_agent, list_agents
+from backend.agents import AGENT_REGISTRY, get_agent, list_agents
+from backend.event_bus import get_bus
+from backend.loop_monitor import LoopMonitor, start_admin_server
+from backend.mcp import wrap_mcp
+from backend.process_runner import ProcessAgent, wants_process
+from backend.scheduler import DeadlineGate, OverloadDetector, TimerScheduler
+from backend.sharding import ShardCoordinator
 
 # ----------------------------------------------------------------------------
 # Configuration
@@ -87,6 +113,17 @@ _KAFKA_BROKER = ENV("ALPHA_KAFKA_BROKER")
 _A2A_PORT = int(ENV("A2A_PORT", "0"))  # 0 disables
 _METRICS_PORT = int(ENV("METRICS_PORT", "0"))
 _SSL_DISABLE = ENV("INSECURE_DISABLE_TLS", "false").lower() == "true"
+_OVERLAP_POLICY = ENV("ALPHA_OVERLAP_POLICY", "skip").lower()  # skip|coalesce|queue
+_MAX_INFLIGHT = int(ENV("ALPHA_MAX_CONCURRENT_CYCLES", "64"))  # global cap
+_SYNC_WORKERS = int(ENV("ALPHA_SYNC_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+_LATE_MS = float(ENV("ALPHA_LATE_THRESHOLD_MS", "1000"))
+_DEFAULT_PRIORITY = int(ENV("ALPHA_DEFAULT_PRIORITY", "5"))  # higher = more important
+_SHED_PRIORITY = int(ENV("ALPHA_SHED_PRIORITY", "5"))  # cycles below this may be shed
+_SHED_LAG_MS = float(ENV("ALPHA_SHED_LAG_MS", "500"))
+_SHED_QUEUE = int(ENV("ALPHA_SHED_QUEUE_DEPTH", str(_MAX_INFLIGHT)))
+_SHED_LOAD = float(ENV("ALPHA_SHED_LOAD_PER_CPU", "1.5"))  # 0 ignores CPU load
+_SHED_POSTPONE = float(ENV("ALPHA_SHED_POSTPONE_SEC", "5"))
+_CLOSE_TIMEOUT = float(ENV("ALPHA_CLOSE_TIMEOUT_SEC", "30"))  # per agent, on shutdown
 
 logging.basicConfig(level=ENV("LOGLEVEL", "INFO"))
 logger = logging.getLogger("alpha_factory.orchestrator")
@@ -95,9 +132,14 @@ logger = logging.getLogger("alpha_factory.orchestrator")
 # Prometheus metrics (no‑ops if lib unavailable)
 # ----------------------------------------------------------------------------
 if _METRICS_PORT and Counter and Histogram:
-    start_http_server(_METRICS_PORT)
     MET_AGENT_LAT = Histogram("agent_cycle_latency_ms", "Latency per cycle", ["agent"])
     MET_AGENT_ERR = Counter("agent_cycle_errors_total", "Exceptions per agent", ["agent"])
+    MET_AGENT_SKIP = Counter("agent_cycles_skipped_total", "Due cycles not started because the agent was busy", ["agent", "policy"])
+    MET_AGENT_LATE = Counter("agent_cycles_late_total", "Cycles started later than ALPHA_LATE_THRESHOLD_MS", ["agent"])
+    MET_AGENT_DELAY = Histogram("agent_cycle_start_delay_ms", "Delay between due time and cycle start", ["agent"])
+    MET_AGENT_SHED = Counter(
+        "agent_cycles_shed_total", "Cycles postponed or dropped under overload", ["agent", "action", "reason"]
+    )
 else:  # pragma: no cover
     def _noop(*_a, **_kw):  # type: ignore
         class N:  # noqa: D401
@@ -112,20 +154,24 @@ else:  # pragma: no cover
 
         return N()
 
-    MET_AGENT_LAT = MET_AGENT_ERR = _noop()
+    MET_AGENT_LAT = MET_AGENT_ERR = MET_AGENT_SKIP = MET_AGENT_LATE = MET_AGENT_DELAY = MET_AGENT_SHED = _noop()
 
 # ----------------------------------------------------------------------------
-# Kafka helpers (soft‑fail to stdout)
+# Event bus (batched Kafka producer + local ring; see backend.event_bus)
 # ----------------------------------------------------------------------------
-if _KAFKA_BROKER and KafkaProducer:
-    _producer: Any = KafkaProducer(bootstrap_servers=_KAFKA_BROKER,
-                                     value_serializer=lambda v: v.encode())
+# Agent worker processes (backend.process_runner) install a hook here so
+# events raised inside the worker are shipped back to the parent.
+_publish_hook: Optional[Callable[[str, Any], None]] = None
 
-    def _publish(topic: str, payload: Dict[str, Any]):  # noqa: D401
-        _producer.send(topic, json.dumps(payload))
-else:  # pragma: no cover
-    def _publish(topic: str, payload: Dict[str, Any]):  # noqa: D401
-        logger.debug("EVT %-24s %s", topic, json.dumps(payload))
+def _emit(topic: str, payload: Any):  # noqa: D401
+    get_bus().publish(topic, payload)
+
+
+def _publish(topic: str, payload: Any):  # noqa: D401
+    if _publish_hook is not None:
+        _publish_hook(topic, payload)
+        return
+    _emit(topic, payload)
 
 # ----------------------------------------------------------------------------
 # MCP helper
@@ -133,11 +179,7 @@ else:  # pragma: no cover
 
 def _mcp_wrap(payload: Dict[str, Any]) -> str:  # noqa: D401
     """Return JSON string in Model Context Protocol envelope."""
-    return json.dumps({
-        "mcp_version": "0.1",  # current draft
-        "timestamp": _dt.datetime.utcnow().isoformat() + "Z",
-        "payload": payload,
-    })
+    return wrap_mcp("orchestrator", payload).to_json()
 
 # ----------------------------------------------------------------------------
 # Agent runtime wrapper utilities
@@ -156,10 +198,40 @@ class _OAIRuntimeSingleton:
 # Scheduling helpers
 # ----------------------------------------------------------------------------
 
+_OVERLAP_POLICIES = ("skip", "coalesce", "queue")
+
+# Sync ``run_cycle`` implementations get their own sized pool instead of
+# competing with every other ``asyncio.to_thread`` user in the process.
+_SYNC_EXECUTOR = ThreadPoolExecutor(max_workers=_SYNC_WORKERS, thread_name_prefix="agent-sync")
+_GLOBAL_SLOTS: Optional[DeadlineGate] = None
+_OVERLOAD: Optional[OverloadDetector] = None  # set by ``_main``; None → never shed
+
+
+def _global_slots() -> DeadlineGate:
+    global _GLOBAL_SLOTS
+    if _GLOBAL_SLOTS is None:
+        _GLOBAL_SLOTS = DeadlineGate(_MAX_INFLIGHT)
+    return _GLOBAL_SLOTS
+
+
 async def _maybe_await(callable_: Callable[[], Any]):
     if asyncio.iscoroutinefunction(callable_):
         return await callable_()
-    return await asyncio.to_thread(callable_)
+    return await asyncio.get_running_loop().run_in_executor(_SYNC_EXECUTOR, callable_)
+
+
+async def _close_instance(name: str, instance: Any) -> None:
+    """Let an agent finish in‑flight work and release its threads / worker process."""
+    close = getattr(instance, "close", None)
+    if not callable(close):
+        return
+    try:
+        if asyncio.iscoroutinefunction(close):
+            await asyncio.wait_for(close(), _CLOSE_TIMEOUT)
+        else:
+            await asyncio.wait_for(asyncio.to_thread(close), _CLOSE_TIMEOUT)
+    except Exception:  # noqa: BLE001
+        logger.exception("%s: close failed", name)
 
 
 class AgentRunner:  # pylint: disable=too-few-public-methods
@@ -167,11 +239,39 @@ class AgentRunner:  # pylint: disable=too-few-public-methods
 
     def __init__(self, name: str):
         self.name = name
-        self.instance = get_agent(name)
+        meta = AGENT_REGISTRY.get(name)
+        cls = meta.load() if meta is not None else None  # imports the module on first use
+        if wants_process(name, cls):
+            self.instance = ProcessAgent(name, cls, _publish)
+        else:
+            self.instance = get_agent(name)
         self.period = getattr(self.instance, "CYCLE_SECONDS", _DEFAULT_CYCLE)
         self.spec = getattr(self.instance, "SCHED_SPEC", None)
-        self._next: float = time.time()
+        # Deadline = due time + SLO; orders admission when the box is busy.
+        self.priority = int(getattr(self.instance, "PRIORITY", _DEFAULT_PRIORITY))
+        self.deadline_s = float(getattr(self.instance, "DEADLINE_SECONDS", None) or self.period)
+        self._due: float = time.time()
+        self._deferred: Optional[float] = None  # original due time of a postponed cycle
+        self._resume: Optional[float] = None  # regular slot to restore after the retry
+        self._cron: Any = None  # compiled croniter, built once per runner
         self._task: Optional[asyncio.Task] = None
+        self._scheduler: Optional[TimerScheduler] = None
+
+        # Overlap control: what to do when a cycle is due while
+        # ``max_concurrency`` cycles are still in flight.
+        #   skip     – drop the due cycle
+        #   queue    – hold one cycle, start it when a slot frees; cadence kept
+        #   coalesce – hold one cycle and fold it into the schedule: the
+        #              catch‑up run counts as the next regular cycle
+        policy = str(getattr(self.instance, "OVERLAP_POLICY", _OVERLAP_POLICY)).lower()
+        if policy not in _OVERLAP_POLICIES:
+            logger.warning("%s: unknown OVERLAP_POLICY '%s' – using 'skip'", name, policy)
+            policy = "skip"
+        self.policy = policy
+        self.max_concurrency = max(1, int(getattr(self.instance, "MAX_CONCURRENCY", 1)))
+        self._inflight: Set[asyncio.Task] = set()
+        self._pending: Optional[float] = None  # due timestamp of the held cycle
+        self.draining = False  # set by drain(): no new cycles are admitted
 
         # Hook OpenAI Agents SDK tools automatically
         if AgentRuntime is not None and isinstance(self.instance, getattr(AgentContext, "__mro__", (object,))[0]):
@@ -179,27 +279,133 @@ class AgentRunner:  # pylint: disable=too-few-public-methods
             if runtime:
                 runtime.register(self.instance)
 
+    # ``_next`` stays assignable (A2A ``trigger`` sets it to 0) but every
+    # write now wakes the scheduler instead of waiting for the next poll.
+    @property
+    def _next(self) -> float:
+        return self._due
+
+    @_next.setter
+    def _next(self, value: float) -> None:
+        self._due = value
+        if self._scheduler is not None:
+            self._scheduler.reschedule(self)
+
+    def next_due(self) -> float:
+        return self._due
+
+    def deadline(self) -> float:
+        return (self._deferred if self._deferred is not None else self._due) + self.deadline_s
+
+    def trigger(self) -> None:
+        """Run as soon as possible (out‑of‑band request)."""
+        self._next = 0
+
     def _recalc_next(self):
+        now = time.time()
         if self.spec:  # iCal / cron‑style schedule (uses croniter if available)
             try:
-                from croniter import croniter  # type: ignore
-
-                base = _dt.datetime.fromtimestamp(self._next)
-                self._next = croniter(self.spec, base).get_next(float)
+                if self._cron is None:
+                    from croniter import croniter  # type: ignore
+
+                    self._cron = croniter(self.spec, _dt.datetime.fromtimestamp(max(self._due, now)))
+                nxt = self._cron.get_next(float)
+                if nxt <= now:  # fell behind (e.g. manual trigger) → re‑anchor once
+                    self._cron.set_current(_dt.datetime.fromtimestamp(now))
+                    nxt = self._cron.get_next(float)
+                self._due = nxt
             except Exception as exc:  # noqa: BLE001
                 logger.error("%s: invalid SCHED_SPEC '%s' (%s) – falling back to period", self.name, self.spec, exc)
                 self.spec = None
-                self._next = time.time() + self.period
+                self._cron = None
+                self._due = now + self.period
         else:
-            self._next = time.time() + self.period
+            self._due = now + self.period
 
     async def step(self):
-        if time.time() < self._next:
+        if self.draining or time.time() < self._due:
+            return
+        if self._deferred is None:
+            due = self._due
+            self._recalc_next()
+        else:  # retry of a postponed cycle: the regular slot is already known
+            due, self._deferred = self._deferred, None
+            self._due, self._resume = self._resume, None  # type: ignore[assignment]
+        if self._shed(due):
+            return
+
+        if len(self._inflight) < self.max_concurrency:
+            self._launch(due)
             return
-        self._recalc_next()
 
-        async def _run():  # noqa: D401
+        # busy – apply overlap policy
+        if self.policy == "skip" or self._pending is not None:
+            MET_AGENT_SKIP.labels(self.name, self.policy).inc()
+            logger.debug("%s: cycle skipped (%s, %d in flight)", self.name, self.policy, len(self._inflight))
+            if self.policy == "coalesce":
+                self._pending = due  # newest due time wins
+            return
+        self._pending = due
+
+    def _shed(self, due: float) -> bool:
+        """Postpone or drop this cycle if the box is overloaded; report it."""
+        if _OVERLOAD is None or due <= 0 or self.priority >= _SHED_PRIORITY:
+            return False  # manual triggers and important agents always run
+        level, reason = _OVERLOAD.level()
+        if not level:
+            return False
+        now = time.time()
+        deadline = due + self.deadline_s
+        if level == 1 and now + _SHED_POSTPONE < deadline:
+            action = "postpone"  # retry soon, still within the SLO
+            self._deferred = due
+            self._resume = self._due  # next regular slot, kept for after the retry
+            self._due = min(self._due, now + _SHED_POSTPONE)
+        else:
+            action = "shed"  # overloaded, or postponing would miss the deadline
+        MET_AGENT_SHED.labels(self.name, action, reason).inc()
+        logger.info("%s: cycle %s (overload level %d, %s, priority %d)", self.name, action, level, reason, self.priority)
+        _publish("agent.shed", {
+            "name": self.name, "action": action, "reason": reason, "level": level,
+            "priority": self.priority, "due": due, "deadline": deadline, "ts": now,
+        })
+        return True
+
+    def _launch(self, due: float) -> None:
+        task = asyncio.create_task(self._run(due), name=f"agent:{self.name}")
+        self._inflight.add(task)
+        self._task = task
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        if self.draining:
+            self._pending = None
+            return
+        if self._pending is None or len(self._inflight) >= self.max_concurrency:
+            return
+        due, self._pending = self._pending, None
+        if self.policy == "coalesce":
+            self._recalc_next()
+            if self._scheduler is not None:
+                self._scheduler.reschedule(self)
+        self._launch(due)
+
+    async def drain(self) -> None:
+        """Stop admitting cycles (a held one is dropped); wait for those in flight."""
+        self.draining = True
+        self._pending = None
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    async def _run(self, due: float):  # noqa: D401
+        async with _global_slots().slot(due + self.deadline_s, self.priority):
             t0 = time.time()
+            if due > 0:  # manual triggers (``_next = 0``) are never late
+                delay_ms = (t0 - due) * 1000
+                MET_AGENT_DELAY.labels(self.name).observe(max(0.0, delay_ms))
+                if delay_ms > _LATE_MS:
+                    MET_AGENT_LATE.labels(self.name).inc()
             try:
                 await _maybe_await(self.instance.run_cycle)
                 MET_AGENT_LAT.labels(self.name).observe((time.time() - t0) * 1000)
@@ -209,8 +415,6 @@ class AgentRunner:  # pylint: disable=too-few-public-methods
                 logger.exception("%s.run_cycle error: %s", self.name, exc)
                 _publish("agent.cycle", {"name": self.name, "ok": False, "err": str(exc)})
 
-        self._task = asyncio.create_task(_run())
-
 # ----------------------------------------------------------------------------
 # A2A gRPC service (bidirectional stream)
 # ----------------------------------------------------------------------------
@@ -252,6 +456,50 @@ async def _adk_register():
     await client.register(node_type="orchestrator", metadata={"runtime": "alpha_factory"})
     logger.info("Registered with ADK mesh (%s)", client.node_id)
 
+# ----------------------------------------------------------------------------
+# Shard rebalancing (multi‑replica deployments)
+# ----------------------------------------------------------------------------
+async def _shard_loop(
+    shards: ShardCoordinator,
+    runners: Dict[str, AgentRunner],
+    scheduler: TimerScheduler,
+    stop: asyncio.Event,
+):
+    """Renew leases and start / stop runners as the shard map changes."""
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=shards.interval)
+            break
+        except asyncio.TimeoutError:
+            pass
+        try:
+            gained, lost = await asyncio.to_thread(shards.rebalance)
+        except Exception:  # noqa: BLE001
+            logger.exception("Shard rebalance failed")
+            continue
+
+        for name in lost:
+            runner = runners.pop(name, None)
+            if runner is not None:
+                # stop it here first – the new owner may start it as soon
+                # as the lease is gone
+                scheduler.remove(name)
+                await runner.drain()
+                await _close_instance(name, runner.instance)
+            try:
+                await asyncio.to_thread(shards.release, name)
+            except Exception:  # noqa: BLE001 – the lease expires after its TTL anyway
+                logger.exception("%s: lease release failed", name)
+        for name in gained:
+            try:
+                runner = AgentRunner(name)
+            except Exception:  # noqa: BLE001
+                logger.exception("%s: failed to start after shard handoff", name)
+                continue
+            runner._scheduler = scheduler
+            runners[name] = runner
+            scheduler.add(runner)
+
 # ----------------------------------------------------------------------------
 # Main async loop
 # ----------------------------------------------------------------------------
@@ -261,12 +509,38 @@ async def _main():
         logger.error("No agents registered — aborting")
         sys.exit(1)
 
-    runners = {n: AgentRunner(n) for n in names}
+    # With ALPHA_SHARD_DB set, this replica only drives its shard of agents
+    shards = ShardCoordinator.from_env(names)
+    if shards is not None:
+        await asyncio.to_thread(shards.rebalance)
+        names = sorted(shards.owned)
+        logger.info("Replica %s owns %d agent(s)", shards.replica_id, len(names))
+
+    runners: Dict[str, AgentRunner] = {}
+    for n in names:  # agent modules are imported here, on first use
+        try:
+            runners[n] = AgentRunner(n)
+        except Exception:  # noqa: BLE001
+            logger.exception("%s: failed to load – agent skipped", n)
     logger.info("Instantiated %d agents: %s", len(runners), ", ".join(runners))
 
-    # Optionally expose Prometheus metrics probe
-    if _METRICS_PORT and Counter:
-        logger.info("Prometheus metrics available at :%d/", _METRICS_PORT)
+    # Loop lag / blocked‑loop watchdog; metrics + debug endpoints
+    monitor = LoopMonitor.from_env()
+    monitor.start()
+    if _METRICS_PORT:
+        start_admin_server(_METRICS_PORT, monitor)
+        logger.info("Metrics at :%d/metrics, loop stats at /debug/loop, profiler at /debug/profile",
+                    _METRICS_PORT)
+
+    # Overload signals for load shedding
+    global _OVERLOAD
+    _OVERLOAD = OverloadDetector(
+        lambda: monitor.last_lag_ms,
+        lambda: len(_global_slots()),
+        max_lag_ms=_SHED_LAG_MS,
+        max_queue=_SHED_QUEUE,
+        max_load=_SHED_LOAD,
+    )
 
     # Kick‑off optional services
     await asyncio.gather(_start_a2a_service(runners), _adk_register())
@@ -283,13 +557,27 @@ async def _main():
         except NotImplementedError:  # pragma: no cover (Windows)
             signal.signal(sig, _graceful_shutdown)  # type: ignore[arg-type]
 
-    # Core ticking loop
-    while not stop.is_set():
-        await asyncio.gather(*(r.step() for r in runners.values()))
-        await asyncio.sleep(0.2)
+    # Core event loop – sleeps until the next runner is due
+    scheduler = TimerScheduler()
+    for r in runners.values():
+        r._scheduler = scheduler
+        scheduler.add(r)
+
+    rebalance_task = None
+    if shards is not None:
+        rebalance_task = asyncio.create_task(_shard_loop(shards, runners, scheduler, stop))
+
+    await scheduler.run(stop)
+    if rebalance_task is not None:
+        await rebalance_task
 
     # Drain
-    await asyncio.gather(*(r._task for r in runners.values() if r._task), return_exceptions=True)
+    await asyncio.gather(*(r.drain() for r in runners.values()))
+    await asyncio.gather(*(_close_instance(n, r.instance) for n, r in runners.items()))
+    _SYNC_EXECUTOR.shutdown(wait=False)
+    if shards is not None:
+        await asyncio.to_thread(shards.leave)
+    monitor.stop()
     logger.info("Orchestrator stopped cleanly")
 
 # ----------------------------------------------------------------------------
@@ -0,0 +1,185 @@
+"""backend.pipeline
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Bounded, order‑preserving stage pipeline behind the opt‑in pipelined
+mode of :class:`backend.agent_base.AgentBase`.
+
+Each stage is one thread reading a bounded FIFO queue and writing its
+output to the next stage's queue, so
+
+* **overlap** – while stage *n* works on cycle *k*, stage *n‑1* can
+  already work on cycle *k+1*;
+* **back‑pressure** – a full queue blocks the producer (``depth`` items
+  per stage at most), memory stays bounded when a stage falls behind;
+* **determinism** – one thread per stage and FIFO queues keep items in
+  submission order end to end.
+
+A stage that raises drops that item (``on_error`` is called) and the
+pipeline continues.  Per stage we count items, busy time and time spent
+blocked on a full downstream queue; ``utilisation`` = busy / elapsed and
+the most utilised stage is reported as the ``bottleneck``.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from prometheus_client import Gauge  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Gauge = None  # type: ignore
+
+logger = logging.getLogger("alpha_factory.pipeline")
+
+if Gauge:
+    MET_STAGE_UTIL = Gauge("agent_stage_utilisation", "Busy time / elapsed per pipeline stage", ["agent", "stage"])
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def set(self, *_a):
+            pass
+
+    MET_STAGE_UTIL = _Noop()
+
+_STOP = object()
+
+Stage = Tuple[str, Callable[[Any], Any]]
+
+
+class _StageStats:
+    __slots__ = ("items", "busy", "blocked")
+
+    def __init__(self) -> None:
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+
+
+class StagePipeline:
+    """Run *stages* in their own threads, connected by bounded queues."""
+
+    def __init__(
+        self,
+        name: str,
+        stages: Sequence[Stage],
+        *,
+        depth: int = 1,
+        on_error: Optional[Callable[[str, Any, BaseException], None]] = None,
+        sources: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self._stages = list(stages)
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=max(1, depth)) for _ in self._stages]
+        self._on_error = on_error
+        # ``sources`` are stages run by the caller (see ``account``), listed first
+        self._stats: Dict[str, _StageStats] = {s: _StageStats() for s in (*sources, *(n for n, _ in self._stages))}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._inflight = 0
+        self._threads: List[threading.Thread] = []
+        self._t0 = time.monotonic()
+
+    def start(self) -> "StagePipeline":
+        for i, (stage, _) in enumerate(self._stages):
+            t = threading.Thread(target=self._run, args=(i,), name=f"{self.name}:{stage}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    # ------------------------------------------------------------------ #
+    # producer side                                                      #
+    # ------------------------------------------------------------------ #
+    def submit(self, item: Any) -> float:
+        """Queue *item* for the first stage; returns seconds spent blocked."""
+        with self._lock:
+            self._inflight += 1
+        t0 = time.perf_counter()
+        self._queues[0].put(item)
+        return time.perf_counter() - t0
+
+    def account(self, stage: str, busy: float, blocked: float = 0.0) -> None:
+        """Book time for a *source* stage executed outside the pipeline."""
+        self._book(stage, busy, blocked)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted item left the pipeline."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._inflight == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._queues[0].put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(1e-9, time.monotonic() - self._t0)
+        with self._lock:
+            stages = {
+                s: {
+                    "items": st.items,
+                    "busy_s": round(st.busy, 6),
+                    "blocked_s": round(st.blocked, 6),
+                    "utilisation": round(st.busy / elapsed, 4),
+                }
+                for s, st in self._stats.items()
+            }
+        for (stage, _), q in zip(self._stages, self._queues):
+            stages[stage]["queued"] = q.qsize()
+        bottleneck = max(stages, key=lambda s: stages[s]["utilisation"]) if stages else None
+        return {"elapsed_s": round(elapsed, 6), "inflight": self._inflight, "bottleneck": bottleneck, "stages": stages}
+
+    # ------------------------------------------------------------------ #
+    # stage threads                                                      #
+    # ------------------------------------------------------------------ #
+    def _book(self, stage: str, busy: float, blocked: float) -> None:
+        with self._lock:
+            st = self._stats[stage]
+            st.items += 1
+            st.busy += busy
+            st.blocked += blocked
+            util = st.busy / max(1e-9, time.monotonic() - self._t0)
+        MET_STAGE_UTIL.labels(self.name, stage).set(util)
+
+    def _finish(self) -> None:
+        with self._idle:
+            self._inflight -= 1
+            if not self._inflight:
+                self._idle.notify_all()
+
+    def _run(self, idx: int) -> None:
+        stage, fn = self._stages[idx]
+        inbox = self._queues[idx]
+        outbox = self._queues[idx + 1] if idx + 1 < len(self._queues) else None
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                if outbox is not None:
+                    outbox.put(_STOP)
+                return
+            t0 = time.perf_counter()
+            try:
+                out, ok = fn(item), True
+            except Exception as exc:  # noqa: BLE001 – drop the item, keep the stage alive
+                out, ok = None, False
+                if self._on_error is not None:
+                    self._on_error(stage, item, exc)
+                else:
+                    logger.exception("%s: stage %s failed", self.name, stage)
+            busy = time.perf_counter() - t0
+            blocked = 0.0
+            if ok and outbox is not None:
+                t1 = time.perf_counter()
+                outbox.put(out)
+                blocked = time.perf_counter() - t1
+            self._book(stage, busy, blocked)
+            if not ok or outbox is None:
+                self._finish()  # item left the pipeline (done or dropped)
+
+
+__all__ = ["StagePipeline"]
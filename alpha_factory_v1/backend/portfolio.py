@@ -1,35 +1,101 @@
 """
 Tiny on‑disk trade‑ledger used by FinanceAgent.
 
-It now **streams each fill** to the live Trace‑graph WebSocket
+It now **streams fills** to the live Trace‑graph WebSocket
 (`/ws/trace`) when FastAPI + `backend.trace_ws` are available.
+
+``record_fills`` books a whole rebalance at once: every fill is applied,
+the batch is appended with one ``write`` (and at most one ``fsync``) and
+one aggregated trace event is published; ``record_fill`` is a batch of
+one.
+
+Positions, average cost and P&L live in a
+:class:`backend.position_book.PositionBook` (parallel NumPy arrays), so
+``value`` / ``weights`` / ``gross_leverage`` / ``unrealised`` price the
+whole book in one vectorised pass.
+
+Fills carry a sequence number and go to a write‑ahead log
+(``portfolio.jsonl``).  Every ``PORTFOLIO_SNAPSHOT_EVERY`` fills the
+book is written atomically to ``portfolio.snapshot.json`` and the
+log it covers is moved to the archive (``portfolio-<last seq>.jsonl.gz``),
+so start‑up loads one snapshot and replays only the short log tail.
+Fills already covered by the snapshot (a crash between the two steps) are
+skipped by sequence number; :meth:`Portfolio.history` still yields every
+fill ever recorded.
+
+Environment
+-----------
+PORTFOLIO_SNAPSHOT_EVERY    fills between snapshots, 0 = never (1000)
+PORTFOLIO_ARCHIVE_COMPRESS  gzip archived logs (1)
+PORTFOLIO_FSYNC             fsync the log once per recorded batch (0)
 """
 
 from __future__ import annotations
 
-import asyncio
+import gzip
 import json
+import logging
 import os
+import shutil
+import threading
 import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+from .position_book import PositionBook, Prices
+from .tail import reverse_lines
 
 # Directory is overridable for tests (they patch $ALPHA_DATA_DIR)
 DATA_DIR = Path(os.getenv("ALPHA_DATA_DIR", "/tmp/alphafactory"))
 DB_PATH = DATA_DIR / "portfolio.jsonl"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+SNAPSHOT_EVERY = int(os.getenv("PORTFOLIO_SNAPSHOT_EVERY", "1000"))
+ARCHIVE_COMPRESS = os.getenv("PORTFOLIO_ARCHIVE_COMPRESS", "1") not in ("0", "false", "False", "")
+FSYNC = os.getenv("PORTFOLIO_FSYNC", "0") not in ("0", "false", "False", "")
+
+# ``{"symbol", "qty", "price", "side"}`` or ``(symbol, qty, price, side)``
+FillSpec = Union[Mapping[str, object], Sequence[object]]
+
+logger = logging.getLogger("alpha_factory.portfolio")
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover – e.g. Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 class Portfolio:
-    def __init__(self, db_path: Path = DB_PATH) -> None:
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        *,
+        snapshot_every: Optional[int] = None,
+        compress: Optional[bool] = None,
+        fsync: Optional[bool] = None,
+        agent: str = "finance",
+    ) -> None:
+        self.agent = agent  # producer named on trace events
         self._db_path = db_path
-        self._positions: Dict[str, float] = {}
+        self._snap_path = db_path.with_name(f"{db_path.stem}.snapshot.json")
+        self._snapshot_every = SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+        self._compress = ARCHIVE_COMPRESS if compress is None else compress
+        self._fsync = FSYNC if fsync is None else fsync
+        self._book = PositionBook()
+        self._seq = 0  # sequence number of the last applied fill
+        self._since_snapshot = 0  # fills in the log, i.e. not in the snapshot
+        self._lock = threading.Lock()
 
-        # ── load existing fills (if any) ──────────────────────────────────
-        if db_path.exists():
-            for line in db_path.read_text().splitlines():
-                rec = json.loads(line)
-                self._apply(rec, persist=False)
+        # ── latest snapshot + the log tail after it ───────────────────────
+        self._load()
+        if self._snapshot_every and self._since_snapshot >= self._snapshot_every:
+            self.compact()
 
     # ── public API ────────────────────────────────────────────────────────
     def record_fill(self, symbol: str, qty: float, price: float, side: str) -> None:
@@ -39,55 +105,218 @@ class Portfolio:
         Additionally, broadcast the event to the Trace‑graph UI (best‑effort;
         never breaks the main flow if the WebSocket layer is absent).
         """
-        fill = {
-            "ts": time.time(),
-            "symbol": symbol,
-            "qty": float(qty),
-            "price": float(price),
-            "side": side.upper(),
-        }
+        self.record_fills([(symbol, qty, price, side)])
 
-        self._apply(fill)         # update positions + append to disk
-        self._broadcast(fill)     # fire‑and‑forget notification
+    def record_fills(self, fills: Iterable[FillSpec]) -> List[dict]:
+        """
+        Persist a batch of fills: positions first, then one log append.
+
+        Returns the recorded fills (with ``ts`` and ``seq``) and publishes a
+        single trace event for the whole batch.
+        """
+        ts = time.time()
+        batch = []
+        for f in fills:
+            symbol, qty, price, side = (
+                (f["symbol"], f["qty"], f["price"], f["side"]) if isinstance(f, Mapping) else f
+            )
+            batch.append(
+                {"ts": ts, "symbol": symbol, "qty": float(qty), "price": float(price), "side": str(side).upper()}
+            )
+        if not batch:
+            return batch
+
+        with self._lock:
+            for fill in batch:
+                self._seq += 1
+                fill["seq"] = self._seq
+                self._apply(fill)     # update positions
+            self._append(batch)       # one write (+ one fsync) per batch
+            self._since_snapshot += len(batch)
+            if self._snapshot_every and self._since_snapshot >= self._snapshot_every:
+                self._compact()
+        self._broadcast(batch)    # fire‑and‑forget notification
+        return batch
 
     def position(self, symbol: str) -> float:
         """Current net position (0.0 if the symbol has never traded)."""
-        return self._positions.get(symbol, 0.0)
+        return self._book.position(symbol)
+
+    @property
+    def book(self) -> PositionBook:
+        return self._book
+
+    def positions(self) -> Dict[str, float]:
+        return self._book.positions()
+
+    def value(self, prices: Prices = None) -> float:
+        """Net market value; unpriced symbols use their last seen price."""
+        return self._book.value(prices)
+
+    def weights(self, prices: Prices = None) -> Dict[str, float]:
+        return self._book.weights(prices)
+
+    def gross_leverage(self, prices: Prices = None) -> float:
+        return self._book.gross_leverage(prices)
+
+    def unrealised(self, prices: Prices = None) -> Dict[str, float]:
+        """Unrealised P&L of every symbol in one call."""
+        return self._book.unrealised(prices)
+
+    def unrealised_pnl(self, symbol: str, price: Optional[float] = None) -> float:
+        return self._book.unrealised_pnl(symbol, price)
+
+    def realised_pnl(self, symbol: Optional[str] = None) -> float:
+        return self._book.realised_pnl(symbol)
+
+    def compact(self) -> Optional[Path]:
+        """Snapshot positions now and archive the log; returns the archive."""
+        with self._lock:
+            return self._compact()
+
+    def archives(self) -> List[Path]:
+        """Archived fill logs, oldest first."""
+        stem = self._db_path.stem
+        return sorted(
+            p for p in self._db_path.parent.glob(f"{stem}-*.jsonl*") if not p.name.endswith(".tmp")
+        )
+
+    def history(self) -> Iterator[dict]:
+        """Every recorded fill, oldest first (archives, then the live log)."""
+        last = 0
+        for path in (*self.archives(), self._db_path):
+            for rec in self._read_log(path):
+                seq = rec.get("seq")
+                if seq is not None:
+                    if seq <= last:  # duplicate of an archived fill
+                        continue
+                    last = seq
+                yield rec
 
     # ── internal helpers ──────────────────────────────────────────────────
-    def _apply(self, fill: dict, *, persist: bool = True) -> None:
+    def _load(self) -> None:
+        snapshot = self._snap_path.exists()
+        if snapshot:
+            snap = json.loads(self._snap_path.read_text())
+            if "book" in snap:
+                self._book = PositionBook.from_state(snap["book"])
+            else:  # net quantities only (no cost basis recorded)
+                self._book = PositionBook.from_state(
+                    {"symbols": list(snap["positions"]), "qty": list(snap["positions"].values())}
+                )
+            self._seq = int(snap["seq"])
+        self._truncate_torn_tail()
+        for rec in self._read_log(self._db_path):
+            seq = rec.get("seq")
+            if seq is None:  # legacy line written before sequence numbers …
+                if snapshot:
+                    continue  # … which the first snapshot already covers
+                seq = rec["seq"] = self._seq + 1
+            if seq <= self._seq:
+                continue  # already part of the snapshot
+            self._apply(rec)
+            self._seq = seq
+            self._since_snapshot += 1
+
+    def _truncate_torn_tail(self) -> None:
+        """Cut a partial last record (crash mid‑write) before appending again."""
+        if not self._db_path.exists():
+            return
+        with self._db_path.open("rb+") as fh:
+            end = fh.seek(0, os.SEEK_END)
+            if not end:
+                return
+            fh.seek(end - 1)
+            if fh.read(1) == b"\n":
+                return
+            last = next(reverse_lines(fh, end), None)
+            keep = last[0] + len(last[1]) + 1 if last else 0
+            fh.truncate(keep)
+        logger.warning("%s: dropped %d bytes of an incomplete last record", self._db_path.name, end - keep)
+
+    @staticmethod
+    def _read_log(path: Path) -> Iterator[dict]:
+        if not path.exists():
+            return
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as fh:
+            for line in fh:
+                if not line.endswith("\n"):  # torn write of a crashed process
+                    logger.warning("%s: ignoring incomplete last record", path.name)
+                    break
+                if line.strip():
+                    yield json.loads(line)
+
+    def _compact(self) -> Optional[Path]:
+        """Atomic snapshot first, then move the covered log to the archive."""
+        if not self._since_snapshot and self._snap_path.exists():
+            return None
+        snap = {"seq": self._seq, "ts": time.time(), "positions": self._book.positions(), "book": self._book.state()}
+        tmp = self._snap_path.with_name(self._snap_path.name + ".tmp")
+        with tmp.open("w") as fh:
+            json.dump(snap, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self._snap_path)
+        _fsync_dir(self._snap_path.parent)
+        self._since_snapshot = 0
+
+        if not self._db_path.exists() or not self._db_path.stat().st_size:
+            return None
+        # a crash from here on only leaves fills the snapshot already covers
+        archive = self._db_path.with_name(f"{self._db_path.stem}-{self._seq:012d}.jsonl")
+        os.replace(self._db_path, archive)
+        if self._compress:
+            tmp = archive.with_name(archive.name + ".gz.tmp")
+            with archive.open("rb") as src, gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, archive.with_name(archive.name + ".gz"))
+            archive.unlink()
+            archive = archive.with_name(archive.name + ".gz")
+        logger.info("Portfolio snapshot at seq %d, log archived to %s", self._seq, archive.name)
+        return archive
+
+    def _apply(self, fill: dict) -> None:
         mult = 1 if fill["side"] == "BUY" else -1
-        self._positions[fill["symbol"]] = (
-            self._positions.get(fill["symbol"], 0.0) + mult * fill["qty"]
-        )
-        if persist:
-            self._append(fill)
+        self._book.apply(fill["symbol"], mult * fill["qty"], fill["price"])
 
-    def _append(self, fill: dict) -> None:
-        """Append‑only JSONL persistence."""
+    def _append(self, fills: List[dict]) -> None:
+        """Append‑only JSONL persistence, one write per batch."""
         with self._db_path.open("a") as fh:
-            fh.write(json.dumps(fill) + "\n")
+            fh.write("".join(json.dumps(f) + "\n" for f in fills))
+            if self._fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
 
     # ── trace‑graph integration ───────────────────────────────────────────
-    def _broadcast(self, fill: dict) -> None:  # pragma: no cover
+    def _broadcast(self, fills: List[dict]) -> None:
         """
-        Best‑effort broadcast of the fill to any connected Trace‑graph UI.
+        Best‑effort broadcast of a fill batch to any connected Trace‑graph UI.
 
-        Uses a *lazy import* so the portfolio works even if `trace_ws`
-        (and its FastAPI dependency) are not installed in production.
+        One event per batch (a single fill keeps its own label).  Uses a
+        *lazy import* so the portfolio works even if `trace_ws` (and its
+        FastAPI dependency) are not installed in production; publishing is
+        synchronous, so no event loop is needed.
         """
         try:
             from backend.trace_ws import hub  # local import avoids cycles
         except ModuleNotFoundError:
             return  # tracing not available
 
-        asyncio.create_task(
-            hub.broadcast(
+        first = fills[0]
+        if len(fills) == 1:
+            label = f"{first['side']} {first['qty']} {first['symbol']} @ {first['price']}"
+        else:
+            label = f"{len(fills)} fills ({len({f['symbol'] for f in fills})} symbols)"
+        try:
+            hub.publish(
                 {
-                    "id": f"fill-{int(fill['ts']*1000)}",
-                    "label": f"{fill['side']} {fill['qty']} {fill['symbol']} @ {fill['price']}",
-                    "data": fill,
+                    "id": f"fill-{first['seq']}" + (f"-{fills[-1]['seq']}" if len(fills) > 1 else ""),
+                    "type": "fill",
+                    "agent": self.agent,
+                    "label": label,
+                    "data": fills[0] if len(fills) == 1 else {"fills": fills},
                 }
             )
-        )
-
+        except Exception:  # noqa: BLE001 – tracing must never break trading
+            logger.debug("fill broadcast failed", exc_info=True)
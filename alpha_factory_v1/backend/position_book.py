@@ -0,0 +1,213 @@
+"""backend.position_book
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Array‑backed position book behind :class:`backend.portfolio.Portfolio`.
+
+Every symbol owns a *slot* (``symbol → index``) in parallel float64
+arrays: net quantity, average cost, realised P&L and the last price seen
+(the *mark*).  Fills update one slot; valuation works on the whole book at
+once, so ``value`` / ``weights`` / ``gross_leverage`` / ``unrealised``
+cost a few NumPy operations whatever the number of symbols.
+
+Prices may be given as a mapping ``{symbol: price}`` or as a sequence
+aligned with :attr:`PositionBook.symbols` (the fastest form).  Symbols
+without a price are valued at their mark, which every fill and every
+priced call refreshes.
+
+Accounting is average cost: adding to a position re‑averages the cost,
+reducing it realises ``closed qty × (price − avg cost)``, and a flip opens
+the remainder at the fill price.
+
+Without NumPy the same API runs on plain lists.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+try:
+    import numpy as np  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    np = None  # type: ignore
+
+Prices = Union[Mapping[str, float], Sequence[float], None]
+
+_FIELDS = ("qty", "avg_cost", "realised", "mark")
+
+
+class PositionBook:
+    """Net quantity, average cost and P&L per symbol in parallel arrays."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._cols: Dict[str, Any] = {f: self._zeros(max(1, capacity)) for f in _FIELDS}
+
+    # ------------------------------------------------------------------ #
+    # storage                                                            #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _zeros(n: int):
+        return np.zeros(n, dtype=np.float64) if np is not None else [0.0] * n
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def slot(self, symbol: str) -> int:
+        """Index of *symbol*, allocating a slot (and growing ×2) if new."""
+        idx = self._index.get(symbol)
+        if idx is None:
+            idx = len(self.symbols)
+            cap = len(self._cols["qty"])
+            if idx >= cap:
+                for f, col in self._cols.items():
+                    grown = self._zeros(cap * 2)
+                    grown[:cap] = col
+                    self._cols[f] = grown
+            self._index[symbol] = idx
+            self.symbols.append(symbol)
+        return idx
+
+    def _view(self, field: str):
+        return self._cols[field][: len(self.symbols)]
+
+    # ------------------------------------------------------------------ #
+    # fills                                                              #
+    # ------------------------------------------------------------------ #
+    def apply(self, symbol: str, qty: float, price: float) -> float:
+        """Book a signed fill (``qty`` < 0 sells); returns the realised P&L."""
+        i = self.slot(symbol)
+        q, avg = float(self._cols["qty"][i]), float(self._cols["avg_cost"][i])
+        realised = 0.0
+        new_q = q + qty
+        if q == 0 or (q > 0) == (qty > 0):  # open / add: re‑average the cost
+            avg = (abs(q) * avg + abs(qty) * price) / abs(new_q) if new_q else 0.0
+        else:  # reduce, close or flip
+            closed = min(abs(qty), abs(q))
+            realised = closed * (price - avg) * (1.0 if q > 0 else -1.0)
+            if new_q == 0 or abs(new_q) < 1e-12:
+                new_q, avg = 0.0, 0.0
+            elif (new_q > 0) != (q > 0):  # flipped: remainder opened at price
+                avg = price
+        cols = self._cols
+        cols["qty"][i] = new_q
+        cols["avg_cost"][i] = avg
+        cols["realised"][i] += realised
+        cols["mark"][i] = price
+        return realised
+
+    # ------------------------------------------------------------------ #
+    # queries                                                            #
+    # ------------------------------------------------------------------ #
+    def position(self, symbol: str) -> float:
+        i = self._index.get(symbol)
+        return 0.0 if i is None else float(self._cols["qty"][i])
+
+    def positions(self) -> Dict[str, float]:
+        return dict(zip(self.symbols, map(float, self._view("qty"))))
+
+    def prices(self, prices: Prices = None):
+        """Price vector aligned with :attr:`symbols`; gaps use (and refresh) marks."""
+        n = len(self.symbols)
+        mark = self._view("mark")
+        if prices is None:
+            return mark
+        if isinstance(prices, Mapping):
+            get = prices.get
+            if np is not None:
+                px = np.fromiter((get(s, math.nan) for s in self.symbols), dtype=np.float64, count=n)
+            else:
+                px = [float(get(s, math.nan)) for s in self.symbols]
+        else:
+            px = np.asarray(prices, dtype=np.float64)[:n] if np is not None else [float(p) for p in prices[:n]]
+        if np is not None:
+            px = np.where(np.isnan(px), mark, px)
+            mark[:] = px
+        else:
+            px = [m if math.isnan(p) else p for p, m in zip(px, mark)]
+            self._cols["mark"][:n] = px
+        return px
+
+    def exposures(self, prices: Prices = None):
+        """Signed market value per slot."""
+        px = self.prices(prices)
+        if np is not None:
+            return self._view("qty") * px
+        return [q * p for q, p in zip(self._view("qty"), px)]
+
+    def value(self, prices: Prices = None) -> float:
+        """Net market value of the book."""
+        exp = self.exposures(prices)
+        return float(exp.sum()) if np is not None else float(sum(exp))
+
+    def gross(self, prices: Prices = None) -> float:
+        """Gross exposure: Σ |qty × price|."""
+        exp = self.exposures(prices)
+        return float(np.abs(exp).sum()) if np is not None else float(sum(map(abs, exp)))
+
+    def weights(self, prices: Prices = None) -> Dict[str, float]:
+        """Exposure / net value per symbol (all 0.0 when the book is flat)."""
+        exp = self.exposures(prices)
+        total = float(exp.sum()) if np is not None else float(sum(exp))
+        if total == 0:
+            return dict.fromkeys(self.symbols, 0.0)
+        w = (exp / total).tolist() if np is not None else [e / total for e in exp]
+        return dict(zip(self.symbols, w))
+
+    def gross_leverage(self, prices: Prices = None) -> float:
+        """Gross exposure / |net value| (0.0 for a flat or fully hedged book)."""
+        exp = self.exposures(prices)
+        if np is not None:
+            net, gross = float(exp.sum()), float(np.abs(exp).sum())
+        else:
+            net, gross = float(sum(exp)), float(sum(map(abs, exp)))
+        return gross / abs(net) if net else 0.0
+
+    def unrealised(self, prices: Prices = None) -> Dict[str, float]:
+        """Unrealised P&L of every symbol in one pass: qty × (price − avg cost)."""
+        px = self.prices(prices)
+        qty, avg = self._view("qty"), self._view("avg_cost")
+        if np is not None:
+            pnl = (qty * (px - avg)).tolist()
+        else:
+            pnl = [q * (p - a) for q, p, a in zip(qty, px, avg)]
+        return dict(zip(self.symbols, pnl))
+
+    def unrealised_pnl(self, symbol: str, price: Optional[float] = None) -> float:
+        i = self._index.get(symbol)
+        if i is None:
+            return 0.0
+        if price is None:
+            price = float(self._cols["mark"][i])
+        return float(self._cols["qty"][i]) * (price - float(self._cols["avg_cost"][i]))
+
+    def realised_pnl(self, symbol: Optional[str] = None) -> float:
+        if symbol is None:
+            realised = self._view("realised")
+            return float(realised.sum()) if np is not None else float(sum(realised))
+        i = self._index.get(symbol)
+        return 0.0 if i is None else float(self._cols["realised"][i])
+
+    # ------------------------------------------------------------------ #
+    # persistence (portfolio snapshots)                                  #
+    # ------------------------------------------------------------------ #
+    def state(self) -> Dict[str, list]:
+        out: Dict[str, list] = {"symbols": list(self.symbols)}
+        for f in _FIELDS:
+            out[f] = [float(v) for v in self._view(f)]
+        return out
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Sequence[Any]]) -> "PositionBook":
+        book = cls(capacity=max(64, 2 * len(state["symbols"])))
+        for s in state["symbols"]:
+            book.slot(s)
+        n = len(book.symbols)
+        for f in _FIELDS:
+            if f in state:
+                book._cols[f][:n] = [float(v) for v in state[f]]
+        return book
+
+
+__all__ = ["PositionBook"]
@@ -0,0 +1,289 @@
+"""backend.process_runner
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Out‑of‑process execution for CPU‑bound agents.
+
+Agents that spend seconds inside pure‑Python or GIL‑holding native code
+(MCTS planners, CP‑SAT solves, Monte‑Carlo risk) stall every other
+agent sharing the orchestrator's event loop.  An agent opts in with::
+
+    class DrugDesignAgent(AgentBase):
+        EXECUTION = "process"
+        CPU_AFFINITY = [2, 3]        # optional
+
+or the operator lists it in ``ALPHA_PROCESS_AGENTS`` (comma separated).
+
+Each such agent lives in one **persistent** worker process (spawned, so
+no inherited locks / threads).  The parent sends ``run`` commands over a
+pipe; the worker replies with the cycle outcome and forwards every
+``backend.orchestrator._publish`` call back to the parent, so events
+keep flowing through the parent's Kafka producer / event bus.  A crashed
+worker fails the in‑flight cycle and is respawned on the next one.
+
+Environment
+-----------
+ALPHA_PROCESS_AGENTS   comma list of agent names forced into process mode
+ALPHA_PROCESS_CPUS     CPU set for workers without ``CPU_AFFINITY``,
+                       e.g. ``"2-5,8"``; cores are handed out round‑robin
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backend.agents import record_cycle
+
+logger = logging.getLogger("alpha_factory.process_runner")
+
+_PROCESS_AGENTS = {
+    x.strip().lower() for x in os.getenv("ALPHA_PROCESS_AGENTS", "").split(",") if x.strip()
+}
+
+
+def _parse_cpus(spec: str) -> List[int]:
+    cpus: List[int] = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cpus.extend(range(int(lo), int(hi) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+_CPU_POOL = _parse_cpus(os.getenv("ALPHA_PROCESS_CPUS", ""))
+_CPU_CYCLE = itertools.cycle(_CPU_POOL) if _CPU_POOL else None
+
+
+def wants_process(name: str, cls: Any) -> bool:
+    """True if *name* / *cls* should run in a dedicated worker process."""
+    if name.lower() in _PROCESS_AGENTS:
+        return True
+    return str(getattr(cls, "EXECUTION", "")).lower() == "process"
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died while a cycle was in flight."""
+
+
+# --------------------------------------------------------------------- #
+# Worker side                                                           #
+# --------------------------------------------------------------------- #
+def _worker_main(
+    name: str, conn: Any, cpus: Optional[Sequence[int]], target: Optional[str] = None
+) -> None:  # pragma: no cover
+    """Entry‑point of the spawned process: host *name* and serve ``run``."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, set(cpus))
+        except OSError as exc:
+            logger.warning("%s: CPU pinning to %s failed (%s)", name, cpus, exc)
+
+    send_lock = threading.Lock()
+
+    def _send(msg: tuple) -> None:
+        with send_lock:
+            conn.send(msg)
+
+    # Route the agent's events to the parent before the agent is imported
+    import backend.orchestrator as orch
+
+    orch._publish_hook = lambda topic, payload: _send(("event", topic, payload))
+
+    import backend.agents as agents
+
+    agents._HEALTH_EMIT = False  # the parent aggregates our "done" latencies
+    if name not in agents.AGENT_REGISTRY and target:
+        # registered at runtime in the parent (register_agent) – not discovered here
+        import importlib
+
+        mod_name, _, qualname = target.partition(":")
+        cls = importlib.import_module(mod_name)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        agents.register_agent(agents.AgentMetadata(name=name, cls=cls))
+    agent = agents.get_agent(name)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    _send(("ready", os.getpid()))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if msg[0] == "stop":
+            break
+        seq = msg[1]
+        t0 = time.perf_counter()
+        try:
+            fn = agent.run_cycle
+            if asyncio.iscoroutinefunction(fn):
+                loop.run_until_complete(fn())
+            else:
+                fn()
+            _send(("done", seq, True, None, (time.perf_counter() - t0) * 1000))
+        except Exception as exc:  # noqa: BLE001
+            _send(("done", seq, False, f"{type(exc).__name__}: {exc}", (time.perf_counter() - t0) * 1000))
+    close = getattr(agent, "close", None)
+    if callable(close):  # e.g. pipelined AgentBase: finish in‑flight cycles
+        if asyncio.iscoroutinefunction(close):
+            loop.run_until_complete(close())
+        else:
+            close()
+    loop.close()
+
+
+# --------------------------------------------------------------------- #
+# Parent side                                                           #
+# --------------------------------------------------------------------- #
+class ProcessAgent:
+    """Proxy that runs ``cls.run_cycle`` for agent *name* in a worker process.
+
+    Class‑level attributes (``CYCLE_SECONDS``, ``SCHED_SPEC`` …) are read
+    from *cls* so the parent never instantiates the heavy agent itself.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cls: Any,
+        publish: Callable[[str, Dict[str, Any]], None],
+    ) -> None:
+        self.name = name
+        self._cls = cls
+        self._publish = publish
+        cpus = getattr(cls, "CPU_AFFINITY", None)
+        if not cpus and _CPU_CYCLE is not None:
+            cpus = [next(_CPU_CYCLE)]
+        self.cpus: Optional[List[int]] = list(cpus) if cpus else None
+
+        self._ctx = mp.get_context("spawn")
+        self._proc: Optional[Any] = None
+        self._conn: Optional[Any] = None
+        self._seq = itertools.count(1)
+        # in‑flight cycles of the *current* worker; every spawn gets a new
+        # dict so a dying worker's reader only fails its own cycles
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self._cls, item)
+
+    # ------------------------------------------------------------------ #
+    # lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def _spawn(self) -> None:
+        if self._proc is not None:
+            self.restarts += 1
+            logger.warning("%s: restarting worker process (restart #%d)", self.name, self.restarts)
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(self.name, child, self.cpus, self._target()),
+            name=f"agent-{self.name}",
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        waiters: Dict[int, asyncio.Future] = {}
+        with self._lock:
+            self._proc, self._conn, self._waiters = proc, parent, waiters
+        threading.Thread(
+            target=self._reader, args=(parent, waiters), name=f"agent-{self.name}-rx", daemon=True
+        ).start()
+        logger.info("%s: worker pid=%s cpus=%s", self.name, proc.pid, self.cpus or "any")
+
+    def _target(self) -> Optional[str]:
+        cls = self._cls
+        if cls is None or "<locals>" in getattr(cls, "__qualname__", "<locals>"):
+            return None
+        return f"{cls.__module__}:{cls.__qualname__}"
+
+    def _reader(self, conn: Any, waiters: Dict[int, asyncio.Future]) -> None:
+        """Pump events and results from the worker until its pipe closes."""
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = msg[0]
+            if kind == "event":
+                try:
+                    self._publish(msg[1], msg[2])
+                except Exception:  # noqa: BLE001
+                    logger.exception("%s: forwarding event %s failed", self.name, msg[1])
+            elif kind == "done":
+                _, seq, ok, err, latency = msg
+                record_cycle(self.name, latency, ok)
+                self._resolve(waiters, seq, None if ok else RuntimeError(err))
+
+        # pipe closed → this worker is gone; fail what is still pending on it
+        with self._lock:
+            pending = list(waiters)
+        for seq in pending:
+            self._resolve(waiters, seq, WorkerCrashed(f"{self.name} worker exited"))
+
+    def _resolve(self, waiters: Dict[int, asyncio.Future], seq: int, exc: Optional[BaseException]) -> None:
+        with self._lock:
+            fut = waiters.pop(seq, None)
+        if fut is None or self._loop is None:
+            return
+
+        def _set() -> None:
+            if fut.done():
+                return
+            if exc is None:
+                fut.set_result(None)
+            else:
+                fut.set_exception(exc)
+
+        self._loop.call_soon_threadsafe(_set)
+
+    # ------------------------------------------------------------------ #
+    # public API (what AgentRunner calls)                                #
+    # ------------------------------------------------------------------ #
+    async def run_cycle(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if not self._alive():
+            self._spawn()
+        seq = next(self._seq)
+        fut: asyncio.Future = self._loop.create_future()
+        with self._lock:
+            waiters, conn = self._waiters, self._conn
+            waiters[seq] = fut
+        try:
+            conn.send(("run", seq))  # type: ignore[union-attr]
+        except (BrokenPipeError, OSError) as exc:
+            with self._lock:
+                waiters.pop(seq, None)
+            raise WorkerCrashed(f"{self.name} worker unreachable") from exc
+        await fut
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        if self._proc is not None:
+            self._proc.join(timeout=5)
+            if self._proc.is_alive():
+                self._proc.terminate()
+
+
+__all__ = ["ProcessAgent", "WorkerCrashed", "wants_process"]
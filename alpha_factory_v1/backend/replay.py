@@ -0,0 +1,300 @@
+"""backend.replay
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Columnar trace archives and an offline replay benchmark for
+:class:`backend.agent_base.AgentBase` agents.
+
+* **Export** – :func:`export_traces` pulls ``trace:*`` spans from
+  :class:`backend.memory.Memory` (indexed query, optional agent / time
+  filter) and writes one column per field: ``ts``, ``agent``, ``phase``,
+  ``cycle_id``, ``payload`` (JSON text) and the phase timings.  The
+  format follows the file suffix – ``.parquet`` (pyarrow, zstd), ``.npz``
+  (numpy, payloads as one byte buffer + offsets) or anything else as
+  gzip‑compressed column JSON (stdlib only).
+* **Replay** – :func:`replay` groups spans by ``cycle_id`` and feeds each
+  recorded ``observe`` output through *another* agent version's
+  ``think`` → ``gov.vet_plans`` → ``act`` with outbound network disabled.
+  Truncated payloads are resolved from the tracer's blob store.
+* **Report** – per phase: calls, errors, throughput, p50/p95/max latency
+  next to the recorded p50, and how many outputs differ from the
+  recording; the first differences are listed path by path.
+
+CLI::
+
+    python -m backend.replay export traces.npz --agent finance
+    python -m backend.replay run traces.npz my_pkg.agents:make_candidate
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gzip
+import json
+import math
+import socket
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    pa = pq = None  # type: ignore
+
+COLUMNS = ("ts", "agent", "phase", "cycle_id", "payload", "wall_ms", "cpu_ms", "alloc_blocks", "payload_bytes", "ok")
+_TEXT = ("ts", "agent", "phase", "cycle_id")
+_NUMERIC = ("wall_ms", "cpu_ms", "alloc_blocks", "payload_bytes")
+_REPLAYED = ("think", "vet", "act")
+
+Columns = Dict[str, list]
+
+
+# ----------------------------------------------------------------------------
+# Archive
+# ----------------------------------------------------------------------------
+def _to_columns(records: List[Dict[str, Any]]) -> Columns:
+    cols: Columns = {c: [] for c in COLUMNS}
+    for rec in records:
+        span = rec.get("data") or {}
+        timing = span.get("timing") or {}
+        cols["ts"].append(span.get("ts") or rec.get("ts") or "")
+        cols["agent"].append(rec.get("agent") or "")
+        cols["phase"].append(span.get("phase") or str(rec.get("kind", "")).partition(":")[2])
+        cols["cycle_id"].append(span.get("cycle_id") or "")
+        cols["payload"].append(json.dumps(span.get("payload"), separators=(",", ":"), default=str))
+        for key in _NUMERIC:
+            cols[key].append(timing.get(key))
+        cols["ok"].append(bool(timing.get("ok", True)))
+    return cols
+
+
+def write_archive(cols: Columns, path: "str | Path") -> Path:
+    """Write *cols* to *path*; the suffix selects the format."""
+    path = Path(path)
+    if path.suffix == ".npz":
+        if np is None:
+            raise RuntimeError("numpy is required for .npz archives")
+        blobs = [p.encode() for p in cols["payload"]]
+        arrays = {c: np.array(cols[c], dtype=str) for c in _TEXT}
+        arrays.update({c: np.array([math.nan if v is None else v for v in cols[c]], dtype=np.float64) for c in _NUMERIC})
+        arrays["ok"] = np.array(cols["ok"], dtype=bool)
+        arrays["payload_data"] = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+        arrays["payload_offsets"] = np.cumsum([0] + [len(b) for b in blobs], dtype=np.int64)
+        with path.open("wb") as fh:  # savez appends ".npz" to bare str paths
+            np.savez_compressed(fh, **arrays)
+    elif path.suffix == ".parquet":
+        if pa is None:
+            raise RuntimeError("pyarrow is required for .parquet archives")
+        pq.write_table(pa.table({c: cols[c] for c in COLUMNS}), path, compression="zstd")
+    else:
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            json.dump({"columns": cols}, fh, separators=(",", ":"))
+    return path
+
+
+def load_archive(path: "str | Path") -> Columns:
+    path = Path(path)
+    if path.suffix == ".npz":
+        if np is None:
+            raise RuntimeError("numpy is required for .npz archives")
+        with np.load(path) as z:
+            cols: Columns = {c: z[c].tolist() for c in _TEXT}
+            for c in _NUMERIC:
+                cols[c] = [None if math.isnan(v) else v for v in z[c].tolist()]
+            cols["ok"] = z["ok"].tolist()
+            data, offs = z["payload_data"].tobytes(), z["payload_offsets"].tolist()
+            cols["payload"] = [data[a:b].decode() for a, b in zip(offs, offs[1:])]
+        return cols
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError("pyarrow is required for .parquet archives")
+        return pq.read_table(path).to_pydict()
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return json.load(fh)["columns"]
+
+
+def export_traces(memory, path: "str | Path", *, agent: Optional[str] = None,
+                  since: Any = None, until: Any = None, limit: int = 1_000_000) -> Path:
+    """Archive ``trace:*`` spans from *memory* (see module docstring)."""
+    records = memory.query(agent=agent, kind="trace:*", since=since, until=until, limit=limit)
+    return write_archive(_to_columns(records), path)
+
+
+def iter_cycles(cols: Columns) -> Iterator[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """``(cycle_id, {phase: row})`` in recording order; spans without a cycle are skipped."""
+    cycles: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for i, cid in enumerate(cols["cycle_id"]):
+        if cid:
+            cycles.setdefault(cid, {})[cols["phase"][i]] = {c: cols[c][i] for c in COLUMNS}
+    yield from cycles.items()
+
+
+# ----------------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------------
+@contextlib.contextmanager
+def no_network() -> Iterator[None]:
+    """Refuse every outbound connection / DNS lookup inside the block."""
+    def _refuse(*_a, **_kw):
+        raise ConnectionRefusedError("network disabled during replay")
+
+    saved = (socket.socket.connect, socket.socket.connect_ex, socket.create_connection, socket.getaddrinfo)
+    socket.socket.connect = socket.socket.connect_ex = _refuse  # type: ignore[assignment]
+    socket.create_connection = socket.getaddrinfo = _refuse  # type: ignore[assignment]
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.socket.connect_ex, socket.create_connection, socket.getaddrinfo = saved
+
+
+def _payload(row: Dict[str, Any]) -> Any:
+    value = json.loads(row["payload"])
+    if isinstance(value, dict) and value.get("truncated") and str(value.get("ref", "")).startswith("blob:"):
+        with gzip.open(value["ref"][5:], "rb") as fh:  # full payload from the tracer's blob store
+            return json.loads(fh.read())
+    return value
+
+
+def _normalise(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def diff(old: Any, new: Any, path: str = "$", limit: int = 20) -> List[str]:
+    """Paths where *new* differs from *old* (at most *limit*)."""
+    out: List[str] = []
+
+    def walk(a: Any, b: Any, p: str) -> None:
+        if len(out) >= limit:
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            for k in sorted(set(a) | set(b), key=str):
+                if k not in b:
+                    out.append(f"{p}.{k}: removed")
+                elif k not in a:
+                    out.append(f"{p}.{k}: added")
+                else:
+                    walk(a[k], b[k], f"{p}.{k}")
+        elif isinstance(a, list) and isinstance(b, list):
+            if len(a) != len(b):
+                out.append(f"{p}: length {len(a)} → {len(b)}")
+            for i, (x, y) in enumerate(zip(a, b)):
+                walk(x, y, f"{p}[{i}]")
+        elif a != b:
+            out.append(f"{p}: {a!r} → {b!r}")
+
+    walk(old, new, path)
+    return out
+
+
+def _quantile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def replay(agent, cols: Columns, *, max_diffs: int = 20) -> Dict[str, Any]:
+    """Re‑run recorded cycles through *agent*; return a benchmark report."""
+    lat: Dict[str, List[float]] = {p: [] for p in _REPLAYED}
+    recorded: Dict[str, List[float]] = {p: [] for p in _REPLAYED}
+    errors = {p: 0 for p in _REPLAYED}
+    changed = {p: 0 for p in _REPLAYED}
+    diffs: List[Dict[str, Any]] = []
+    replayed = skipped = 0
+
+    def timed(ph: str, fn: Callable[[], Any]) -> Tuple[bool, Any]:
+        t0 = time.perf_counter()
+        try:
+            return True, fn()
+        except Exception as exc:  # noqa: BLE001 – a failing phase is a result
+            errors[ph] += 1
+            return False, exc
+        finally:
+            lat[ph].append((time.perf_counter() - t0) * 1000)
+
+    with no_network():
+        for cid, spans in iter_cycles(cols):
+            if "observe" not in spans:
+                skipped += 1
+                continue
+            replayed += 1
+            for ph in _REPLAYED:
+                if ph in spans and spans[ph]["wall_ms"] is not None:
+                    recorded[ph].append(spans[ph]["wall_ms"])
+
+            ok, ideas = timed("think", lambda: agent.think(_payload(spans["observe"])))
+            if ok:
+                ok, vetted = timed("vet", lambda: agent.gov.vet_plans(agent, ideas))
+            if ok:
+                timed("act", lambda: agent.act(vetted))
+            for ph, out in (("think", ideas), ("vet", vetted if ok else None)):
+                if ph not in spans or out is None or isinstance(out, Exception):
+                    continue
+                changes = diff(_payload(spans[ph]), _normalise(out))
+                if changes:
+                    changed[ph] += 1
+                    if len(diffs) < max_diffs:
+                        diffs.append({"cycle_id": cid, "phase": ph, "changes": changes})
+
+    phases = {}
+    for ph in _REPLAYED:
+        total_s = sum(lat[ph]) / 1000
+        phases[ph] = {
+            "calls": len(lat[ph]),
+            "errors": errors[ph],
+            "changed": changed[ph],
+            "throughput_per_s": round(len(lat[ph]) / total_s, 2) if total_s > 0 else None,
+            "p50_ms": round(_quantile(lat[ph], 0.5), 3),
+            "p95_ms": round(_quantile(lat[ph], 0.95), 3),
+            "max_ms": round(max(lat[ph], default=0.0), 3),
+            "recorded_p50_ms": round(_quantile(recorded[ph], 0.5), 3) if recorded[ph] else None,
+        }
+    return {"cycles": replayed, "skipped": skipped, "phases": phases, "diffs": diffs}
+
+
+# ----------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------
+def _load_factory(spec: str) -> Callable[[], Any]:
+    import importlib
+
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m backend.replay", description="Trace archive export and replay benchmark")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="archive trace spans from memory")
+    ex.add_argument("out")
+    ex.add_argument("--agent")
+    ex.add_argument("--since")
+    ex.add_argument("--until")
+    ex.add_argument("--memory-dir")
+    run = sub.add_parser("run", help="replay an archive through another agent version")
+    run.add_argument("archive")
+    run.add_argument("factory", help="module:callable returning the candidate agent")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "export":
+        from backend.memory import Memory
+
+        path = export_traces(Memory(args.memory_dir), args.out, agent=args.agent, since=args.since, until=args.until)
+        print(path)
+    else:
+        report = replay(_load_factory(args.factory)(), load_archive(args.archive))
+        print(json.dumps(report, indent=2, default=str))
+
+
+__all__ = ["COLUMNS", "diff", "export_traces", "iter_cycles", "load_archive", "no_network", "replay", "write_archive"]
+
+if __name__ == "__main__":
+    main()
+
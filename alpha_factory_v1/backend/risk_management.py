@@ -9,11 +9,28 @@ Self‑contained risk‑management helper for *α‑Factory* FinanceAgent.
 • **Max draw‑down** tracker on the running equity curve.
 • Stateless API + tiny on‑disk cache to survive crashes / restarts.
 
-The module is deliberately NumPy‑only (no heavy pandas dependency) and
-works even when running on constrained edge devices.
-
-If `numpy` is unavailable, the Monte‑Carlo branches gracefully degrade
-to a conservative constant VaR estimate.
+Every tick is O(1) – the cost does not grow with the history:
+
+• the last ``lookback`` log‑returns live in a preallocated ring buffer
+  with a rolling mean / variance (Welford add + remove, re‑summed once
+  per ring turn to cancel drift);
+• the VaR quantile comes from a sorted copy of the same window (one
+  ``bisect`` insert + delete per tick, bounded by ``lookback``), i.e. the
+  exact historical quantile rather than an approximation;
+• the peak for draw‑down is a running maximum;
+• the equity curve is persisted append‑only as raw float64 values
+  (``equity_curve.f64``, 8 bytes per tick).  A legacy JSON cache is
+  migrated on first start.
+
+Start‑up does not grow with the history either: the running peak is
+saved next to the curve (``equity_peak.bin``, with the number of points
+it covers) once per ``lookback`` points and on ``close()`` – also run at
+interpreter exit – and only the last ``lookback`` points are replayed
+through the window.  Points the saved peak does not cover (at most one
+``lookback`` after a crash) are only scanned for their maximum.
+
+No NumPy (or pandas) is needed, so the module also runs on constrained
+edge devices.
 
 Usage
 -----
@@ -33,22 +50,25 @@ risk.enforce_limits()
 
 from __future__ import annotations
 
+import atexit
+import bisect
 import json
+import logging
 import math
 import os
-import time
+import struct
+import sys
+import weakref
+from array import array
 from pathlib import Path
-from typing import List, Sequence
-
-try:
-    import numpy as _np
-except ModuleNotFoundError:  # pragma: no cover
-    _np = None  # runtime fallback – we will skip MC VaR calc
+from typing import List, Optional
 
 # ---------------------------------------------------------------------------
 
 __all__ = ["RiskManager", "RiskLimitError"]
 
+logger = logging.getLogger("alpha_factory.risk")
+
 
 class RiskLimitError(RuntimeError):
     """Raised when VaR / draw‑down breaches a hard limit."""
@@ -58,23 +78,83 @@ class RiskLimitError(RuntimeError):
 
 _CACHE_DIR = Path(os.getenv("ALPHA_DATA_DIR", "/tmp/alphafactory")) / "risk"
 _CACHE_DIR.mkdir(parents=True, exist_ok=True)
-_EQ_CACHE = _CACHE_DIR / "equity_curve.json"
+_EQ_FILE = "equity_curve.f64"
+_LEGACY_JSON = "equity_curve.json"
+_PEAK_FILE = "equity_peak.bin"
+_F64 = struct.Struct("<d")
+_PEAK = struct.Struct("<dq")  # running peak, equity points it covers
+_READ_CHUNK = 1 << 16  # values per read while scanning the history
 
-
-def _load_equity_cache() -> List[float]:
-    if _EQ_CACHE.exists():
-        try:
-            return json.loads(_EQ_CACHE.read_text())
-        except Exception:  # pragma: no cover
-            return []
-    return []
+_OPEN: "weakref.WeakSet[RiskManager]" = weakref.WeakSet()  # closed at exit
 
 
-def _save_equity_cache(curve: Sequence[float]) -> None:
+def _migrate_legacy(cache_dir: Path) -> None:
+    """One‑off: JSON list cache → append‑only float64 file."""
+    legacy, target = cache_dir / _LEGACY_JSON, cache_dir / _EQ_FILE
+    if not legacy.exists() or target.exists():
+        return
     try:
-        _EQ_CACHE.write_text(json.dumps(curve[-5000:]))  # keep ≤ ~5k pts
-    except Exception:  # pragma: no cover
-        pass
+        curve = [float(v) for v in json.loads(legacy.read_text())]
+    except Exception:  # pragma: no cover – unreadable cache, start afresh
+        curve = []
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(b"".join(map(_F64.pack, curve)))
+    os.replace(tmp, target)
+    legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+    logger.info("Migrated %d equity points to %s", len(curve), target.name)
+
+
+class _RollingWindow:
+    """Last *size* samples: ring buffer + rolling mean/variance + sorted copy."""
+
+    __slots__ = ("size", "_ring", "_sorted", "_head", "n", "mean", "_m2", "_turn")
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self._ring = array("d", bytes(8 * self.size))  # preallocated
+        self._sorted: List[float] = []
+        self._head = 0  # next write position
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._turn = 0
+
+    def push(self, x: float) -> None:
+        if self.n == self.size:  # evict the oldest sample
+            old = self._ring[self._head]
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+            self.n -= 1
+            if self.n:
+                d = old - self.mean
+                self.mean -= d / self.n
+                self._m2 -= d * (old - self.mean)
+            else:
+                self.mean = self._m2 = 0.0
+        self._ring[self._head] = x
+        self._head = (self._head + 1) % self.size
+        bisect.insort(self._sorted, x)
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self._m2 += d * (x - self.mean)
+        self._turn += 1
+        if self._turn >= self.size:  # once per ring turn: exact re‑sum, amortised O(1)
+            self._turn = 0
+            vals = self._sorted
+            self.mean = math.fsum(vals) / self.n
+            self._m2 = math.fsum((v - self.mean) ** 2 for v in vals)
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof = 1)."""
+        return math.sqrt(max(self._m2, 0.0) / (self.n - 1)) if self.n > 1 else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Linear‑interpolated quantile (same definition as ``numpy.quantile``)."""
+        vals = self._sorted
+        h = (len(vals) - 1) * q
+        lo = math.floor(h)
+        hi = min(lo + 1, len(vals) - 1)
+        return vals[lo] + (h - lo) * (vals[hi] - vals[lo])
 
 
 # ---------------------------------------------------------------------------
@@ -102,6 +182,7 @@ class RiskManager:
         max_var_pct: float = 0.02,
         max_drawdown_pct: float = 0.20,
         lookback_days: int = 250,
+        cache_dir: Optional[Path] = None,
     ) -> None:
         if not 0.9 <= confidence < 1:
             raise ValueError("confidence should be 0.9 ≤ c < 1")
@@ -110,54 +191,125 @@ class RiskManager:
         self.max_drawdown_pct = max_drawdown_pct
         self.lookback = lookback_days
 
-        self._equity_curve: List[float] = _load_equity_cache()
-
-        # pre‑warm
-        self._peak_equity = max(self._equity_curve, default=0.0)
+        self._returns = _RollingWindow(lookback_days - 1)  # lookback points → returns
+        self._peak_equity = 0.0
+        self._last: Optional[float] = None
+        self._points = 0
+
+        cache_dir = Path(cache_dir) if cache_dir is not None else _CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _migrate_legacy(cache_dir)
+        self._path = cache_dir / _EQ_FILE
+        self._peak_path = cache_dir / _PEAK_FILE
+        self._replay()  # pre‑warm: the last ``lookback`` points only
+        self._fh = self._path.open("ab")
+        _OPEN.add(self)
+
+    def _replay(self) -> None:
+        if not self._path.exists():
+            return
+        size = self._path.stat().st_size
+        size -= size % _F64.size  # ignore a torn final write
+        points = size // _F64.size
+        peak, covered = self._load_peak(points)
+        start = max(0, points - self.lookback)  # first point the window needs
+        with self._path.open("rb") as fh:
+            fh.seek(covered * _F64.size)
+            while covered < start:  # older points: the maximum is all we need
+                vals = array("d")
+                vals.frombytes(fh.read(min(_READ_CHUNK, start - covered) * _F64.size))
+                if sys.byteorder != "little":  # pragma: no cover
+                    vals.byteswap()
+                peak = max(peak, max(vals))
+                covered += len(vals)
+            fh.seek(start * _F64.size)
+            for (v,) in _F64.iter_unpack(fh.read((points - start) * _F64.size)):
+                self._observe(v)
+        self._peak_equity = max(self._peak_equity, peak)
+        self._points = points
+        if self._path.stat().st_size != size:
+            os.truncate(self._path, size)
+        self._save_peak()
+
+    def _load_peak(self, points: int):
+        """Saved ``(peak, points covered)``; ``(0.0, 0)`` if missing or stale."""
+        try:
+            peak, covered = _PEAK.unpack(self._peak_path.read_bytes())
+        except (OSError, struct.error):
+            return 0.0, 0
+        if not 0 <= covered <= points:  # curve replaced or truncated since
+            return 0.0, 0
+        return peak, covered
+
+    def _save_peak(self) -> None:
+        tmp = self._peak_path.with_name(self._peak_path.name + ".tmp")
+        try:
+            tmp.write_bytes(_PEAK.pack(self._peak_equity, self._points))
+            os.replace(tmp, self._peak_path)
+        except OSError:  # pragma: no cover – the full scan still works
+            logger.debug("equity peak not persisted", exc_info=True)
+
+    def _observe(self, equity_value: float) -> None:
+        if self._last is not None and self._last > 0:
+            self._returns.push(math.log(equity_value / self._last))
+        self._last = equity_value
+        self._points += 1
+        if equity_value > self._peak_equity:
+            self._peak_equity = equity_value
 
     # ------------------------------------------------------------------ API
 
     def update_equity_curve(self, equity_value: float) -> None:
-        """Append new equity point and persist to disk."""
+        """Append new equity point and persist it (8 bytes appended)."""
         if equity_value <= 0:
             raise ValueError("Equity must be positive")
-        self._equity_curve.append(float(equity_value))
-        if equity_value > self._peak_equity:
-            self._peak_equity = equity_value
-
-        _save_equity_cache(self._equity_curve)
+        equity_value = float(equity_value)
+        self._observe(equity_value)
+        try:
+            self._fh.write(_F64.pack(equity_value))
+            self._fh.flush()
+        except Exception:  # pragma: no cover
+            logger.debug("equity point not persisted", exc_info=True)
+            return
+        if self._points % self.lookback == 0:  # keeps the restart scan within one lookback
+            self._save_peak()
 
     def var_pct(self) -> float:
         """Current 1‑day VaR as % of equity (historical / parametric)."""
-        if _np is None or len(self._equity_curve) < 2:
+        rets = self._returns
+        if rets.n < 10:  # not enough data
             # Fallback: pessimistic constant (5 × daily std dev guess)
             return 0.05
 
-        # compute daily log‑returns
-        eq = _np.array(self._equity_curve[-self.lookback :], dtype=float)
-        rets = _np.diff(_np.log(eq))
-        if len(rets) < 10:  # not enough data
-            return 0.05
-
-        mu = rets.mean()
-        sigma = rets.std(ddof=1)
+        mu = rets.mean
+        sigma = rets.std()
         # parametric VaR (Gaussian) – 1‑day horizon
-        z = _np.abs(_np.quantile(rets, 1 - self.confidence))
+        z = abs(rets.quantile(1 - self.confidence))
         var = mu - z * sigma
         return abs(var)
 
     def drawdown_pct(self) -> float:
         """Latest draw‑down from peak, as %."""
-        if not self._equity_curve:
+        if self._last is None:
             return 0.0
-        last = self._equity_curve[-1]
-        return (self._peak_equity - last) / self._peak_equity if self._peak_equity else 0.0
+        return (self._peak_equity - self._last) / self._peak_equity if self._peak_equity else 0.0
+
+    def __len__(self) -> int:
+        """Equity points recorded (including the persisted history)."""
+        return self._points
+
+    def close(self) -> None:
+        _OPEN.discard(self)
+        if self._fh.closed:
+            return
+        self._fh.close()
+        self._save_peak()
 
     # ------------------------------------------------ enforcement / guard
 
     def enforce_limits(self) -> None:
         """Raise :class:`RiskLimitError` if any limit is breached."""
-        current_equity = self._equity_curve[-1] if self._equity_curve else 0.0
+        current_equity = self._last or 0.0
         if current_equity <= 0:  # pragma: no cover
             raise RiskLimitError("Equity unavailable; risk check failed")
 
@@ -172,3 +324,9 @@ class RiskManager:
             raise RiskLimitError(
                 f"Draw‑down {dd:.2%} exceeds limit {self.max_drawdown_pct:.2%}"
             )
+
+
+@atexit.register
+def _close_all() -> None:
+    for risk in list(_OPEN):
+        risk.close()
@@ -0,0 +1,282 @@
+"""backend.router
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Load‑ and latency‑aware capability routing.
+
+``capability_agents()`` only says *who* can serve a capability; when
+several local agents – or remote swarm hosts from ``ALPHA_REMOTE_HOSTS``
+(see ``docs/REMOTE_SWARM.md``) – qualify, :func:`route` picks one::
+
+    with route("risk_management") as h:
+        if h.kind == "local":
+            result = await get_agent(h.target).run_cycle()
+        else:
+            result = await a2a_send(h.target, ...)
+
+The handle counts as *in flight* until the ``with`` block exits; its
+latency and outcome then feed the next decisions.
+
+* **Policies** – ``p2c`` (default): sample two healthy candidates, keep
+  the cheaper; ``lor``: least outstanding requests over all candidates.
+* **Cost** – ``(in_flight + 1) × latency × (1 + 10 × error_rate)``.
+  Latency is the larger of the router's own EWMA and the agent's p95
+  from :func:`backend.agents.health_snapshot`.
+* **Health** – quarantined agents and targets (local or remote) that
+  failed ``ALPHA_ROUTER_MAX_FAILS`` times in a row – e.g. an agent whose
+  module does not load – are cooled down for ``ALPHA_ROUTER_COOLDOWN_SEC``
+  and only used when nothing else is left.
+* **Metrics** – every decision is counted per capability / target.
+
+Remote hosts are candidates only for the capabilities they advertise:
+``host:port=cap_a|cap_b`` in ``ALPHA_REMOTE_HOSTS`` (``*`` opts a host in
+for every capability), or :meth:`CapabilityRouter.advertise` once the
+host's A2A agent card is known.  A bare ``host:port`` serves nothing.
+
+Environment
+-----------
+ALPHA_REMOTE_HOSTS          comma list of ``host:port[=cap|cap…]`` A2A endpoints
+ALPHA_ROUTER_POLICY         p2c | lor (p2c)
+ALPHA_ROUTER_MAX_FAILS      consecutive failures before a host cools down (3)
+ALPHA_ROUTER_COOLDOWN_SEC   how long an unhealthy remote is avoided (30)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from prometheus_client import Counter, Gauge  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Counter = Gauge = None  # type: ignore
+
+from backend.agents import AGENT_REGISTRY, capability_agents, health_snapshot
+
+logger = logging.getLogger("alpha_factory.router")
+
+ENV = os.getenv
+
+_POLICIES = ("p2c", "lor")
+_DEFAULT_LATENCY_MS = 100.0  # prior for targets never observed
+_EWMA_ALPHA = 0.2
+
+# ----------------------------------------------------------------------------
+# Metrics (no‑ops if prometheus_client unavailable)
+# ----------------------------------------------------------------------------
+if Counter and Gauge:
+    MET_ROUTE = Counter("router_decisions_total", "Capability routing decisions", ["capability", "target", "policy"])
+    MET_ROUTE_MISS = Counter("router_no_target_total", "Routes requested for a capability nobody serves", ["capability"])
+    MET_ROUTE_INFLIGHT = Gauge("router_inflight", "Requests routed to a target and not yet finished", ["target"])
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def inc(self, *_a):
+            pass
+
+        def dec(self, *_a):
+            pass
+
+    MET_ROUTE = MET_ROUTE_MISS = MET_ROUTE_INFLIGHT = _Noop()
+
+
+class _TargetStats:
+    __slots__ = ("inflight", "ewma_ms", "fails", "down_until")
+
+    def __init__(self) -> None:
+        self.inflight = 0
+        self.ewma_ms: Optional[float] = None
+        self.fails = 0
+        self.down_until = 0.0
+
+
+class RouteHandle:
+    """One routed request; use as (async) context manager or call :meth:`done`."""
+
+    __slots__ = ("router", "capability", "target", "kind", "_t0", "_open")
+
+    def __init__(self, router: "CapabilityRouter", capability: str, target: str, kind: str) -> None:
+        self.router = router
+        self.capability = capability
+        self.target = target  # agent name (local) or host:port (remote)
+        self.kind = kind  # "local" | "remote"
+        self._t0 = time.perf_counter()
+        self._open = True
+
+    def done(self, ok: bool = True) -> None:
+        if self._open:
+            self._open = False
+            self.router._finish(self.target, (time.perf_counter() - self._t0) * 1000, ok)
+
+    def __enter__(self) -> "RouteHandle":
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb) -> None:
+        self.done(exc_type is None)
+
+    async def __aenter__(self) -> "RouteHandle":
+        return self
+
+    async def __aexit__(self, exc_type, _exc, _tb) -> None:
+        self.done(exc_type is None)
+
+    def __repr__(self) -> str:
+        return f"RouteHandle({self.capability!r} → {self.kind}:{self.target})"
+
+
+class CapabilityRouter:
+    """Choose among agents / remote hosts that share a capability."""
+
+    def __init__(
+        self,
+        remote_hosts: Optional[Dict[str, Iterable[str]]] = None,
+        *,
+        policy: str = "p2c",
+        max_fails: int = 3,
+        cooldown: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if policy not in _POLICIES:
+            logger.warning("Unknown router policy '%s' – using 'p2c'", policy)
+            policy = "p2c"
+        self.policy = policy
+        self.max_fails = max(1, max_fails)
+        self.cooldown = cooldown
+        self._rng = rng or random.Random()
+        self._stats: Dict[str, _TargetStats] = {}
+        self._lock = threading.Lock()
+        self.remote_hosts: Dict[str, Set[str]] = {}
+        for host, caps in (remote_hosts or {}).items():
+            self.advertise(host, caps)
+
+    @classmethod
+    def from_env(cls) -> "CapabilityRouter":
+        hosts: Dict[str, List[str]] = {}
+        for item in ENV("ALPHA_REMOTE_HOSTS", "").split(","):
+            host, _, caps = item.partition("=")
+            if host.strip():
+                hosts[host.strip()] = [c.strip() for c in caps.split("|") if c.strip()]
+        return cls(
+            hosts,
+            policy=ENV("ALPHA_ROUTER_POLICY", "p2c").lower(),
+            max_fails=int(ENV("ALPHA_ROUTER_MAX_FAILS", "3")),
+            cooldown=float(ENV("ALPHA_ROUTER_COOLDOWN_SEC", "30")),
+        )
+
+    # ------------------------------------------------------------------ #
+    # scoring                                                            #
+    # ------------------------------------------------------------------ #
+    def _healthy(self, target: str, kind: str, now: float) -> bool:
+        if self._stats[target].down_until > now:
+            return False
+        if kind == "local":
+            meta = AGENT_REGISTRY.get(target)
+            return meta is not None and not meta.version.endswith("+stub")
+        return True
+
+    def _cost(self, target: str, kind: str) -> float:
+        st = self._stats[target]
+        latency = st.ewma_ms or _DEFAULT_LATENCY_MS
+        error_rate = 0.0
+        if kind == "local":
+            snap = health_snapshot(target)
+            if snap:
+                latency = max(latency, snap["p95_ms"])
+                error_rate = snap["error_rate"]
+        return (st.inflight + 1) * latency * (1.0 + 10.0 * error_rate)
+
+    # ------------------------------------------------------------------ #
+    # public API                                                         #
+    # ------------------------------------------------------------------ #
+    def advertise(self, host: str, capabilities: Iterable[str]) -> None:
+        """Set the capabilities remote *host* serves (empty: none)."""
+        caps = set(capabilities)
+        with self._lock:
+            self.remote_hosts[host] = caps
+        if not caps:
+            logger.warning("Remote host %s advertises no capabilities – never routed to", host)
+
+    def candidates(self, capability: str) -> List[tuple]:
+        local = [(name, "local") for name in capability_agents(capability)]
+        return local + [
+            (host, "remote") for host, caps in list(self.remote_hosts.items())
+            if capability in caps or "*" in caps
+        ]
+
+    def route(self, capability: str) -> RouteHandle:
+        """Pick a target for *capability* and mark it in flight.
+
+        Raises :class:`LookupError` when no agent or host serves it.
+        """
+        cands = self.candidates(capability)
+        if not cands:
+            MET_ROUTE_MISS.labels(capability).inc()
+            raise LookupError(f"no agent provides capability {capability!r}")
+
+        now = time.time()
+        with self._lock:
+            for target, _ in cands:
+                if target not in self._stats:
+                    self._stats[target] = _TargetStats()
+            pool = [c for c in cands if self._healthy(c[0], c[1], now)] or cands
+            if self.policy == "p2c" and len(pool) > 2:
+                pool = self._rng.sample(pool, 2)
+            target, kind = min(pool, key=lambda c: self._cost(*c))
+            self._stats[target].inflight += 1
+
+        MET_ROUTE.labels(capability, target, self.policy).inc()
+        MET_ROUTE_INFLIGHT.labels(target).inc()
+        return RouteHandle(self, capability, target, kind)
+
+    def _finish(self, target: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            st = self._stats[target]
+            st.inflight = max(0, st.inflight - 1)
+            st.ewma_ms = latency_ms if st.ewma_ms is None else (
+                _EWMA_ALPHA * latency_ms + (1 - _EWMA_ALPHA) * st.ewma_ms
+            )
+            if ok:
+                st.fails = 0
+            else:
+                st.fails += 1
+                if st.fails >= self.max_fails:
+                    st.down_until = time.time() + self.cooldown
+                    logger.warning("Route target %s failed %d× – cooling down %.0fs", target, st.fails, self.cooldown)
+        MET_ROUTE_INFLIGHT.labels(target).dec()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per‑target in‑flight count, latency EWMA and failure streak."""
+        with self._lock:
+            return {
+                t: {"inflight": s.inflight, "ewma_ms": s.ewma_ms or 0.0, "fails": s.fails}
+                for t, s in self._stats.items()
+            }
+
+
+# ----------------------------------------------------------------------------
+# Process‑wide singleton
+# ----------------------------------------------------------------------------
+_ROUTER: Optional[CapabilityRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_router() -> CapabilityRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        with _ROUTER_LOCK:
+            if _ROUTER is None:
+                _ROUTER = CapabilityRouter.from_env()
+    return _ROUTER
+
+
+def route(capability: str) -> RouteHandle:
+    """Shortcut for ``get_router().route(capability)``."""
+    return get_router().route(capability)
+
+
+__all__ = ["CapabilityRouter", "RouteHandle", "get_router", "route"]
@@ -0,0 +1,240 @@
+"""backend.scheduler
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Event‑driven timer scheduler used by :mod:`backend.orchestrator`.
+
+Instead of waking every few hundred milliseconds to poll each runner,
+the scheduler keeps a min‑heap keyed by the next due timestamp and
+sleeps exactly until the earliest entry is due.  Any out‑of‑band change
+(A2A ``trigger``, a runner setting ``_next = 0``, a new runner joining)
+calls :meth:`TimerScheduler.reschedule`, which wakes the loop at once.
+
+Entries are invalidated lazily: every runner carries a generation
+counter, and stale heap items are discarded when popped.  That keeps
+``reschedule`` O(log n) without having to search the heap.
+
+The scheduler is agnostic of what a *runner* is — it only needs:
+
+* ``name``             – unique key
+* ``next_due() -> float``  – POSIX timestamp of the next run
+* ``async step()``     – start a cycle (must not block for its duration)
+* ``deadline() -> float``  – optional; runners due at the same moment are
+  stepped earliest‑deadline‑first
+
+The module also provides the two pieces the orchestrator uses to stay
+responsive when the box is saturated:
+
+* :class:`DeadlineGate` – the global in‑flight cap; when no slot is free,
+  waiting cycles are admitted by earliest deadline, then priority.
+* :class:`OverloadDetector` – folds event‑loop lag, gate queue depth and
+  CPU load average into an overload level (0 ok, 1 elevated, 2 overloaded)
+  that the orchestrator uses to postpone or shed low‑priority cycles.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("alpha_factory.scheduler")
+
+
+class TimerScheduler:
+    """Heap‑based timer loop that sleeps until the next runner is due."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._runners: Dict[str, Any] = {}
+        self._gen: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------ #
+    # registration                                                       #
+    # ------------------------------------------------------------------ #
+    def add(self, runner: Any) -> None:
+        """Start tracking *runner* and schedule it at ``runner.next_due()``."""
+        self._runners[runner.name] = runner
+        self.reschedule(runner)
+
+    def remove(self, name: str) -> None:
+        """Forget *name*; pending heap entries become stale."""
+        self._runners.pop(name, None)
+        self._gen[name] = self._gen.get(name, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._runners)
+
+    # ------------------------------------------------------------------ #
+    # wake‑ups                                                           #
+    # ------------------------------------------------------------------ #
+    def reschedule(self, runner: Any) -> None:
+        """(Re)insert *runner* at its current due time and wake the loop.
+
+        Safe to call from any thread: off‑loop callers are marshalled onto
+        the scheduler's event loop.
+        """
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is not loop:
+                loop.call_soon_threadsafe(self.reschedule, runner)
+                return
+
+        if runner.name not in self._runners:
+            return
+        gen = self._gen.get(runner.name, 0) + 1
+        self._gen[runner.name] = gen
+        heapq.heappush(self._heap, (runner.next_due(), next(self._seq), gen, runner.name))
+        if self._wake is not None:
+            self._wake.set()
+
+    # ------------------------------------------------------------------ #
+    # main loop                                                          #
+    # ------------------------------------------------------------------ #
+    def _pop_due(self, now: float) -> List[Any]:
+        due: List[Any] = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, gen, name = heapq.heappop(self._heap)
+            if self._gen.get(name) != gen or name not in self._runners:
+                continue  # stale entry
+            due.append(self._runners[name])
+        if len(due) > 1:  # same tick: earliest deadline first
+            due.sort(key=lambda r: r.deadline() if hasattr(r, "deadline") else 0.0)
+        return due
+
+    def _delay(self, now: float) -> Optional[float]:
+        while self._heap:
+            _, _, gen, name = self._heap[0]
+            if self._gen.get(name) == gen and name in self._runners:
+                return max(0.0, self._heap[0][0] - now)
+            heapq.heappop(self._heap)  # drop stale head
+        return None
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Dispatch due runners until *stop* is set."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        while not stop.is_set():
+            now = time.time()
+            for runner in self._pop_due(now):
+                try:
+                    await runner.step()
+                except Exception:  # noqa: BLE001
+                    logger.exception("%s: scheduler step failed", runner.name)
+                if runner.name in self._runners:
+                    self.reschedule(runner)
+
+            delay = self._delay(time.time())
+            if delay == 0.0:
+                continue
+
+            self._wake.clear()
+            waiters = {asyncio.ensure_future(self._wake.wait()), asyncio.ensure_future(stop.wait())}
+            try:
+                await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+
+
+class DeadlineGate:
+    """Counting semaphore that hands free slots out earliest‑deadline‑first."""
+
+    def __init__(self, slots: int) -> None:
+        self._free = max(1, slots)
+        self._waiters: List[Tuple[float, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        """Cycles currently waiting for a slot."""
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, deadline: float, priority: int = 0) -> None:
+        if self._free > 0 and not len(self):
+            self._free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (deadline, -priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # slot was handed over just before cancellation
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # slot passes straight to the waiter
+                return
+        self._free += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, deadline: float, priority: int = 0) -> AsyncIterator[None]:
+        await self.acquire(deadline, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class OverloadDetector:
+    """Overload level from loop lag, queue depth and CPU load (cached)."""
+
+    def __init__(
+        self,
+        lag_ms: Callable[[], float],
+        queue_depth: Callable[[], int],
+        *,
+        max_lag_ms: float = 500.0,
+        max_queue: int = 64,
+        max_load: float = 1.5,
+        interval: float = 0.5,
+    ) -> None:
+        self._lag_ms = lag_ms
+        self._queue_depth = queue_depth
+        self.max_lag_ms = max_lag_ms
+        self.max_queue = max(1, max_queue)
+        self.max_load = max_load
+        self.interval = interval
+        self._cpus = os.cpu_count() or 1
+        self._cached: Tuple[int, str] = (0, "")
+        self._at = 0.0
+
+    def _load(self) -> float:
+        try:
+            return os.getloadavg()[0] / self._cpus
+        except (AttributeError, OSError):  # pragma: no cover – Windows
+            return 0.0
+
+    def level(self) -> Tuple[int, str]:
+        """``(level, reason)``: 0 ok, 1 elevated (≥ 1× a limit), 2 overloaded (≥ 2×)."""
+        now = time.monotonic()
+        if now - self._at < self.interval:
+            return self._cached
+        ratios = {
+            "lag": self._lag_ms() / self.max_lag_ms,
+            "queue": self._queue_depth() / self.max_queue,
+            "cpu": self._load() / self.max_load if self.max_load > 0 else 0.0,
+        }
+        reason = max(ratios, key=ratios.__getitem__)
+        worst = ratios[reason]
+        self._cached = (2 if worst >= 2 else 1 if worst >= 1 else 0, reason)
+        self._at = now
+        return self._cached
+
+
+__all__ = ["DeadlineGate", "OverloadDetector", "TimerScheduler"]
@@ -0,0 +1,101 @@
+"""backend.tail
+===================================================================
+Alpha‑Factory v1 👁️✨ — Multi‑Agent AGENTIC α‑AGI
+-------------------------------------------------------------------
+Read newline‑delimited files *backwards* from the end.
+
+``readlines()[-n:]`` costs O(file); :func:`tail_lines` seeks to the end
+and reads fixed‑size blocks towards the start until it has ``n`` lines,
+so its cost is O(n × line length) however large the file grows.
+:func:`reverse_lines` yields ``(offset, line)`` pairs newest‑first; the
+offset of a line is a stable cursor into an append‑only file, and
+:func:`forward_lines` continues from such a cursor (paging, following).
+"""
+from __future__ import annotations
+
+import os
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+_BLOCK = 64 * 1024
+
+
+def reverse_lines(fh: BinaryIO, end: Optional[int] = None, block: int = _BLOCK) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(offset, line)`` from *end* (default EOF) towards the start.
+
+    Lines are returned without their trailing newline; a final line that
+    is not yet newline‑terminated (a writer mid‑append) is skipped.
+    """
+    if end is None:
+        end = fh.seek(0, os.SEEK_END)
+    pos = end
+    rest = b""  # text before the first newline seen so far
+    complete = False  # has the unterminated last line been dropped yet?
+    while pos > 0:
+        step = min(block, pos)
+        pos -= step
+        fh.seek(pos)
+        lines = (fh.read(step) + rest).split(b"\n")
+        rest = lines.pop(0)  # may continue in the previous block
+        if not complete:
+            if not lines:
+                continue  # still inside the unterminated last line
+            lines.pop()  # text after the last newline (empty if none)
+            complete = True
+        offset = pos + len(rest) + 1
+        spans = []
+        for line in lines:
+            spans.append((offset, line))
+            offset += len(line) + 1
+        for item in reversed(spans):
+            if item[1]:
+                yield item
+    if complete and rest:
+        yield 0, rest
+
+
+def forward_lines(
+    fh: BinaryIO, start: int = 0, limit: Optional[int] = None, block: int = _BLOCK
+) -> Tuple[List[Tuple[int, bytes]], int]:
+    """Complete lines from offset *start* on, at most *limit* of them.
+
+    Returns ``(lines, next)`` where *next* is the offset just past the last
+    line consumed – the cursor to continue from.  An unterminated last line
+    is left for the next call.
+    """
+    fh.seek(start)
+    out: List[Tuple[int, bytes]] = []
+    pos = start
+    buf = b""
+    while limit is None or len(out) < limit:
+        chunk = fh.read(block)
+        if not chunk:
+            break
+        buf += chunk
+        i = 0
+        while limit is None or len(out) < limit:
+            nl = buf.find(b"\n", i)
+            if nl < 0:
+                break
+            if nl > i:
+                out.append((pos, buf[i:nl]))
+            pos += nl + 1 - i
+            i = nl + 1
+        buf = buf[i:]
+    return out, pos
+
+
+def tail_lines(path: "os.PathLike[str] | str", n: int, block: int = _BLOCK) -> List[bytes]:
+    """The last *n* complete lines of *path*, oldest first."""
+    if n <= 0:
+        return []
+    out: List[bytes] = []
+    with open(path, "rb") as fh:
+        for _, line in reverse_lines(fh, block=block):
+            out.append(line)
+            if len(out) >= n:
+                break
+    out.reverse()
+    return out
+
+
+__all__ = ["forward_lines", "reverse_lines", "tail_lines"]
@@ -4,19 +4,53 @@ ASGI WebSocket hub for live Trace‑graph events
 =============================================
 
 *   Mounts a high‑performance WebSocket endpoint at **/ws/trace**.
-*   In‑memory fan‑out; swapping to Redis / NATS later is a one‑class change.
+*   **Pluggable transport** – the ring is per process; a
+    :class:`HubTransport` forwards locally published events to the hubs
+    of other processes.  ``TRACE_HUB_TRANSPORT=unix`` selects
+    :class:`UnixSocketTransport`, so every ASGI worker (and agents running
+    in their own process) sees every event on the host.  Redis / NATS
+    would be one more ``HubTransport`` subclass.
+*   **Ring‑buffer fan‑out**: each event is serialised once into a shared
+    ring; subscribers only keep a read cursor (no per‑subscriber copy, no
+    per‑event task).  Every *tick* the pending events are coalesced into
+    **one** frame per client – a JSON array of events.
+*   **Slow consumers** – a client whose cursor falls a full ring behind,
+    or whose send stalls for ``TRACE_HUB_SEND_TIMEOUT`` seconds, is
+    evicted (close code *1013*) and counted.
 *   **CSRF‑aware**: the client must fetch ``/api/csrf`` and echo the token
     as the *very first* frame; otherwise the server closes with *4401*.
+*   **Filtered, resumable** – the handshake may carry a filter (event
+    types, agents, label prefix) evaluated on the event fields before any
+    frame is built, and the ``epoch`` / ``cursor`` of the last frame seen:
+    the gap is replayed from the ring (the bounded history).
+
+Handshake (first client frame)::
+
+    {
+        "csrf":   "<token from /api/csrf>",
+        "filter": {"types": ["fill"], "agents": ["finance"], "label_prefix": "BUY"},
+        "epoch":  "…", "cursor": 1234   # optional – resume after a reconnect
+    }
 
 Schema
 ------
-Outbound messages follow the *TraceEvent* model::
+Each outbound frame carries the events since the previous one::
+
+    {
+        "epoch":  "hex",                # hub instance; cursors reset with it
+        "cursor": 1240,                 # resume point (next sequence number)
+        "lost":   0,                    # only if the gap outgrew the history
+        "events": [TraceEvent, ...]
+    }
+
+with *TraceEvent*::
 
     {
         "id":   "uuid4‑hex",            # unique node id
         "ts":   1713612345.123,         # POSIX seconds
         "type": "tool_call|planner",    # enum
         "label":"User‑friendly label",  # ≤128 chars
+        "agent":"finance",              # optional producer
         "edges":["uuid3", ...]          # optional parents
     }
 
@@ -24,14 +58,30 @@ Quick‑start
 -----------
 >>> from backend.trace_ws import hub, attach
 >>> attach(fastapi_app)
->>> await hub.broadcast({"label": "order sent", "type": "tool_call"})
+>>> hub.publish({"label": "order sent", "type": "tool_call"})
+
+Environment
+-----------
+TRACE_HUB_RING           ring capacity in events (4096)
+TRACE_HUB_TICK_MS        coalescing interval (50)
+TRACE_HUB_SEND_TIMEOUT   seconds a frame send may take before eviction (5)
+TRACE_HUB_TRANSPORT      ``local`` (in‑process only) | ``unix`` (host‑wide)
+TRACE_HUB_SOCKET_DIR     rendezvous directory of the unix transport
+                         (``<tmp>/alphafactory-trace``)
 """
 
 from __future__ import annotations
 
 import asyncio
+import atexit
+import logging
+import os
+import socket
+import tempfile
+import threading
 import time
 import typing as _t
+import weakref
 from dataclasses import dataclass, field
 from importlib import import_module
 from uuid import uuid4
@@ -50,6 +100,14 @@ except ModuleNotFoundError:  # pragma: no cover
     def _dumps(obj: _t.Any) -> bytes:  # noqa: D401
         return _json.dumps(obj).encode()
 
+try:
+    from prometheus_client import Counter  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Counter = None  # type: ignore
+
+_log = logging.getLogger("alpha_factory.trace_ws")
+_SEND_TIMEOUT = float(os.getenv("TRACE_HUB_SEND_TIMEOUT", "5"))
+
 
 # --------------------------------------------------------------------- #
 # Public dataclass for events                                           #
@@ -62,68 +120,467 @@ class TraceEvent:
     ts: float = field(default_factory=time.time)
     type: str = "generic"
     label: str = ""
+    agent: str | None = None
     edges: list[str] | None = None
 
     # cache serialisation; fastest path for broadcast
     def to_bytes(self) -> bytes:  # noqa: D401
-        return _dumps(self.__dict__)
+        return _dumps({f: getattr(self, f) for f in self.__slots__})
+
+
+_Entry = _t.Tuple[str, _t.Optional[str], str, bytes]  # (type, agent, label, bytes)
+
+
+def _entry(event: TraceEvent | dict[str, _t.Any] | _t.Any) -> _Entry:
+    """Filter fields + the event serialised once."""
+    if isinstance(event, dict):  # schema fields + extras ("meta", "data" …)
+        event = {"id": uuid4().hex, "ts": time.time(), "type": "generic", "label": "", **event}
+        return str(event["type"]), event.get("agent"), str(event["label"]), _dumps(event)
+    return (
+        str(getattr(event, "type", "generic")),
+        getattr(event, "agent", None),
+        str(getattr(event, "label", "")),
+        event.to_bytes(),
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class TraceFilter:
+    """Server‑side subscription filter; ``None`` fields match everything."""
+
+    types: frozenset[str] | None = None
+    agents: frozenset[str] | None = None
+    label_prefix: str | None = None
+
+    @classmethod
+    def from_json(cls, spec: _t.Any) -> "TraceFilter | None":
+        if not isinstance(spec, dict):
+            return None
+
+        def _set(key: str) -> frozenset[str] | None:
+            values = spec.get(key)
+            return frozenset(map(str, values)) if isinstance(values, (list, tuple)) and values else None
+
+        prefix = spec.get("label_prefix")
+        flt = cls(_set("types"), _set("agents"), str(prefix) if prefix else None)
+        return None if flt == cls() else flt
+
+    def match(self, entry: _Entry) -> bool:
+        etype, agent, label, _ = entry
+        return (
+            (self.types is None or etype in self.types)
+            and (self.agents is None or agent in self.agents)
+            and (self.label_prefix is None or label.startswith(self.label_prefix))
+        )
+
+
+# --------------------------------------------------------------------- #
+# Metrics (no‑ops if prometheus_client unavailable)                     #
+# --------------------------------------------------------------------- #
+if Counter:
+    MET_HUB_EVENTS = Counter("trace_hub_events_total", "Events published to the trace hub")
+    MET_HUB_FRAMES = Counter("trace_hub_frames_total", "Coalesced frames handed to subscribers")
+    MET_HUB_EVICTED = Counter("trace_hub_evicted_total", "Slow trace subscribers evicted", ["reason"])
+    MET_HUB_TRANSPORT = Counter("trace_hub_transport_total", "Events exchanged with peer hubs", ["outcome"])
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def inc(self, *_a):
+            pass
+
+    MET_HUB_EVENTS = MET_HUB_FRAMES = MET_HUB_EVICTED = MET_HUB_TRANSPORT = _Noop()
+
+
+# --------------------------------------------------------------------- #
+# Transports (cross‑process fan‑out)                                    #
+# --------------------------------------------------------------------- #
+class HubTransport:
+    """In‑process transport: nothing leaves the process.
+
+    Subclasses forward every locally published entry to peer hubs
+    (``send``) and hand entries received from peers to ``deliver``, which
+    appends them to the local ring without forwarding them again.
+    """
+
+    def start(self, deliver: _t.Callable[[_Entry], int]) -> None:
+        pass
+
+    def send(self, entry: _Entry) -> None:
+        pass
+
+    def after_fork(self) -> None:
+        """Drop state inherited from the parent; the hub calls ``start`` again."""
+
+    def close(self) -> None:
+        pass
+
+
+def _pack(entry: _Entry) -> bytes:
+    etype, agent, label, raw = entry
+    return _dumps([etype, agent, label]) + b"\n" + raw
+
+
+def _unpack(datagram: bytes) -> _Entry:
+    head, _, raw = datagram.partition(b"\n")
+    etype, agent, label = _json.loads(head)
+    return etype, agent, label, raw
+
+
+class UnixSocketTransport(HubTransport):
+    """Host‑wide mesh over Unix datagram sockets.
+
+    Every hub binds ``<dir>/<pid>-<id>.sock``; a publish sends one datagram
+    per peer socket found in *dir* (re‑listed at most every *refresh*
+    seconds).  Sends never block: a peer whose receive buffer is full
+    misses the event (counted as ``dropped``) and sockets of dead
+    processes are unlinked on first refusal.  No broker, so any process –
+    ASGI worker or stand‑alone agent – can join or leave at any time.
+
+    The hub starts its transport on first use, and again in a forked
+    child (``gunicorn --preload``), so each worker binds its own socket
+    and runs its own receive thread.
+    """
+
+    MAX_DATAGRAM = 64 * 1024
+
+    def __init__(self, directory: str | os.PathLike | None = None, refresh: float = 1.0) -> None:
+        directory = directory or os.getenv("TRACE_HUB_SOCKET_DIR") or os.path.join(
+            tempfile.gettempdir(), "alphafactory-trace"
+        )
+        self.dir = os.fspath(directory)
+        self.refresh = refresh
+        self.path = self._own_path()
+        self._peers: list[str] = []
+        self._listed = 0.0
+        self._rx: socket.socket | None = None
+        self._tx: socket.socket | None = None
+        self._closed = False
+
+    def start(self, deliver: _t.Callable[[_Entry], int]) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        self._rx = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._rx.bind(self.path)
+        self._tx = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._tx.setblocking(False)
+        threading.Thread(target=self._recv_loop, args=(deliver,), name="trace-hub-rx", daemon=True).start()
+        atexit.register(self.close)
+
+    def _own_path(self) -> str:
+        return os.path.join(self.dir, f"{os.getpid()}-{uuid4().hex[:8]}.sock")
+
+    def after_fork(self) -> None:
+        for sock in (self._rx, self._tx):
+            if sock is not None:
+                sock.close()  # the child's copies; the parent keeps its socket file
+        self._rx = self._tx = None
+        self.path = self._own_path()
+        self._peers, self._listed, self._closed = [], 0.0, False
+
+    def _recv_loop(self, deliver: _t.Callable[[_Entry], int]) -> None:
+        rx = self._rx
+        while not self._closed and rx is not None:
+            try:
+                datagram = rx.recv(self.MAX_DATAGRAM)
+            except OSError:
+                return  # closed
+            try:
+                deliver(_unpack(datagram))
+            except (ValueError, TypeError):
+                MET_HUB_TRANSPORT.labels("malformed").inc()
+                continue
+            MET_HUB_TRANSPORT.labels("received").inc()
+
+    def peers(self) -> list[str]:
+        now = time.monotonic()
+        if now - self._listed >= self.refresh:
+            try:
+                names = os.listdir(self.dir)
+            except FileNotFoundError:
+                names = []
+            self._peers = [
+                os.path.join(self.dir, n) for n in names if n.endswith(".sock") and os.path.join(self.dir, n) != self.path
+            ]
+            self._listed = now
+        return self._peers
+
+    def send(self, entry: _Entry) -> None:
+        tx = self._tx
+        if tx is None or self._closed:
+            return
+        datagram = _pack(entry)
+        if len(datagram) > self.MAX_DATAGRAM:
+            MET_HUB_TRANSPORT.labels("oversize").inc()
+            return
+        for peer in list(self.peers()):
+            try:
+                tx.sendto(datagram, peer)
+            except BlockingIOError:  # peer not keeping up – never block publish()
+                MET_HUB_TRANSPORT.labels("dropped").inc()
+                continue
+            except (ConnectionRefusedError, FileNotFoundError):  # peer process is gone
+                self._forget(peer)
+                continue
+            except OSError:
+                MET_HUB_TRANSPORT.labels("failed").inc()
+                continue
+            MET_HUB_TRANSPORT.labels("sent").inc()
+
+    def _forget(self, peer: str) -> None:
+        if peer in self._peers:
+            self._peers.remove(peer)
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for sock in (self._rx, self._tx):
+            if sock is not None:
+                sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _transport_from_env() -> HubTransport:
+    kind = os.getenv("TRACE_HUB_TRANSPORT", "local").lower()
+    if kind == "unix":
+        return UnixSocketTransport()
+    if kind != "local":
+        _log.warning("TRACE_HUB_TRANSPORT=%s unknown – using the in‑process hub", kind)
+    return HubTransport()
 
 
 # --------------------------------------------------------------------- #
 # Hub                                                                   #
 # --------------------------------------------------------------------- #
+class Subscription:
+    """One reader of the hub ring: a cursor, its filter and an eviction flag."""
+
+    __slots__ = ("cursor", "filter", "lost", "evicted")
+
+    def __init__(self, cursor: int, flt: TraceFilter | None = None, lost: int = 0) -> None:
+        self.cursor = cursor  # sequence number of the next unread event
+        self.filter = flt
+        self.lost = lost  # events of a resume gap no longer in the ring
+        self.evicted: str | None = None  # reason once evicted
+
+
 class TraceHub:
-    """In‑process broadcast hub (fan‑out)."""
+    """In‑process broadcast hub (fan‑out) over a shared ring buffer.
+
+    Events are serialised once into a fixed‑size ring; every subscriber
+    only holds a cursor and an optional :class:`TraceFilter`.  A single
+    ticker wakes all waiting readers at most once per *tick*, and each
+    reader receives the matching events published since its cursor as
+    **one** frame.  Readers at the same cursor with the same filter share
+    the same frame object.  The ring doubles as the resume history: a
+    reader may subscribe at an older cursor of the same ``epoch``.  A
+    reader whose unread events were overwritten (``capacity`` behind) is
+    evicted as ``overrun``; the WebSocket layer evicts readers whose send
+    stalls.
+
+    With a *transport*, local events are also sent to peer hubs and their
+    events land in this ring, so sequence numbers (and ``epoch``) stay
+    per process.
+    """
 
-    def __init__(self) -> None:
-        self._subscribers: set[asyncio.Queue[bytes]] = set()
-        self._lock = asyncio.Lock()
+    def __init__(self, capacity: int = 4096, tick: float = 0.05, transport: HubTransport | None = None) -> None:
+        self.capacity = max(1, capacity)
+        self.tick = tick
+        self.epoch = uuid4().hex[:12]  # cursors are only valid within one epoch
+        self._ring: list[_Entry | None] = [None] * self.capacity
+        self._seq = 0  # sequence number of the next event
+        self._lock = threading.Lock()  # publish() may come from any thread
+        self._subscribers: set[Subscription] = set()
+        self._frames: dict[tuple, bytes] = {}  # current tick's shared frames
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: asyncio.Event | None = None
+        self._tick_fut: asyncio.Future | None = None
+        self._ticker: asyncio.Task | None = None
+        self.evicted = 0
+        self.transport = transport or HubTransport()
+        self._started = False  # transport starts in the process that uses it
+        _HUBS.add(self)
+
+    def _start_transport(self) -> None:
+        with self._lock:
+            if not self._started:
+                self.transport.start(self._append)
+                self._started = True
+
+    def _after_fork(self) -> None:
+        """Child side of ``fork``: own epoch, lock, readers and transport."""
+        self.epoch = uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._frames = {}
+        self._loop = self._pending = self._tick_fut = self._ticker = None
+        self.transport.after_fork()
+        self._started = False
 
     # ------------- subscription management --------------------------- #
-    async def subscribe(self) -> asyncio.Queue[bytes]:
-        """Return a queue that will receive broadcast messages."""
-        q: asyncio.Queue[bytes] = asyncio.Queue(maxsize=256)
-        async with self._lock:
-            self._subscribers.add(q)
-        return q
-
-    async def unsubscribe(self, q: asyncio.Queue[bytes]) -> None:
-        async with self._lock:
-            self._subscribers.discard(q)
-
-    # ------------------- broadcasting -------------------------------- #
-    async def broadcast(self, event: TraceEvent | dict[str, _t.Any]) -> None:
+    async def subscribe(
+        self, flt: TraceFilter | None = None, cursor: int | None = None, epoch: str | None = None
+    ) -> Subscription:
+        """Read from *cursor* (resume) or from the current end of the ring.
+
+        A cursor from another *epoch* (the hub restarted) replays all
+        retained history; events older than the ring are reported as
+        ``lost`` in the first frame.
         """
-        Send *event* to every live WebSocket.
-
-        *event* may be a ``TraceEvent`` or a raw ``dict`` matching the schema.
-        The call returns immediately (fire‑and‑forget).
+        if not self._started:
+            self._start_transport()
+        self._ensure_ticker()
+        with self._lock:
+            if cursor is None:
+                sub = Subscription(self._seq, flt)
+            else:
+                if epoch != self.epoch:
+                    cursor = 0
+                oldest = max(0, self._seq - self.capacity)
+                start = min(max(int(cursor), oldest), self._seq)
+                sub = Subscription(start, flt, lost=max(0, oldest - int(cursor)))
+        self._subscribers.add(sub)
+        return sub
+
+    async def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def evict(self, sub: Subscription, reason: str) -> None:
+        if sub.evicted is None:
+            sub.evicted = reason
+            self.evicted += 1
+            MET_HUB_EVICTED.labels(reason).inc()
+            _log.warning("trace subscriber evicted (%s)", reason)
+        self._subscribers.discard(sub)
+
+    # ------------------- publishing ---------------------------------- #
+    def publish(self, event: TraceEvent | dict[str, _t.Any] | _t.Any) -> int:
         """
-        if isinstance(event, dict):
-            event = TraceEvent(**event)  # type: ignore[arg-type]
-        payload = event.to_bytes()
-
-        async with self._lock:
-            targets = list(self._subscribers)  # snapshot under lock
-
-        coros: list[_t.Coroutine[_t.Any, _t.Any, _t.Any]] = []
-        for q in targets:
-            # back‑pressure: drop oldest if queue is full
-            if q.full():
-                try:
-                    _ = q.get_nowait()
-                except asyncio.QueueEmpty:
-                    pass
-            coros.append(q.put(payload))
-
-        if coros:  # schedule fan‑out concurrently, don’t await in caller
-            asyncio.create_task(
-                asyncio.gather(*coros, return_exceptions=True),
-            )
+        Append *event* to the ring and return its sequence number.
 
-
-# Singleton – imported by other modules
-hub = TraceHub()
+        *event* may be a ``TraceEvent``, a raw ``dict`` matching the schema
+        (extra keys are kept), or any pre‑serialised object exposing
+        ``to_bytes()`` (e.g. an :class:`backend.mcp.MCPEnvelope`, whose
+        cached bytes are reused).  Never blocks and creates no task; safe
+        to call from any thread, with or without a running loop.
+        """
+        if not self._started:
+            self._start_transport()
+        entry = _entry(event)
+        seq = self._append(entry)
+        self.transport.send(entry)
+        return seq
+
+    def _append(self, entry: _Entry) -> int:
+        """Store *entry* in the ring and wake readers (local or peer event)."""
+        with self._lock:
+            seq = self._seq
+            self._ring[seq % self.capacity] = entry
+            self._seq = seq + 1
+        MET_HUB_EVENTS.inc()
+        loop, pending = self._loop, self._pending
+        if loop is not None and pending is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                pending.set()
+            else:
+                loop.call_soon_threadsafe(pending.set)
+        return seq
+
+    async def broadcast(self, event: TraceEvent | dict[str, _t.Any] | _t.Any) -> None:
+        """Backward‑compatible awaitable form of :meth:`publish`."""
+        self.publish(event)
+
+    # ------------------- reading ------------------------------------- #
+    async def next_frame(self, sub: Subscription) -> bytes | None:
+        """Wait for matching events; return them as one frame (``None`` = evicted)."""
+        while sub.evicted is None:
+            if sub.cursor < self._seq:
+                frame = self._frame(sub)
+                if frame:
+                    return frame
+                continue  # nothing matched the filter – wait for more
+            self._ensure_ticker()
+            await asyncio.shield(self._tick_fut)  # type: ignore[arg-type]
+        return None
+
+    def _frame(self, sub: Subscription) -> bytes | None:
+        with self._lock:
+            end = self._seq
+            if end - sub.cursor > self.capacity:
+                self.evict(sub, "overrun")
+                return None
+            key = (sub.cursor, end, sub.filter)
+            frame = None if sub.lost else self._frames.get(key)
+            if frame is None:
+                flt = sub.filter
+                entries = (self._ring[i % self.capacity] for i in range(sub.cursor, end))
+                parts = [e[3] for e in entries if flt is None or flt.match(e)]  # type: ignore[index, arg-type]
+                frame = b""
+                if parts:
+                    head = f'{{"epoch":"{self.epoch}","cursor":{end},'
+                    if sub.lost:
+                        head += f'"lost":{sub.lost},'
+                    frame = head.encode() + b'"events":[' + b",".join(parts) + b"]}"
+                    MET_HUB_FRAMES.inc()
+                if not sub.lost:
+                    self._frames[key] = frame
+        sub.cursor = end
+        if frame:
+            sub.lost = 0
+        return frame
+
+    def _ensure_ticker(self) -> None:
+        if self._ticker is not None and not self._ticker.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._pending = asyncio.Event()
+        self._tick_fut = self._loop.create_future()
+        self._ticker = self._loop.create_task(self._tick_loop(), name="trace-hub-ticker")
+
+    async def _tick_loop(self) -> None:
+        assert self._pending is not None
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(self.tick)  # coalesce everything published meanwhile
+            self._pending.clear()
+            fut, self._tick_fut = self._tick_fut, self._loop.create_future()  # type: ignore[union-attr]
+            self._frames.clear()
+            if fut is not None and not fut.done():
+                fut.set_result(None)
+
+    def stats(self) -> dict[str, int]:
+        return {"seq": self._seq, "subscribers": len(self._subscribers), "evicted": self.evicted}
+
+
+_HUBS: "weakref.WeakSet[TraceHub]" = weakref.WeakSet()
+
+
+def _reset_hubs_after_fork() -> None:
+    for h in list(_HUBS):
+        h._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_hubs_after_fork)
+
+# Singleton – imported by other modules
+hub = TraceHub(
+    capacity=int(os.getenv("TRACE_HUB_RING", "4096")),
+    tick=float(os.getenv("TRACE_HUB_TICK_MS", "50")) / 1000,
+    transport=_transport_from_env(),
+)
 
 # --------------------------------------------------------------------- #
 # FastAPI / Starlette integration                                       #
@@ -154,18 +611,20 @@ def attach(app) -> None:  # noqa: D401
         """
         WebSocket stream with race‑free, CSRF‑checked loop.
 
-        A shielded gather prevents the rare disconnect race where the
-        client closes exactly between queue.put() and ws.send_bytes().
+        One frame task per tick (not per event); a send that exceeds
+        ``TRACE_HUB_SEND_TIMEOUT`` evicts the client.
         """
         # -----------------------------------------------------------------
         # ▼ secure: require the very first frame to echo the CSRF token
         #    (token was fetched by the front‑end from /api/csrf)
         # -----------------------------------------------------------------
         await ws.accept()
-        queue = await hub.subscribe()
+        sub: Subscription | None = None
+        ping_task: asyncio.Task | None = None
+        frame_task: asyncio.Task | None = None
 
         try:
-            # first frame **must** be {"csrf": "<token>"}
+            # first frame **must** be {"csrf": "<token>", "filter"?, "epoch"?, "cursor"?}
             init = await ws.receive_json()
             if not (
                 isinstance(init, dict)
@@ -177,22 +636,33 @@ def attach(app) -> None:  # noqa: D401
 
             _api_buffer.remove(init["csrf"])  # single‑use token
 
-            ping_task: asyncio.Task = asyncio.create_task(ws.receive_text())
-            queue_task: asyncio.Task = asyncio.create_task(queue.get())
+            cursor = init.get("cursor")
+            sub = await hub.subscribe(
+                TraceFilter.from_json(init.get("filter")),
+                cursor=cursor if isinstance(cursor, int) and cursor >= 0 else None,
+                epoch=init.get("epoch"),
+            )
+            ping_task = asyncio.create_task(ws.receive_text())
+            frame_task = asyncio.create_task(hub.next_frame(sub))
 
             while True:
                 done, _ = await asyncio.wait(
-                    {ping_task, queue_task},
+                    {ping_task, frame_task},
                     return_when=asyncio.FIRST_COMPLETED,
                 )
 
-                if queue_task in done:
-                    payload = queue_task.result()
+                if frame_task in done:
+                    frame = frame_task.result()
+                    if frame is None:  # evicted: fell a full ring behind
+                        await ws.close(code=1013)
+                        return
                     try:
-                        await ws.send_bytes(payload)
-                    finally:
-                        # immediately replace consumed task
-                        queue_task = asyncio.create_task(queue.get())
+                        await asyncio.wait_for(ws.send_bytes(frame), _SEND_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        hub.evict(sub, "send_timeout")
+                        await ws.close(code=1013)  # 1013 = “try again later”
+                        return
+                    frame_task = asyncio.create_task(hub.next_frame(sub))
 
                 if ping_task in done:
                     try:
@@ -203,8 +673,10 @@ def attach(app) -> None:  # noqa: D401
         except (WebSocketDisconnect, asyncio.CancelledError):
             pass
         finally:
-            for task in (ping_task, queue_task):
-                task.cancel()
-            await hub.unsubscribe(queue)
+            for task in (ping_task, frame_task):
+                if task is not None:
+                    task.cancel()
+            if sub is not None:
+                await hub.unsubscribe(sub)
 
     app.include_router(router)
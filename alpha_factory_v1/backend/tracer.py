@@ -2,21 +2,229 @@
 Tracer captures agent spans and writes them to memory for inspection /
 regression diffs. It plugs into PlannerAgent and domain agents via
 `Tracer.record(agent, phase, payload)`.
+
+Recording never blocks the cycle: spans are put on a bounded queue and a
+single background thread encodes them and writes them to memory.
+
+* Sampling – head based.  `begin_cycle()` returns a cycle id; passing it
+  to `record(..., cycle=cid)` keeps or drops *every* span of that cycle
+  together (the decision is a pure function of the id and the agent's
+  rate).  Spans recorded without a cycle are sampled one by one.
+* Payload cap – payloads encoding to more than `TRACE_MAX_PAYLOAD_BYTES`
+  are replaced by `{"truncated", "bytes", "sha256", "ref"}`; the full
+  payload is stored once, content‑addressed, under the blob directory.
+* Drops – a full queue drops the span instead of waiting, and so does a
+  span that fails to encode; drops, sampled out and truncated spans are
+  counted (`stats()` and Prometheus).
+
+Payloads are serialised on the writer thread, once: the encoded bytes go
+to `Memory.write_encoded` as they are.  Callers must not mutate a payload
+after recording it – one that changes mid‑encoding is dropped.
+
+Environment
+-----------
+TRACE_SAMPLE_RATE         default keep ratio, 0..1 (1.0)
+TRACE_SAMPLE_RATES        per‑agent overrides, e.g. "finance=1,talent_match=0.05"
+TRACE_QUEUE_SIZE          spans buffered before dropping (10000)
+TRACE_MAX_PAYLOAD_BYTES   payload cap, 0 = unlimited (65536)
+TRACE_BLOB_DIR            oversize payload store (``<memory dir>/blobs``)
 """
-import datetime, logging
+import atexit, datetime, gzip, hashlib, logging, os, queue, threading, uuid
+from collections import Counter as _Tally
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .event_bus import encode
+from .instrumentation import observe_size
+
+try:
+    from prometheus_client import Counter  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    Counter = None  # type: ignore
 
 log = logging.getLogger("Tracer")
 
+if Counter:
+    MET_SPANS = Counter("trace_spans_total", "Trace spans by outcome", ["agent", "outcome"])
+else:  # pragma: no cover
+    class _Noop:  # noqa: D401
+        def labels(self, *_a, **_kw):
+            return self
+
+        def inc(self, *_a):
+            pass
+
+    MET_SPANS = _Noop()
+
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            log.warning("TRACE_SAMPLE_RATES: bad entry '%s' ignored", item)
+    return rates
+
+
+def _keep(cycle_id: str, rate: float) -> bool:
+    """Deterministic head sampling: same id + rate → same decision."""
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    return int(cycle_id[:16], 16) / 2**64 < rate
+
+
+class _Writer:
+    """Bounded span queue drained by one daemon thread (shared by all tracers)."""
+
+    def __init__(self, size: int):
+        self.q: "queue.Queue" = queue.Queue(maxsize=max(1, size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item) -> bool:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="trace-writer", daemon=True)
+                    self._thread.start()
+        try:
+            self.q.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _loop(self):
+        while True:
+            tracer, agent, phase, span = self.q.get()
+            try:
+                tracer._write(agent, phase, span)
+            except Exception:  # noqa: BLE001 – never kill the writer
+                log.exception("Trace write failed for %s %s", agent, phase)
+            finally:
+                self.q.task_done()
+
+    def flush(self):
+        if self._thread is not None:
+            self.q.join()
+
+
+_WRITER = _Writer(int(os.getenv("TRACE_QUEUE_SIZE", "10000")))
+atexit.register(_WRITER.flush)
+
+
 class Tracer:
-    def __init__(self, memory):
+    def __init__(self, memory, *, sample_rate=None, sample_rates=None, max_payload=None, blob_dir=None):
         self.mem = memory
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+        self.sample_rates = (
+            dict(sample_rates) if sample_rates is not None else _parse_rates(os.getenv("TRACE_SAMPLE_RATES", ""))
+        )
+        self.max_payload = max_payload if max_payload is not None else int(os.getenv("TRACE_MAX_PAYLOAD_BYTES", "65536"))
+        if blob_dir is None:
+            blob_dir = os.getenv("TRACE_BLOB_DIR") or (Path(memory.dir) / "blobs" if hasattr(memory, "dir") else None)
+        self.blob_dir = Path(blob_dir) if blob_dir else None
+        self._counts: _Tally = _Tally()
+        self._lock = threading.Lock()
+
+    # ───────── sampling ────────────────────────────────────────────
+    def rate_for(self, agent_name: str) -> float:
+        return self.sample_rates.get(agent_name, self.sample_rate)
 
-    def record(self, agent_name: str, phase: str, payload):
+    def begin_cycle(self, agent_name: str) -> str:
+        """New cycle id; pass it to every `record` of the cycle."""
+        cid = uuid.uuid4().hex
+        if not _keep(cid, self.rate_for(agent_name)):
+            self._count(agent_name, "sampled_out")  # counted once per cycle
+        return cid
+
+    # ───────── recording (caller thread – no I/O, no encoding) ─────
+    def record(self, agent_name: str, phase: str, payload, timing=None, cycle: Optional[str] = None):
+        keep = _keep(cycle or uuid.uuid4().hex, self.rate_for(agent_name))
+        if not keep:
+            if cycle is None:
+                self._count(agent_name, "sampled_out")
+            return
         span = {
             "ts": datetime.datetime.utcnow().isoformat(),
             "phase": phase,
             "payload": payload,
         }
-        self.mem.write(agent_name, f"trace:{phase}", span)
+        if cycle is not None:
+            span["cycle_id"] = cycle
+        if timing is not None:  # wall / cpu / alloc / size from backend.instrumentation
+            span["timing"] = timing
+        if not _WRITER.submit((self, agent_name, phase, span)):
+            self._count(agent_name, "dropped")
+            log.debug("Trace queue full – dropped %s %s", agent_name, phase)
+
+    def flush(self):
+        """Block until every queued span (of all tracers) is written."""
+        _WRITER.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    # ───────── writer thread ───────────────────────────────────────
+    def _count(self, agent_name: str, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
+        MET_SPANS.labels(agent_name, outcome).inc()
+
+    def _write(self, agent_name: str, phase: str, span: Dict[str, Any]):
+        try:
+            self._write_span(agent_name, phase, span)
+        except Exception as exc:  # noqa: BLE001 – e.g. payload mutated while encoding
+            self._count(agent_name, "dropped")
+            log.warning("Trace %s %s dropped (%s: %s)", agent_name, phase, type(exc).__name__, exc)
+            return
+        self._count(agent_name, "written")
         log.debug("Trace %s %s", agent_name, phase)
 
+    def _write_span(self, agent_name: str, phase: str, span: Dict[str, Any]):
+        payload = span["payload"]
+        timing = span.get("timing")
+        sized = timing is None or "payload_bytes" in timing
+        raw = None
+        if (self.max_payload > 0 or not sized) and payload is not None:
+            raw = encode(payload)
+            if not sized:  # phase output the cycle thread did not encode
+                timing["payload_bytes"] = len(raw)
+                observe_size(agent_name, phase, len(raw))
+            if self.max_payload > 0 and len(raw) > self.max_payload:
+                sha = hashlib.sha256(raw).hexdigest()
+                span["payload"] = {
+                    "truncated": True,
+                    "bytes": len(raw),
+                    "sha256": sha,
+                    "ref": self._store_blob(sha, raw),
+                }
+                raw = None
+                self._count(agent_name, "truncated")
+
+        write_encoded = getattr(self.mem, "write_encoded", None)
+        if write_encoded is None:  # plain memory back end: it serialises itself
+            self.mem.write(agent_name, f"trace:{phase}", span)
+            return
+        if raw is None or isinstance(payload, (bytes, str)) or callable(getattr(payload, "to_bytes", None)):
+            body = encode(span)  # raw (if any) is not the payload's JSON form
+        else:  # splice the payload bytes in instead of encoding it again
+            head = encode({k: v for k, v in span.items() if k != "payload"})
+            body = head[:-1] + b',"payload":' + raw + b"}"
+        write_encoded(agent_name, f"trace:{phase}", body)
+
+    def _store_blob(self, sha: str, raw: bytes) -> Optional[str]:
+        if self.blob_dir is None:
+            return None
+        path = self.blob_dir / f"{sha}.json.gz"
+        if not path.exists():  # content addressed – identical payloads stored once
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with gzip.open(tmp, "wb") as fh:
+                fh.write(raw)
+            os.replace(tmp, path)
+        return f"blob:{path}"
@@ -0,0 +1,45 @@
+import backend.agents as agents
+
+
+def test_latency_histogram_quantiles_within_bucket_width():
+    h = agents.LatencyHistogram()
+    for ms in range(1, 1001):
+        h.add(float(ms))
+    for q, exact in ((0.5, 500), (0.95, 950), (0.99, 990)):
+        assert exact <= h.quantile(q) <= exact * agents.LatencyHistogram._GROWTH
+    assert h.quantile(1.0) == h.max == 1000.0
+
+
+def test_window_summary_reaches_snapshot(monkeypatch):
+    monkeypatch.setattr(agents, "_HEALTH_EMIT", False)
+    win = agents._HealthWindow()
+    for i in range(10):
+        win.count += 1
+        win.errors += i == 0
+        win.hist.add(5.0)
+    agents._close_window({"demo_health": win}, 100.0, 110.0)
+
+    snap = agents.health_snapshot("demo_health")
+    assert snap["count"] == 10 and snap["errors"] == 1
+    assert snap["error_rate"] == 0.1
+    assert snap["window_s"] == 10.0
+    assert 5.0 <= snap["p99_ms"] <= 5.0 * agents.LatencyHistogram._GROWTH
+    assert "demo_health" in agents.health_snapshot()
+
+
+def test_idle_agent_drops_out_of_snapshot(monkeypatch):
+    monkeypatch.setattr(agents, "_HEALTH_EMIT", False)
+    monkeypatch.setattr(agents, "_HEALTH", {})
+    busy, idle = agents._HealthWindow(), agents._HealthWindow()
+    for win in (busy, idle):
+        win.count += 1
+        win.hist.add(1.0)
+    agents._close_window({"busy": busy, "idle": idle}, 0.0, 10.0)
+    assert set(agents.health_snapshot()) == {"busy", "idle"}
+
+    agents._close_window({"busy": busy}, 10.0, 20.0)  # "idle" stopped cycling
+    assert agents.health_snapshot("idle") is None
+    assert set(agents.health_snapshot()) == {"busy"}
+
+    agents._close_window({}, 20.0, 30.0)
+    assert agents.health_snapshot() == {}
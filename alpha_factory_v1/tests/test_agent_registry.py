@@ -0,0 +1,70 @@
+import importlib.util
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+def test_scan_source_reads_literals_without_import(tmp_path):
+    from backend.agents import _scan_source
+
+    src = tmp_path / "demo_agent.py"
+    src.write_text(textwrap.dedent('''
+        import does_not_exist_anywhere  # would fail if imported
+        from backend.agent_base import AgentBase
+
+        class DemoAgent(AgentBase):
+            NAME = "demo"
+            CAPABILITIES = ["a", "b"]
+            COMPLIANCE_TAGS = ["x"]
+            CYCLE_SECONDS = object()  # non-literal attrs are ignored
+
+        register_agent(AgentMetadata(name=DemoAgent.NAME, cls=DemoAgent, version="1.2.3"))
+    '''))
+    assert _scan_source(src) == {
+        "name": "demo",
+        "capabilities": ["a", "b"],
+        "compliance_tags": ["x"],
+        "version": "1.2.3",
+        "requires": ["backend", "does_not_exist_anywhere"],
+    }
+
+
+def test_registry_does_not_import_agent_modules(tmp_path):
+    code = textwrap.dedent('''
+        import sys
+        import backend.agents as agents
+        names = agents.list_agents()
+        assert "finance" in names and "energy_markets" in names
+        assert agents.capability_agents("trade_execution") == ["finance"]
+        assert not [m for m in sys.modules if m.endswith("_agent") and m.startswith("backend.agents.")]
+        cls = agents.AGENT_REGISTRY["energy_markets"].load()
+        assert cls.__name__ == "EnergyAgent"
+        assert agents.import_report()[0]["module"] == "backend.agents.energy_agent"
+    ''')
+    env = {"XDG_CACHE_HOME": str(tmp_path), "PATH": ""}
+    for _ in range(2):  # cold, then served from the manifest cache
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+    assert (tmp_path / "alpha_factory" / "agent_manifest.json").exists()
+
+
+@pytest.mark.skipif(importlib.util.find_spec("networkx") is not None, reason="networkx installed")
+def test_agent_with_missing_hard_import_is_not_listed():
+    import backend.agents as agents
+
+    assert "supply_chain" not in agents.list_agents()
+
+
+def test_failed_lazy_import_demotes_agent_to_capability_less_stub(monkeypatch):
+    import backend.agents as agents
+
+    meta = agents.AgentMetadata(name="broken_probe", capabilities=["probe_cap"],
+                                module="backend.agents.no_such_agent")
+    monkeypatch.setitem(agents.AGENT_REGISTRY, "broken_probe", meta)
+    monkeypatch.setitem(agents.CAPABILITY_GRAPH, "probe_cap", ["broken_probe"])
+    with pytest.raises(ImportError):
+        agents.get_agent("broken_probe")
+    assert agents.capability_agents("probe_cap") == []
+    assert agents.AGENT_REGISTRY["broken_probe"].version.endswith("+stub")
+    assert isinstance(agents.get_agent("broken_probe"), agents.StubAgent)
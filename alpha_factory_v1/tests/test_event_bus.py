@@ -0,0 +1,36 @@
+import json
+import time
+
+from backend.event_bus import EventBus
+
+
+def test_batches_into_local_ring_without_kafka():
+    bus = EventBus(None, linger_ms=20, max_batch=3)
+    for i in range(7):
+        bus.publish("t.a", {"i": i})
+    bus.publish("t.b", "raw")
+    bus.flush()
+    recs = bus.read("t.a")
+    assert [json.loads(r.value)["i"] for r in recs] == list(range(7))
+    assert [r.value for r in bus.read("t.b")] == [b"raw"]
+    assert bus.read(after=recs[-1].seq, topic="t.a") == []
+    bus.close()
+
+
+def test_linger_dispatches_partial_batch():
+    bus = EventBus(None, linger_ms=10, max_batch=100)
+    bus.publish("t", {"x": 1})
+    time.sleep(0.1)
+    assert len(bus.read("t")) == 1
+    bus.close()
+
+
+def test_overflow_drops_oldest():
+    bus = EventBus(None, linger_ms=1000, max_batch=2, max_pending=2)
+    bus.max_batch = 10  # no size-triggered dispatch; only linger / flush
+    for i in range(5):
+        bus.publish("t", {"i": i})
+    assert bus.dropped == 3
+    bus.flush()
+    assert [json.loads(r.value)["i"] for r in bus.read("t")] == [3, 4]
+    bus.close()
@@ -0,0 +1,80 @@
+import backend.instrumentation as instrumentation
+import backend.tracer as tracer_mod
+from backend.agent_base import AgentBase
+from backend.instrumentation import payload_size, phase
+from backend.mcp import wrap_mcp
+
+
+class _Mem:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, agent, kind, data):
+        self.rows.append((agent, kind, data))
+
+
+class _Gov:
+    def vet_plans(self, _agent, ideas):
+        return ideas[:1]
+
+
+class _Demo(AgentBase):
+    def observe(self):
+        return [{"x": i} for i in range(100)]
+
+    def think(self, obs):
+        return [{"idea": sum(o["x"] for o in obs)}, {"idea": 0}]
+
+    def act(self, tasks):
+        pass
+
+
+def test_agent_base_phases_carry_timing():
+    mem = _Mem()
+    agent = _Demo("demo", None, mem, _Gov())
+    agent.run_cycle()
+    agent.tracer.flush()  # spans are written by the background writer
+
+    spans = {kind: data for _, kind, data in mem.rows}
+    assert set(spans) == {"trace:observe", "trace:think", "trace:vet", "trace:act"}
+    obs = spans["trace:observe"]["timing"]
+    assert obs["wall_ms"] >= 0 and obs["cpu_ms"] >= 0 and obs["ok"]
+    assert obs["payload_bytes"] == payload_size([{"x": i} for i in range(100)]) > 500
+    assert spans["trace:act"]["timing"]["payload_bytes"] is None  # act has no output
+
+
+def test_sampled_out_cycles_never_encode_phase_outputs(monkeypatch):
+    calls = []
+
+    def counting(obj):
+        calls.append(obj)
+        return b"{}"
+
+    monkeypatch.setattr(instrumentation, "encode", counting)
+    monkeypatch.setattr(tracer_mod, "encode", counting)
+    mem = _Mem()
+    agent = _Demo("demo", None, mem, _Gov())
+    agent.tracer.sample_rate = 0.0
+    agent.run_cycle()
+    agent.tracer.flush()
+    assert calls == [] and mem.rows == []
+
+    with phase("demo", "observe") as ph:
+        ph.out([1, 2, 3])
+    assert "payload_bytes" not in ph.timing  # left to the tracer writer
+
+
+def test_payload_size_uses_preencoded_bytes():
+    env = wrap_mcp("demo", {"a": 1})
+    assert payload_size(env) == len(env.to_bytes())
+    assert payload_size("é") == 2 and payload_size(None) == 0
+
+
+def test_phase_marks_failures():
+    ph = phase("demo", "boom")
+    try:
+        with ph:
+            raise ValueError
+    except ValueError:
+        pass
+    assert ph.timing["ok"] is False
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import backend
+
+
+def test_log_pages_walk_backwards_and_forwards_by_cursor(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "LOG_DIR", tmp_path)
+    (tmp_path / "a.log").write_bytes(b"".join(b"line %d\n" % i for i in range(1000)) + b"partial")
+
+    lines, hdr = backend._log_page(limit=3)
+    assert lines == ["line 997", "line 998", "line 999"]
+    older, hdr2 = backend._log_page(limit=2, before=hdr["X-Log-Cursor"])
+    assert older == ["line 995", "line 996"]
+    newer, _ = backend._log_page(limit=2, after=hdr2["X-Log-End"])
+    assert newer == ["line 997", "line 998"]
+    tail, hdr3 = backend._log_page(limit=5, after=hdr["X-Log-End"])
+    assert tail == [] and hdr3["X-Log-End"] == hdr["X-Log-End"]  # "partial" is not a line yet
+    assert backend._log_page(limit=3, before="../a.log:10")[0] == lines  # bad cursors fall back to the tail
+    assert backend._log_page(limit=2, after="../a.log:10", before=hdr["X-Log-Cursor"])[0] == older
+    assert backend._read_logs(2) == ["line 998", "line 999"]
+
+
+def test_stream_follows_appends_and_rotation(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(backend, "LOG_POLL_SEC", 0.01)
+    old = tmp_path / "a.log"
+    old.write_bytes(b"before\n")
+
+    async def _go():
+        events = backend._follow_logs()
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0.05)
+        with old.open("ab") as fh:
+            fh.write(b"one\ntw")
+        got = [await first]
+        with old.open("ab") as fh:
+            fh.write(b"o\n")
+        got.append(await events.__anext__())
+        (tmp_path / "b.log").write_bytes(b"three\n")
+        got.append(await events.__anext__())
+        await events.aclose()
+        return got
+
+    got = asyncio.run(_go())
+    assert got == [b"id: a.log:11\ndata: one\n\n", b"id: a.log:15\ndata: two\n\n", b"id: b.log:6\ndata: three\n\n"]
+    resumed = backend._log_page(after=got[0].split(b"\n")[0][4:].decode())[0]
+    assert resumed == ["two"]
+
+
+def test_fallback_stream_closes_cleanly_on_disconnect(tmp_path, monkeypatch):
+    if not hasattr(backend, "_stream"):
+        pytest.skip("FastAPI installed: Starlette owns the stream")
+    monkeypatch.setattr(backend, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(backend, "LOG_POLL_SEC", 0.01)
+    log = tmp_path / "a.log"
+    log.write_bytes(b"")
+    handles = []
+
+    def _open(*a, **kw):
+        handles.append(open(*a, **kw))
+        return handles[-1]
+
+    monkeypatch.setattr(backend, "open", _open, raising=False)
+
+    async def _go():
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(msg):
+            sent.append(msg)
+            if msg.get("body", b"").startswith(b"id:"):
+                disconnect.set()  # client goes away after the first event
+
+        scope = {"type": "http", "path": "/api/logs/stream", "query_string": b"", "headers": []}
+        app = asyncio.create_task(backend.app(scope, receive, send))
+        await asyncio.sleep(0.05)
+        log.write_bytes(b"hello\n")
+        await asyncio.wait_for(app, 2)  # no "generator already running" error
+        return sent
+
+    sent = asyncio.run(_go())
+    assert sent[1]["body"] == b"id: a.log:6\ndata: hello\n\n"
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    assert handles and all(fh.closed for fh in handles)
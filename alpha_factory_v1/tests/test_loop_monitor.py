@@ -0,0 +1,50 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+
+from backend.loop_monitor import LoopMonitor, sample_profile, start_admin_server
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+def test_watchdog_reports_blocking_callback_with_stack():
+    async def main():
+        mon = LoopMonitor(interval=0.02, block_threshold=0.1)
+        mon.start()
+        await asyncio.sleep(0.05)
+        _blocking_call()  # stalls the loop
+        await asyncio.sleep(0.1)
+        mon.stop()
+        return mon
+
+    mon = asyncio.run(main())
+    assert mon.max_lag_ms >= 200
+    assert len(mon.incidents) == 1
+    assert "_blocking_call" in mon.incidents[0]["stack"]
+
+
+def test_profile_endpoint_returns_collapsed_stacks():
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            sum(range(1000))
+
+    threading.Thread(target=spin, name="spinner", daemon=True).start()
+    server = start_admin_server(0, LoopMonitor(), addr="127.0.0.1")
+    port = server.server_address[1]
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/debug/profile?seconds=0.2&hz=200").read().decode()
+        assert any(line.startswith("spinner;") and "spin (" in line for line in body.splitlines())
+        loop = json.loads(urllib.request.urlopen(f"http://127.0.0.1:{port}/debug/loop").read())
+        assert loop["incidents"] == []
+    finally:
+        stop.set()
+        server.shutdown()
+
+    lines = sample_profile(0.05, hz=100)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import pickle
+
+from backend.mcp import MCP_VERSION, MCPEnvelope, digest, wrap_mcp
+
+
+def test_bytes_match_dict_and_digest():
+    payload = {"b": [1, 2.5], "a": {"z": None, "y": "ü"}}
+    env = wrap_mcp("finance", payload)
+
+    decoded = json.loads(env.to_bytes())
+    assert decoded == env.as_dict()
+    assert list(decoded) == ["mcp_version", "agent", "ts", "digest", "payload"]
+    assert decoded["mcp_version"] == MCP_VERSION
+
+    canonical = json.dumps(payload, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    assert env.digest == hashlib.sha256(canonical.encode()).hexdigest() == digest(payload)
+    assert env.to_bytes() is env.to_bytes()  # serialised once, then cached
+
+
+def test_pickle_keeps_serialisation():
+    env = wrap_mcp("energy", {"x": 1})
+    clone = pickle.loads(pickle.dumps(env))
+    assert clone.to_bytes() == env.to_bytes()
+    assert clone["payload"] == {"x": 1}
+
+
+def _fallback_mcp(monkeypatch):
+    """A private copy of backend.mcp loaded as if orjson were missing."""
+    import importlib.util
+    import sys
+
+    import backend.mcp
+
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    spec = importlib.util.spec_from_file_location("_mcp_fallback", backend.mcp.__file__)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def test_fallback_encoder_matches_orjson_for_non_ascii(monkeypatch):
+    payload = {"ville": "Zürich", "note": "α‑β ✓", 2: float("nan"), "inf": [float("inf"), 1.5]}
+    fallback = _fallback_mcp(monkeypatch)
+
+    raw = fallback._canonical(payload)
+    assert "Zürich".encode() in raw and b"\\u" not in raw
+    assert json.loads(raw) == {"2": None, "inf": [None, 1.5], "note": "α‑β ✓", "ville": "Zürich"}
+
+    try:
+        import orjson
+    except ModuleNotFoundError:
+        return
+    assert raw == orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    env, fb = MCPEnvelope("retail", payload, ts="t"), fallback.MCPEnvelope("retail", payload, ts="t")
+    assert fb.digest == env.digest == digest(payload)
+    assert fb.to_bytes() == env.to_bytes()
@@ -0,0 +1,131 @@
+import json
+import threading
+from datetime import datetime, timezone
+
+from backend.memory import Memory
+from backend.tail import tail_lines
+
+
+def test_read_returns_newest_records_across_rotated_segments(tmp_path):
+    mem = Memory(tmp_path, fsync="none", segment_bytes=2_000, compress=True)
+    for i in range(200):
+        mem.write("a", "k", {"i": i})
+        if i % 10 == 9:
+            mem.flush()  # one group commit per 10 records
+    assert mem.segments() and all(p.suffix == ".gz" for p in mem.segments())
+
+    recs = mem.read(limit=150)
+    assert [r["data"]["i"] for r in recs] == list(range(50, 200))
+    mem.close()
+
+
+def test_read_is_consistent_while_segments_rotate(tmp_path):
+    mem = Memory(tmp_path, fsync="none", segment_bytes=600, compress=True)
+    done, errors = threading.Event(), []
+
+    def writer():
+        for i in range(400):
+            mem.write("a", "k", {"i": i})
+            mem.flush()
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            try:
+                seen = [r["data"]["i"] for r in mem.read(limit=30)]
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+                return
+            if seen and seen != list(range(seen[0], seen[0] + len(seen))):
+                errors.append(seen)  # duplicated or missing records
+                return
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    mem.close()
+
+
+def test_two_writers_on_one_directory_index_their_own_records(tmp_path):
+    a = Memory(tmp_path, fsync="none", segment_bytes=400)
+    b = Memory(tmp_path, fsync="none", segment_bytes=400)
+    for i in range(30):  # interleaved commits; a and b both rotate the shared file
+        (a if i % 3 else b).write("a" if i % 3 else "b", "k", {"i": i})
+        (a if i % 3 else b).flush()
+    assert len(a.segments()) > 2
+
+    assert [r["data"]["i"] for r in a.query(limit=100)] == list(range(30))
+    assert [r["data"]["i"] for r in b.query(agent="b", limit=100)] == list(range(0, 30, 3))
+    assert {r["agent"] for r in a.query(agent="a", limit=100)} == {"a"}
+    assert [r["data"]["i"] for r in b.read(limit=30)] == list(range(30))
+    a.close()
+    b.close()
+
+
+def test_records_other_writers_left_unindexed_are_queried(tmp_path):
+    a = Memory(tmp_path, fsync="none")
+    b = Memory(tmp_path, fsync="none")
+    a.write("a", "k", 1)
+    a.flush()
+    assert [r["data"] for r in b.query()] == [1]
+    stray = {"ts": "2024-01-01T00:00:00Z", "agent": "x", "kind": "k", "data": 2}
+    with (tmp_path / "events.jsonl").open("a") as fh:  # e.g. a writer that crashed before indexing
+        fh.write(json.dumps(stray) + "\n")
+    assert b.query(agent="x") == [stray]
+    b.write("b", "k", 3)
+    b.flush()
+    assert [r["data"] for r in a.query()] == [1, 2, 3]
+    a.close()
+    b.close()
+
+
+def test_always_policy_is_durable_on_return(tmp_path):
+    mem = Memory(tmp_path, fsync="always")
+
+    def writer(n):
+        for i in range(50):
+            mem.write(f"w{n}", "k", i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tail_lines(mem.file, 1000)) == 200  # on disk without a flush
+    mem.close()
+
+
+def test_tail_lines_skips_unterminated_last_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b"".join(b"%d\n" % i for i in range(10_000)) + b"partial")
+    assert tail_lines(path, 3, block=7) == [b"9997", b"9998", b"9999"]
+
+
+def test_query_uses_index_across_segments(tmp_path):
+    mem = Memory(tmp_path, fsync="none", segment_bytes=1_500, compress=True)
+    for i in range(120):
+        mem.write(f"agent{i % 3}", "trace:observe" if i % 2 else "blocked", {"i": i})
+        if i % 10 == 9:
+            mem.flush()
+    assert len(mem.segments()) > 2
+
+    hits = mem.query(agent="agent1", kind="blocked", limit=100)  # spans gz segments
+    assert [r["data"]["i"] for r in hits] == list(range(4, 120, 6))
+    assert [r["data"]["i"] for r in mem.query(agent="agent1", kind="blocked", limit=2)] == [112, 118]
+    assert all(r["kind"] == "trace:observe" for r in mem.query(kind="trace:*", limit=10))
+    assert mem.query(since="2999-01-01T00:00:00Z") == []
+    assert len(mem.query(until=datetime.now(timezone.utc), limit=1000)) == 120
+    mem.close()
+
+
+def test_unindexed_records_are_indexed_on_open(tmp_path):
+    legacy = {"ts": "2024-01-01T00:00:00Z", "agent": "old", "kind": "blocked", "data": 1}
+    (tmp_path / "events.jsonl").write_text(json.dumps(legacy) + "\n")
+    mem = Memory(tmp_path, fsync="none")
+    mem.write("new", "blocked", 2)
+    assert [r["agent"] for r in mem.query(kind="blocked")] == ["old", "new"]
+    assert mem.query(until="2024-06-01") == [legacy]
+    mem.close()
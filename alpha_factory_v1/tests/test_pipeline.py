@@ -0,0 +1,118 @@
+import threading
+import time
+
+from backend.agent_base import AgentBase
+from backend.pipeline import StagePipeline
+
+
+class _Mem:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, agent, kind, data):
+        self.rows.append((agent, kind, data))
+
+
+class _Gov:
+    def vet_plans(self, _agent, ideas):
+        return ideas
+
+
+class _IOBound(AgentBase):
+    PIPELINED = True
+
+    def __init__(self, *a):
+        super().__init__(*a)
+        self.n = 0
+        self.acted = []
+
+    def observe(self):
+        time.sleep(0.03)
+        self.n += 1
+        return self.n
+
+    def think(self, obs):
+        if obs == 3:
+            raise ValueError("bad observation")
+        return [obs]
+
+    def act(self, tasks):
+        time.sleep(0.03)
+        self.acted.extend(tasks)
+
+
+def test_pipelined_cycles_overlap_and_keep_order():
+    agent = _IOBound("io", None, _Mem(), _Gov())
+    t0 = time.perf_counter()
+    for _ in range(6):
+        agent.run_cycle()
+    assert agent.drain(timeout=5)
+    elapsed = time.perf_counter() - t0
+
+    assert agent.acted == [1, 2, 4, 5, 6]  # order kept, failed cycle dropped
+    assert elapsed < 6 * 0.06 * 0.8  # observe overlapped act
+    assert [k for _, k, d in agent.memory.rows if k == "error" and d["stage"] == "think"] == ["error"]
+    stats = agent.pipeline_stats()
+    assert stats["stages"]["observe"]["items"] == 6 and stats["stages"]["act"]["items"] == 5
+    assert stats["bottleneck"] in ("observe", "act")
+
+
+def test_stage_pipeline_applies_backpressure():
+    gate = threading.Event()
+    pipe = StagePipeline("bp", [("slow", lambda x: gate.wait() and x)], depth=1).start()
+    assert pipe.submit(1) < 0.05  # taken by the stage thread
+    time.sleep(0.02)
+    assert pipe.submit(2) < 0.05  # fills the queue
+    done = []
+    t = threading.Thread(target=lambda: done.append(pipe.submit(3)))
+    t.start()
+    time.sleep(0.1)
+    assert not done  # blocked: queue full
+    gate.set()
+    t.join(2)
+    assert done and pipe.drain(timeout=2)
+    pipe.close(timeout=1)
+
+
+def test_pipelined_outcomes_reach_health_and_close_stops_stages(monkeypatch):
+    import backend.agents as agents
+
+    class _Probe(_IOBound):
+        def __init__(self):
+            super().__init__("pipe_probe", None, _Mem(), _Gov())
+
+    seen = []
+    monkeypatch.setattr(agents, "record_cycle", lambda name, _ms, ok: seen.append((name, ok)))
+    monkeypatch.setitem(agents.AGENT_REGISTRY, "pipe_probe", agents.AgentMetadata(name="pipe_probe", cls=_Probe))
+    agent = agents.get_agent("pipe_probe")
+    for _ in range(4):
+        agent.run_cycle()  # returns after observe
+    threads = list(agent._pipeline._threads)
+    agent.close(timeout=5)
+
+    assert agent.acted == [1, 2, 4]  # in-flight cycles finished before stopping
+    assert not any(t.is_alive() for t in threads) and agent._pipeline is None
+    # one report per cycle, from the stages (not the observe-only wrapper);
+    # the think failure of cycle 3 counts against the agent
+    assert sorted(seen) == [("pipe_probe", False)] + [("pipe_probe", True)] * 3
+
+
+def test_concurrent_first_cycles_start_one_pipeline(monkeypatch):
+    agent = _IOBound("io", None, _Mem(), _Gov())
+    started = []
+    start = agent._start_pipeline
+
+    def _slow_start():
+        time.sleep(0.05)  # widen the check-then-set window
+        started.append(1)
+        return start()
+
+    monkeypatch.setattr(agent, "_start_pipeline", _slow_start)
+    threads = [threading.Thread(target=agent.run_cycle) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    agent.close(timeout=5)
+    assert started == [1]
+    assert sorted(agent.acted) == [1, 2, 4]
@@ -0,0 +1,197 @@
+import json
+
+import pytest
+
+from backend.portfolio import Portfolio
+
+
+def test_snapshot_compaction_keeps_positions_and_history(tmp_path):
+    db = tmp_path / "portfolio.jsonl"
+    pf = Portfolio(db, snapshot_every=10)
+    for i in range(25):
+        pf.record_fill("AAPL" if i % 2 else "MSFT", 1 + i, 100.0, "BUY" if i % 3 else "SELL")
+    expected = {s: pf.position(s) for s in ("AAPL", "MSFT")}
+
+    assert [p.name for p in pf.archives()] == ["portfolio-000000000010.jsonl.gz", "portfolio-000000000020.jsonl.gz"]
+    assert len(db.read_text().splitlines()) == 5  # only the tail after the last snapshot
+
+    again = Portfolio(db, snapshot_every=10)
+    assert {s: again.position(s) for s in expected} == expected
+    assert [f["seq"] for f in again.history()] == list(range(1, 26))
+
+
+def test_crash_between_snapshot_and_archive_is_deduplicated(tmp_path):
+    db = tmp_path / "portfolio.jsonl"
+    legacy = [{"ts": 0, "symbol": "X", "qty": 2.0, "price": 1.0, "side": "BUY"}] * 3  # pre-sequence format
+    db.write_text("".join(json.dumps(f) + "\n" for f in legacy) + '{"ts": 1, "sym')  # torn last write
+    pf = Portfolio(db, snapshot_every=0)
+    assert pf.position("X") == 6.0
+
+    log = db.read_bytes()
+    pf.compact()
+    db.write_bytes(log)  # as if the process died before moving the log away
+    pf.record_fill("X", 1, 1.0, "SELL")
+
+    again = Portfolio(db, snapshot_every=0)
+    assert again.position("X") == 5.0
+
+
+@pytest.fixture(params=["numpy", "python"])
+def book_backend(request, monkeypatch):
+    import backend.position_book as pb
+
+    if request.param == "numpy" and pb.np is None:
+        pytest.skip("numpy not installed")
+    if request.param == "python":
+        monkeypatch.setattr(pb, "np", None)
+    return pb.PositionBook
+
+
+def test_position_book_average_cost_accounting(book_backend):
+    book = book_backend(capacity=1)  # forces slot growth
+    book.apply("A", 10, 100.0)
+    book.apply("A", 10, 110.0)  # avg 105
+    assert book.apply("A", -15, 120.0) == pytest.approx(15 * 15)
+    book.apply("A", -10, 90.0)  # closes 5 long (-75), opens 5 short @ 90
+    assert book.position("A") == -5
+    assert book.realised_pnl("A") == pytest.approx(225 - 75)
+    assert book.unrealised_pnl("A", 80.0) == pytest.approx(50.0)
+
+    book.apply("B", 4, 50.0)
+    assert book.value({"A": 80.0, "B": 55.0}) == pytest.approx(-400 + 220)
+    assert book.unrealised({"A": 80.0}) == {"A": pytest.approx(50.0), "B": pytest.approx(20.0)}  # B at its mark
+    assert book.gross_leverage() == pytest.approx(620 / 180)
+    assert book.weights([80.0, 55.0]) == {"A": pytest.approx(-400 / -180), "B": pytest.approx(220 / -180)}
+
+    restored = book_backend.from_state(book.state())
+    assert restored.positions() == book.positions() and restored.realised_pnl() == book.realised_pnl()
+
+
+def test_portfolio_snapshot_keeps_cost_basis(tmp_path, book_backend):
+    db = tmp_path / "portfolio.jsonl"
+    pf = Portfolio(db, snapshot_every=2)
+    for qty, px, side in [(10, 100.0, "BUY"), (4, 120.0, "SELL"), (2, 130.0, "BUY")]:
+        pf.record_fill("A", qty, px, side)
+    again = Portfolio(db, snapshot_every=2)
+    assert again.position("A") == 8
+    assert again.realised_pnl() == pytest.approx(80.0)
+    assert again.unrealised_pnl("A", 110.0) == pytest.approx(pf.unrealised_pnl("A", 110.0))
+    assert again.value() == pytest.approx(8 * 130.0)  # marked at the last fill price
+
+
+def test_record_fills_is_one_write_and_one_trace_event(tmp_path, monkeypatch):
+    from backend.trace_ws import hub
+
+    db = tmp_path / "portfolio.jsonl"
+    pf = Portfolio(db, snapshot_every=0, fsync=True)
+    syncs = []
+    monkeypatch.setattr("backend.portfolio.os.fsync", syncs.append)
+    before = hub.stats()["seq"]
+
+    orders = [(f"S{i % 50}", 1 + i % 7, 10.0 + i, "BUY" if i % 3 else "sell") for i in range(500)]
+    fills = pf.record_fills(orders[:250] + [dict(zip(("symbol", "qty", "price", "side"), o)) for o in orders[250:]])
+
+    assert [f["seq"] for f in fills] == list(range(1, 501)) and fills[0]["side"] == "SELL"
+    assert len(syncs) == 1 and hub.stats()["seq"] == before + 1
+    assert len(db.read_text().splitlines()) == 500
+    pf.record_fill("S0", 1, 1.0, "BUY")  # single fills go through the batch path
+    assert Portfolio(db).positions() == pf.positions()
+
+
+def test_fill_events_name_their_agent_for_trace_filters(tmp_path):
+    from backend.trace_ws import TraceFilter, hub
+
+    Portfolio(tmp_path / "portfolio.jsonl", snapshot_every=0).record_fill("S0", 1, 1.0, "BUY")
+    entry = hub._ring[(hub.stats()["seq"] - 1) % hub.capacity]
+    assert TraceFilter.from_json({"agents": ["finance"]}).match(entry)
+    assert not TraceFilter.from_json({"agents": ["energy"]}).match(entry)
+    assert json.loads(entry[3])["agent"] == "finance"
+
+
+class _FlakyBroker:
+    def __init__(self, fail_at):
+        self.fail_at, self.sent = fail_at, []
+
+    async def submit_order(self, sym, qty, side):
+        if len(self.sent) == self.fail_at:
+            raise ConnectionError("broker down")
+        self.sent.append(sym)
+
+
+def test_rebalance_books_orders_sent_before_a_broker_failure(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+
+    try:
+        from backend.agents.finance_agent import FinanceAgent
+    except ImportError as exc:  # market-data stack half installed (aiohttp without MarketDataService)
+        pytest.skip(str(exc))
+
+    orders = [{"sym": f"S{i}", "qty": 1.0, "side": "BUY", "est_fill_px": 10.0} for i in range(5)]
+    broker = _FlakyBroker(fail_at=3)
+
+    async def last_prices(_universe):
+        return {}
+
+    agent = SimpleNamespace(
+        NAME="finance",
+        cfg=SimpleNamespace(universe=[]),
+        market=SimpleNamespace(broker=broker, last_prices=last_prices),
+        portfolio=Portfolio(tmp_path / "portfolio.jsonl", snapshot_every=0),
+        factor_model=SimpleNamespace(top_buckets=dict),
+        planner=SimpleNamespace(rollout=lambda *_a: orders),
+    )
+    with pytest.raises(ConnectionError):
+        asyncio.run(FinanceAgent._rebalance_async(agent, execute=True))
+    assert broker.sent == ["S0", "S1", "S2"]
+    assert agent.portfolio.positions() == {"S0": 1.0, "S1": 1.0, "S2": 1.0}
+
+
+def test_execute_orders_books_orders_sent_before_a_broker_failure(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+
+    try:
+        from backend.finance_agent import FinanceAgent
+    except ImportError as exc:  # optional market-data stack not importable
+        pytest.skip(str(exc))
+
+    async def last_price(_sym):
+        return 10.0
+
+    quotes = []
+
+    async def last_prices(universe):
+        quotes.append(universe)
+        return dict.fromkeys(universe, 10.0)
+
+    pf = Portfolio(tmp_path / "portfolio.jsonl", snapshot_every=0)
+    pf.record_fill("CASH", 100, 10.0, "BUY")  # something to size the targets against
+    agent = SimpleNamespace(
+        universe=["CASH", "S0", "S1", "S2"],
+        market=SimpleNamespace(last_price=last_price, last_prices=last_prices),
+        broker=_FlakyBroker(fail_at=2),
+        portfolio=pf,
+    )
+    with pytest.raises(ConnectionError):
+        asyncio.run(FinanceAgent._execute_orders(agent, {"S0": 0.1, "S1": 0.1, "S2": 0.1}))
+    assert agent.broker.sent == ["S0", "S1"]
+    assert set(pf.positions()) == {"CASH", "S0", "S1"}
+    assert len(quotes) == 1  # the book is valued once per rebalance, not per symbol
+
+
+def test_planner_values_the_portfolio_once_per_rollout(tmp_path):
+    try:
+        from backend.agents.finance_agent import _Planner
+    except ImportError as exc:  # market-data stack half installed (aiohttp without MarketDataService)
+        pytest.skip(str(exc))
+
+    pf = Portfolio(tmp_path / "portfolio.jsonl", snapshot_every=0)
+    pf.record_fill("S0", 100, 10.0, "BUY")
+    calls = []
+    value = pf.value
+    pf.value = lambda prices=None: calls.append(prices) or value(prices)
+
+    prices = {f"S{i}": 10.0 for i in range(50)}
+    orders = _Planner.rollout(None, pf, prices, {s: 0.02 for s in prices})  # no model needed
+    assert len(orders) == 50 and len(calls) == 1
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import pathlib
+
+import pytest
+
+from backend.process_runner import ProcessAgent, WorkerCrashed
+
+
+class ProbeAgent:
+    """Trivial worker agent: publishes one event per cycle, can crash on demand."""
+
+    CYCLE_SECONDS = 1
+
+    def __init__(self):
+        self.cycles = 0
+
+    def run_cycle(self):
+        import backend.orchestrator as orch
+
+        self.cycles += 1
+        crash = pathlib.Path(os.environ["PROBE_DIR"]) / "crash"
+        if crash.exists():
+            crash.unlink()
+            os._exit(3)
+        orch._publish("probe.cycle", {"pid": os.getpid(), "n": self.cycles})
+
+
+@pytest.fixture
+def proxy(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROBE_DIR", str(tmp_path))
+    events = []
+    agent = ProcessAgent("process_probe", ProbeAgent, lambda topic, payload: events.append((topic, payload)))
+    agent.events = events
+    yield agent
+    agent.close()
+
+
+def test_round_trip_forwards_events(proxy):
+    async def _go():
+        await proxy.run_cycle()
+        await proxy.run_cycle()
+
+    asyncio.run(_go())
+    topics = [t for t, _ in proxy.events]
+    assert topics == ["probe.cycle", "probe.cycle"]
+    assert [p["n"] for _, p in proxy.events] == [1, 2]
+    assert proxy.events[0][1]["pid"] != os.getpid()
+    assert proxy.CYCLE_SECONDS == 1  # class attributes are proxied
+
+
+def test_crash_fails_the_cycle_and_respawns(proxy, tmp_path):
+    async def _go():
+        await proxy.run_cycle()
+        first = proxy._proc
+        (tmp_path / "crash").touch()
+        with pytest.raises(WorkerCrashed):
+            await proxy.run_cycle()
+        await asyncio.to_thread(first.join, 5)
+        await proxy.run_cycle()  # new worker, fresh agent
+        return first
+
+    first = asyncio.run(_go())
+    assert proxy.restarts == 1 and proxy._proc is not first
+    assert [p["n"] for _, p in proxy.events] == [1, 1]
+
+
+def test_old_reader_does_not_fail_cycles_of_the_new_worker(proxy):
+    async def _go():
+        await proxy.run_cycle()
+        proxy._proc.kill()
+        await asyncio.to_thread(proxy._proc.join, 5)
+        # respawn while the dead worker's reader may still be draining its pipe
+        await asyncio.gather(*(proxy.run_cycle() for _ in range(3)))
+
+    asyncio.run(_go())
+    assert proxy.restarts == 1
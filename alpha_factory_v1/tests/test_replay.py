@@ -0,0 +1,75 @@
+import socket
+
+import pytest
+
+from backend.agent_base import AgentBase
+from backend.memory import Memory
+from backend.replay import diff, export_traces, load_archive, no_network, replay
+
+
+class _Gov:
+    def vet_plans(self, _agent, ideas):
+        return ideas[:1]
+
+
+class _V1(AgentBase):
+    def observe(self):
+        return [{"x": i} for i in range(10)]
+
+    def think(self, obs):
+        return [{"total": sum(o["x"] for o in obs)}]
+
+    def act(self, tasks):
+        pass
+
+
+class _V2(_V1):
+    def think(self, obs):
+        return [{"total": sum(o["x"] for o in obs) * 2}]
+
+    def act(self, tasks):
+        socket.create_connection(("example.com", 80))  # must not escape the replay
+
+
+def _record(tmp_path, cycles=3):
+    mem = Memory(tmp_path / "mem", fsync="none")
+    agent = _V1("demo", None, mem, _Gov())
+    for _ in range(cycles):
+        agent.run_cycle()
+    agent.tracer.flush()
+    return mem
+
+
+@pytest.mark.parametrize("suffix", [".json.gz", ".npz"])
+def test_archive_roundtrip(tmp_path, suffix):
+    if suffix == ".npz":
+        pytest.importorskip("numpy")
+    mem = _record(tmp_path)
+    cols = load_archive(export_traces(mem, tmp_path / f"traces{suffix}", agent="demo"))
+    assert len(cols["phase"]) == 12 and set(cols["phase"]) == {"observe", "think", "vet", "act"}
+    assert all(w is not None for w in cols["wall_ms"]) and all(cols["ok"])
+    mem.close()
+
+
+def test_replay_reports_diffs_and_blocks_network(tmp_path):
+    mem = _record(tmp_path)
+    cols = load_archive(export_traces(mem, tmp_path / "traces.json.gz"))
+
+    same = replay(_V1("demo", None, mem, _Gov()), cols)
+    assert same["cycles"] == 3 and same["diffs"] == []
+    assert same["phases"]["think"]["calls"] == 3 and same["phases"]["think"]["recorded_p50_ms"] is not None
+
+    report = replay(_V2("demo", None, mem, _Gov()), cols)
+    assert report["phases"]["think"]["changed"] == report["phases"]["vet"]["changed"] == 3
+    assert report["diffs"][0]["changes"] == ["$[0].total: 45 → 90"]
+    assert report["phases"]["act"]["errors"] == 3  # connection refused, not made
+    mem.close()
+
+
+def test_no_network_restores_socket():
+    original = socket.create_connection
+    with no_network():
+        with pytest.raises(ConnectionRefusedError):
+            socket.create_connection(("127.0.0.1", 9))
+    assert socket.create_connection is original
+    assert diff({"a": [1, 2]}, {"a": [1], "b": 0}) == ["$.a: length 2 → 1", "$.b: added"]
@@ -0,0 +1,104 @@
+import json
+import math
+import random
+import statistics
+from array import array
+
+import pytest
+
+from backend.risk_management import RiskLimitError, RiskManager
+
+
+def _reference_var(curve, lookback, confidence):
+    """The former full-recompute formula (numpy.quantile, ddof=1)."""
+    rets = [math.log(b / a) for a, b in zip(curve[-lookback:], curve[-lookback:][1:])]
+    if len(rets) < 10:
+        return 0.05
+    s = sorted(rets)
+    h = (len(s) - 1) * (1 - confidence)
+    lo = math.floor(h)
+    q = s[lo] + (h - lo) * (s[min(lo + 1, len(s) - 1)] - s[lo])
+    return abs(statistics.fmean(rets) - abs(q) * statistics.stdev(rets))
+
+
+def test_incremental_var_and_drawdown_match_full_recompute(tmp_path):
+    rng = random.Random(7)
+    risk = RiskManager(confidence=0.95, lookback_days=60, cache_dir=tmp_path)
+    curve = [1_000_000.0]
+    risk.update_equity_curve(curve[0])
+    for i in range(500):
+        curve.append(curve[-1] * math.exp(rng.gauss(0.0002, 0.01)))
+        risk.update_equity_curve(curve[-1])
+        if i % 37 == 0 or i == 499:
+            assert risk.var_pct() == pytest.approx(_reference_var(curve, 60, 0.95), rel=1e-9, abs=1e-12)
+    peak = max(curve)
+    assert risk.drawdown_pct() == pytest.approx((peak - curve[-1]) / peak)
+    risk.close()
+
+    again = RiskManager(confidence=0.95, lookback_days=60, cache_dir=tmp_path)  # replayed from disk
+    assert len(again) == 501
+    assert (tmp_path / "equity_curve.f64").stat().st_size == 501 * 8
+    assert again.var_pct() == pytest.approx(risk.var_pct())
+    assert again.drawdown_pct() == pytest.approx(risk.drawdown_pct())
+    again.close()
+
+
+def test_legacy_json_cache_is_migrated(tmp_path):
+    (tmp_path / "equity_curve.json").write_text(json.dumps([100.0, 120.0, 90.0]))
+    risk = RiskManager(max_var_pct=1.0, max_drawdown_pct=0.2, cache_dir=tmp_path)
+    assert not (tmp_path / "equity_curve.json").exists()
+    assert len(risk) == 3 and risk.drawdown_pct() == pytest.approx(0.25)
+    with pytest.raises(RiskLimitError, match="Draw"):
+        risk.enforce_limits()
+    risk.close()
+
+
+def test_restart_replays_only_the_lookback_window(tmp_path, monkeypatch):
+    curve = [200.0] + [100.0 + (i % 50) for i in range(5_000)]  # peak far outside the window
+    risk = RiskManager(lookback_days=60, cache_dir=tmp_path)
+    for v in curve:
+        risk.update_equity_curve(v)
+    var, dd = risk.var_pct(), risk.drawdown_pct()
+    risk.close()
+
+    replayed = []
+    observe = RiskManager._observe
+    monkeypatch.setattr(RiskManager, "_observe", lambda self, v: replayed.append(v) or observe(self, v))
+
+    def _restart():
+        replayed.clear()
+        again = RiskManager(lookback_days=60, cache_dir=tmp_path)
+        assert len(again) == len(curve) and len(replayed) == 60
+        assert again.var_pct() == pytest.approx(var) and again.drawdown_pct() == pytest.approx(dd)
+        return again
+
+    _restart().close()  # saved peak covers everything
+    (tmp_path / "equity_peak.bin").unlink()
+    _restart().close()  # no saved peak: older points scanned for their max only
+
+    crashed = _restart()  # saved peak now covers the current points ...
+    for v in [300.0] + [150.0 + i % 7 for i in range(100)]:  # ... a new peak, then no close()
+        crashed.update_equity_curve(v)
+        curve.append(v)
+    crashed._fh.close()
+    var, dd = crashed.var_pct(), crashed.drawdown_pct()
+    assert dd == pytest.approx((300.0 - curve[-1]) / 300.0)
+    _restart().close()  # the uncovered tail outside the window is scanned
+
+
+def test_peak_is_saved_while_running_and_at_exit(tmp_path, monkeypatch):
+    import backend.risk_management as rm
+
+    risk = RiskManager(lookback_days=20, cache_dir=tmp_path)
+    saved = lambda: rm._PEAK.unpack((tmp_path / "equity_peak.bin").read_bytes())  # noqa: E731
+    for v in [500.0] + [100.0] * 44:
+        risk.update_equity_curve(v)
+    assert saved() == (500.0, 40)  # once per lookback, without close()
+
+    scanned = []
+    monkeypatch.setattr(rm, "array", lambda *a: (len(a) == 1 and scanned.append(a)) or array(*a))  # scan buffers
+    rm._close_all()  # what atexit runs
+    assert risk._fh.closed and saved() == (500.0, 45)
+    again = RiskManager(lookback_days=20, cache_dir=tmp_path)
+    assert scanned == [] and again.drawdown_pct() == pytest.approx(0.8)
+    again.close()
@@ -0,0 +1,66 @@
+import random
+import time
+
+import pytest
+
+import backend.agents as agents
+from backend.router import CapabilityRouter
+
+
+@pytest.fixture
+def local_pair(monkeypatch):
+    """Two local agents serving ``probe_cap``."""
+    for name in ("probe_a", "probe_b"):
+        monkeypatch.setitem(agents.AGENT_REGISTRY, name,
+                            agents.AgentMetadata(name=name, capabilities=["probe_cap"]))
+    monkeypatch.setitem(agents.CAPABILITY_GRAPH, "probe_cap", ["probe_a", "probe_b"])
+
+
+def test_least_outstanding_spreads_and_learns_latency():
+    r = CapabilityRouter({"h1:8000": ["cap"], "h2:8000": ["cap"]}, policy="lor", rng=random.Random(0))
+    a = r.route("cap")
+    b = r.route("cap")
+    assert {a.target, b.target} == {"h1:8000", "h2:8000"}  # in-flight count breaks the tie
+    assert a.kind == b.kind == "remote"
+
+    a.done()
+    time.sleep(0.05)
+    b.done()
+    for _ in range(5):
+        with r.route("cap") as h:
+            assert h.target == a.target  # faster host wins while idle
+    assert r.stats()[a.target]["inflight"] == 0
+
+
+def test_remote_hosts_serve_only_advertised_capabilities(monkeypatch):
+    monkeypatch.setenv("ALPHA_REMOTE_HOSTS", "r1:8000=cap_a|cap_b, r2:8000=*, r3:8000")
+    r = CapabilityRouter.from_env()
+    assert r.candidates("cap_a") == [("r1:8000", "remote"), ("r2:8000", "remote")]
+    assert r.candidates("other") == [("r2:8000", "remote")]
+
+    r.advertise("r2:8000", [])
+    with pytest.raises(LookupError):
+        r.route("nonexistent")
+
+
+def _fail_until_down(r, capability, bad):
+    """Fail *bad* until it cools down; the others stay busy meanwhile so it gets picked."""
+    while r.stats().get(bad, {}).get("fails", 0) < r.max_fails:
+        held = []
+        h = r.route(capability)
+        while h.target != bad:
+            held.append(h)
+            h = r.route(capability)
+        h.done(ok=False)
+        for other in held:
+            other.done()
+
+
+def test_failing_targets_cool_down(local_pair):
+    r = CapabilityRouter({"bad:1": ["x"], "good:1": ["x"]}, policy="p2c", max_fails=2, cooldown=60)
+    _fail_until_down(r, "x", "bad:1")
+    assert all(r.route("x").target == "good:1" for _ in range(5))
+
+    # a local agent whose every call fails – e.g. its module does not import
+    _fail_until_down(r, "probe_cap", "probe_a")
+    assert all(r.route("probe_cap").target == "probe_b" for _ in range(5))
@@ -0,0 +1,354 @@
+import asyncio
+import time
+
+import pytest
+
+import backend.agents as agents
+import backend.orchestrator as orch
+from backend.agents import AgentMetadata
+from backend.scheduler import DeadlineGate, OverloadDetector, TimerScheduler
+
+
+class _Runner:
+    def __init__(self, name, period):
+        self.name = name
+        self.period = period
+        self.due = time.time()
+        self.runs = []
+
+    def next_due(self):
+        return self.due
+
+    async def step(self):
+        if time.time() < self.due:
+            return
+        self.runs.append(time.time())
+        self.due = time.time() + self.period
+
+
+def test_runs_due_runners_without_polling():
+    async def _go():
+        sched = TimerScheduler()
+        fast, slow = _Runner("fast", 0.05), _Runner("slow", 10)
+        sched.add(fast)
+        sched.add(slow)
+        stop = asyncio.Event()
+        task = asyncio.create_task(sched.run(stop))
+        await asyncio.sleep(0.28)
+        stop.set()
+        await task
+        return fast, slow
+
+    fast, slow = asyncio.run(_go())
+    assert 4 <= len(fast.runs) <= 7
+    assert len(slow.runs) == 1
+
+
+def test_reschedule_wakes_immediately():
+    async def _go():
+        sched = TimerScheduler()
+        r = _Runner("r", 60)
+        sched.add(r)
+        stop = asyncio.Event()
+        task = asyncio.create_task(sched.run(stop))
+        await asyncio.sleep(0.05)
+        t0 = time.time()
+        r.due = 0
+        sched.reschedule(r)
+        await asyncio.sleep(0.02)
+        stop.set()
+        await task
+        return r, t0
+
+    r, t0 = asyncio.run(_go())
+    assert len(r.runs) == 2
+    assert r.runs[1] - t0 < 0.02
+
+
+def test_deadline_gate_admits_earliest_deadline_first():
+    async def _go():
+        gate = DeadlineGate(1)
+        order = []
+
+        async def job(tag, deadline, priority=0):
+            async with gate.slot(deadline, priority):
+                order.append(tag)
+                await asyncio.sleep(0.01)
+
+        await gate.acquire(0)  # hold the only slot while the others queue
+        tasks = [
+            asyncio.create_task(job("late", 30)),
+            asyncio.create_task(job("low", 10, 1)),
+            asyncio.create_task(job("high", 10, 9)),
+            asyncio.create_task(job("early", 5)),
+        ]
+        await asyncio.sleep(0)
+        assert len(gate) == 4
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order, len(gate)
+
+    order, waiting = asyncio.run(_go())
+    assert order == ["early", "high", "low", "late"]
+    assert waiting == 0
+
+
+def test_overload_detector_levels_and_reason():
+    lag = [0.0]
+    det = OverloadDetector(lambda: lag[0], lambda: 3, max_lag_ms=100, max_queue=10, max_load=0, interval=0)
+    assert det.level() == (0, "queue")
+    lag[0] = 150
+    assert det.level() == (1, "lag")
+    lag[0] = 250
+    assert det.level() == (2, "lag")
+
+
+class _CycleAgent:
+    CYCLE_SECONDS = 60
+    DEADLINE_SECONDS = 600
+    PRIORITY = 0
+
+    def __init__(self):
+        self.gate = None  # asyncio.Event holding cycles in flight (None = return at once)
+        self.log = []
+
+    async def run_cycle(self):
+        self.log.append("start")
+        if self.gate is not None:
+            await self.gate.wait()
+        self.log.append("end")
+
+    def close(self):
+        self.log.append("close")
+
+
+class _Cron:
+    """croniter stand‑in yielding fixed slots."""
+
+    def __init__(self, slots):
+        self.slots = list(slots)
+        self.calls = 0
+
+    def get_next(self, _type):
+        self.calls += 1
+        return self.slots.pop(0)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setitem(agents.AGENT_REGISTRY, "sched_probe", AgentMetadata(name="sched_probe", cls=_CycleAgent))
+    return orch.AgentRunner("sched_probe")
+
+
+class _Overload:
+    level_ = (1, "lag")
+
+    def level(self):
+        return self.level_
+
+
+def test_postponed_cron_cycle_keeps_the_next_slot(runner, monkeypatch):
+    overload = _Overload()
+    monkeypatch.setattr(orch, "_OVERLOAD", overload)
+    monkeypatch.setattr(orch, "_SHED_POSTPONE", 5.0)
+    now = time.time()
+    slot1, slot2 = now + 60, now + 120
+    runner.spec = "* * * * *"
+    runner._cron = cron = _Cron([slot1, slot2])
+    runner._due = now - 1
+
+    async def _go():
+        await runner.step()  # overloaded → postponed
+        assert runner._deferred == now - 1 and not runner._inflight
+        assert now < runner._due < now + 6  # retry in _SHED_POSTPONE seconds
+
+        overload.level_ = (0, "")
+        runner._due = time.time() - 0.01  # the retry is due
+        await runner.step()
+        await asyncio.gather(*runner._inflight)
+
+    asyncio.run(_go())
+    assert runner.instance.log == ["start", "end"]
+    assert runner._due == slot1  # the regular slot still runs, not slot2
+    assert cron.calls == 1 and runner._deferred is None
+
+
+def test_postponed_period_cycle_keeps_its_cadence(runner, monkeypatch):
+    overload = _Overload()
+    monkeypatch.setattr(orch, "_OVERLOAD", overload)
+    runner._due = time.time() - 1
+
+    async def _go():
+        await runner.step()
+        regular = runner._resume
+        overload.level_ = (0, "")
+        runner._due = time.time() + 0.05
+        await asyncio.sleep(0.06)
+        await runner.step()
+        await asyncio.gather(*runner._inflight)
+        return regular
+
+    regular = asyncio.run(_go())
+    assert runner._due == regular  # not "retry time + period"
+
+
+class _SkipCounter:
+    def __init__(self):
+        self.counts = {}
+
+    def labels(self, *labels):
+        self._key = labels
+        return self
+
+    def inc(self, *_a):
+        self.counts[self._key] = self.counts.get(self._key, 0) + 1
+
+
+@pytest.fixture
+def busy_runner(runner, monkeypatch):
+    """Runner whose cycles stay in flight until ``runner.instance.gate`` is set."""
+    monkeypatch.setattr(orch, "_OVERLOAD", None)
+    monkeypatch.setattr(orch, "MET_AGENT_SKIP", _SkipCounter())
+    launched = []
+    launch = runner._launch
+
+    def _recording_launch(due):
+        launched.append(due)
+        launch(due)
+
+    monkeypatch.setattr(runner, "_launch", _recording_launch)
+    runner.launched = launched
+    return runner
+
+
+async def _due_at(runner, due):
+    runner._due = due
+    await runner.step()
+    await asyncio.sleep(0)  # let launched cycles start
+
+
+async def _settle(runner):
+    runner.instance.gate.set()
+    while runner._inflight:
+        await asyncio.gather(*list(runner._inflight))
+        await asyncio.sleep(0)  # done callbacks may launch the held cycle
+
+
+@pytest.mark.parametrize("policy", ["skip", "coalesce", "queue"])
+def test_overlap_policies_while_a_cycle_is_in_flight(busy_runner, policy):
+    runner = busy_runner
+    runner.policy = policy
+    now = time.time()
+    d0, d1, d2 = now - 3, now - 2, now - 1
+
+    async def _go():
+        runner.instance.gate = asyncio.Event()
+        await _due_at(runner, d0)  # starts and stays in flight
+        assert len(runner._inflight) == 1
+        await _due_at(runner, d1)
+        await _due_at(runner, d2)
+        assert len(runner._inflight) == 1  # nothing else started while busy
+        held = runner._pending
+        await _settle(runner)
+        return held
+
+    held = asyncio.run(_go())
+    skips = orch.MET_AGENT_SKIP.counts.get(("sched_probe", policy), 0)
+    log = runner.instance.log
+    if policy == "skip":
+        assert skips == 2 and held is None
+        assert runner.launched == [d0] and log == ["start", "end"]
+    elif policy == "coalesce":
+        assert skips == 1 and held == d2  # only the newest due time is kept
+        assert runner.launched == [d0, d2] and log == ["start", "end"] * 2
+        assert runner._due > now  # the catch-up run replaced the next regular slot
+    else:  # queue: one held cycle, run after the in-flight one finished
+        assert skips == 1 and held == d1
+        assert runner.launched == [d0, d1] and log == ["start", "end"] * 2
+    assert runner._pending is None
+
+
+def test_max_concurrency_allows_parallel_cycles(busy_runner):
+    runner = busy_runner
+    runner.policy, runner.max_concurrency = "skip", 2
+    now = time.time()
+
+    async def _go():
+        runner.instance.gate = asyncio.Event()
+        for due in (now - 3, now - 2, now - 1):
+            await _due_at(runner, due)
+        running = len(runner._inflight)
+        await _settle(runner)
+        return running
+
+    assert asyncio.run(_go()) == 2
+    assert runner.launched == [now - 3, now - 2]
+    assert runner.instance.log == ["start", "start", "end", "end"]
+    assert orch.MET_AGENT_SKIP.counts == {("sched_probe", "skip"): 1}
+
+
+class _LosingShards:
+    """Shard coordinator stand-in that hands ``sched_probe`` away once."""
+
+    interval = 0.01
+
+    def __init__(self, runner):
+        self.runner = runner
+        self.lost = {"sched_probe"}
+
+    def rebalance(self):
+        lost, self.lost = self.lost, set()
+        return set(), lost
+
+    def release(self, name):
+        self.runner.instance.log.append(f"release {name}")
+
+
+def test_lost_shard_is_stopped_before_its_lease_is_released(busy_runner):
+    runner = busy_runner
+    runner.policy = "queue"
+    now = time.time()
+
+    async def _go():
+        runner.instance.gate = asyncio.Event()
+        sched, stop = TimerScheduler(), asyncio.Event()
+        sched.add(runner)
+        runners = {"sched_probe": runner}
+        await _due_at(runner, now - 2)
+        await _due_at(runner, now - 1)  # held – dropped, the new owner runs it
+        loop = asyncio.create_task(orch._shard_loop(_LosingShards(runner), runners, sched, stop))
+        await asyncio.sleep(0.05)
+        assert runner.instance.log == ["start"]  # still running: lease kept
+        runner.instance.gate.set()
+        await asyncio.sleep(0.05)
+        stop.set()
+        await loop
+        return runners, sched
+
+    runners, sched = asyncio.run(_go())
+    assert runners == {} and len(sched) == 0
+    assert runner.instance.log == ["start", "end", "close", "release sched_probe"]
+    assert runner.launched == [now - 2]
+
+
+@pytest.mark.parametrize("policy", ["coalesce", "queue"])
+def test_drain_admits_no_held_cycle(busy_runner, policy):
+    runner = busy_runner
+    runner.policy = policy
+    now = time.time()
+
+    async def _go():
+        runner.instance.gate = asyncio.Event()
+        await _due_at(runner, now - 2)
+        await _due_at(runner, now - 1)
+        assert runner._pending is not None
+        drained = asyncio.create_task(runner.drain())
+        await asyncio.sleep(0)
+        await _due_at(runner, now)  # the scheduler may still tick once
+        runner.instance.gate.set()
+        await drained
+        return len(runner._inflight)
+
+    assert asyncio.run(_go()) == 0
+    assert runner.launched == [now - 2]
+    assert runner.instance.log == ["start", "end"]
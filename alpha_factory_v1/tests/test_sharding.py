@@ -0,0 +1,36 @@
+from backend.sharding import HashRing, ShardCoordinator, SQLiteLeaseStore
+
+AGENTS = [f"agent{i}" for i in range(40)]
+
+
+def test_ring_moves_few_keys_when_member_joins():
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+    moved = [k for k in AGENTS if before.owner(k) != after.owner(k)]
+    assert all(after.owner(k) == "d" for k in moved)
+    assert len(moved) < len(AGENTS) / 2
+
+
+def test_replicas_split_and_rebalance(tmp_path):
+    db = str(tmp_path / "shards.db")
+    a = ShardCoordinator(AGENTS, SQLiteLeaseStore(db, ttl=30), "a")
+    a.rebalance()
+    assert a.owned == set(AGENTS)
+
+    b = ShardCoordinator(AGENTS, SQLiteLeaseStore(db, ttl=30), "b")
+    b.rebalance()                 # b wants its half but a still holds the leases
+    assert b.owned == set()
+    _, lost = a.rebalance()       # a sees b and stops renewing b's half …
+    assert lost
+    b.rebalance()
+    assert b.owned == set()       # … but holds the leases until it has stopped them
+    for agent in lost:
+        a.release(agent)
+    b.rebalance()
+    assert a.owned and b.owned
+    assert a.owned | b.owned == set(AGENTS)
+    assert not a.owned & b.owned
+
+    b.leave()                     # clean shutdown → a takes everything back
+    a.rebalance()
+    assert a.owned == set(AGENTS)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+
+from backend.trace_ws import TraceEvent, TraceFilter, TraceHub
+
+
+def test_events_are_coalesced_into_one_shared_frame():
+    async def _go():
+        hub = TraceHub(capacity=64, tick=0.02)
+        a, b = await hub.subscribe(), await hub.subscribe()
+        fa = asyncio.create_task(hub.next_frame(a))
+        await asyncio.sleep(0)
+        for i in range(10):
+            hub.publish({"label": f"e{i}", "meta": {"i": i}})
+        hub.publish(TraceEvent(label="typed"))
+        frame_a = await fa
+        frame_b = await hub.next_frame(b)
+        return frame_a, frame_b, a.cursor
+
+    frame_a, frame_b, cursor = asyncio.run(_go())
+    frame = json.loads(frame_a)
+    assert frame["cursor"] == 11
+    events = frame["events"]
+    assert [e["label"] for e in events] == [f"e{i}" for i in range(10)] + ["typed"]
+    assert events[3]["meta"] == {"i": 3} and events[0]["type"] == "generic"
+    assert frame_a is frame_b  # same cursor range → same frame object
+    assert cursor == 11
+
+
+def test_publish_from_thread_wakes_readers_and_overrun_evicts():
+    async def _go():
+        hub = TraceHub(capacity=4, tick=0.01)
+        fast, slow = await hub.subscribe(), await hub.subscribe()
+        task = asyncio.create_task(hub.next_frame(fast))
+        await asyncio.sleep(0)
+        threading.Thread(target=lambda: [hub.publish({"label": str(i)}) for i in range(3)]).start()
+        frame = await asyncio.wait_for(task, 1)
+        for i in range(3):
+            hub.publish({"label": str(i)})  # slow reader is now 6 behind a ring of 4
+        return frame, await hub.next_frame(slow), slow.evicted, hub.stats()
+
+    frame, slow_frame, reason, stats = asyncio.run(_go())
+    assert json.loads(frame)  # woken across threads
+    assert slow_frame is None and reason == "overrun"
+    assert stats["evicted"] == 1 and stats["subscribers"] == 1
+
+
+def test_filtered_subscription_and_resume_replays_gap():
+    async def _go():
+        hub = TraceHub(capacity=8, tick=0.01)
+        flt = TraceFilter.from_json({"types": ["fill"], "agents": ["finance"]})
+        live = await hub.subscribe(flt)
+        hub.publish({"type": "planner", "label": "solve"})
+        hub.publish(TraceEvent(type="fill", agent="finance", label="BUY 1 AAPL"))
+        hub.publish({"type": "fill", "agent": "other", "label": "SELL"})
+        first = json.loads(await hub.next_frame(live))
+
+        for i in range(3):  # published while the client was away
+            hub.publish({"type": "fill", "agent": "finance", "label": f"gap{i}"})
+        resumed = await hub.subscribe(flt, cursor=first["cursor"], epoch=first["epoch"])
+        gap = json.loads(await hub.next_frame(resumed))
+
+        for i in range(10):
+            hub.publish({"type": "fill", "agent": "finance", "label": f"late{i}"})
+        stale = await hub.subscribe(None, cursor=first["cursor"], epoch=first["epoch"])
+        lossy = json.loads(await hub.next_frame(stale))
+        return first, gap, lossy, await hub.subscribe(cursor=5, epoch="other-epoch")
+
+    first, gap, lossy, restarted = asyncio.run(_go())
+    assert [e["label"] for e in first["events"]] == ["BUY 1 AAPL"]
+    assert [e["label"] for e in gap["events"]] == ["gap0", "gap1", "gap2"]
+    assert lossy["lost"] == 16 - 8 - 3 and len(lossy["events"]) == 8
+    assert restarted.cursor == 8 and restarted.lost == 8  # unknown epoch: replay what is retained
+
+
+def test_unix_transport_fans_out_across_processes(tmp_path):
+    import subprocess
+    import sys
+
+    from backend.trace_ws import UnixSocketTransport
+
+    publisher = (
+        "import sys; from backend.trace_ws import TraceHub, UnixSocketTransport;"
+        "hub = TraceHub(transport=UnixSocketTransport(sys.argv[1]));"
+        "hub.publish({'type': 'fill', 'agent': 'finance', 'label': 'from child'})"
+    )
+
+    async def _go():
+        a = TraceHub(tick=0.01, transport=UnixSocketTransport(tmp_path))
+        b = TraceHub(tick=0.01, transport=UnixSocketTransport(tmp_path))
+        sa, sb = await a.subscribe(), await b.subscribe()
+        a.publish({"label": "from a"})
+        await asyncio.to_thread(subprocess.run, [sys.executable, "-c", publisher, str(tmp_path)], check=True)
+        got = []
+        for hub, sub in ((a, sa), (b, sb)):
+            labels = []
+            while len(labels) < 2:
+                frame = await asyncio.wait_for(hub.next_frame(sub), 5)
+                labels += [e["label"] for e in json.loads(frame)["events"]]
+            got.append(sorted(labels))
+            hub.transport.close()
+        return got
+
+    got_a, got_b = asyncio.run(_go())
+    assert got_a == got_b == ["from a", "from child"]  # own events are not echoed back
+    assert list(tmp_path.iterdir()) == []  # sockets unlinked on close / exit
+
+
+def test_unix_transport_starts_lazily_and_rebinds_after_fork(tmp_path):
+    import os
+
+    from backend.trace_ws import UnixSocketTransport
+
+    hub = TraceHub(tick=0.01, transport=UnixSocketTransport(tmp_path))
+    assert list(tmp_path.iterdir()) == []  # nothing bound at construction (import time)
+
+    async def _go():
+        sub = await hub.subscribe()
+        parent_sock = hub.transport.path
+        pid = os.fork()
+        if pid == 0:  # forked worker, as under gunicorn --preload
+            code = 1
+            try:
+                hub.publish({"label": "from fork"})
+                own = hub.transport.path != parent_sock and os.path.exists(hub.transport.path)
+                code = 0 if own and parent_sock in hub.transport.peers() else 1
+                hub.transport.close()
+            finally:
+                os._exit(code)
+        _, status = await asyncio.to_thread(os.waitpid, pid, 0)
+        frame = await asyncio.wait_for(hub.next_frame(sub), 5)
+        hub.transport.close()
+        return status, [e["label"] for e in json.loads(frame)["events"]]
+
+    status, labels = asyncio.run(_go())
+    assert status == 0
+    assert labels == ["from fork"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,80 @@
+import gzip
+import json
+
+import backend.tracer as tracer_mod
+from backend.memory import Memory
+from backend.tracer import Tracer
+
+
+class _Mem:
+    def __init__(self, dir):
+        self.dir = dir
+        self.rows = []
+
+    def write(self, agent, kind, data):
+        self.rows.append((agent, kind, data))
+
+
+def test_head_sampling_keeps_or_drops_whole_cycles(tmp_path):
+    mem = _Mem(tmp_path)
+    tr = Tracer(mem, sample_rate=1.0, sample_rates={"noisy": 0.3})
+    for _ in range(200):
+        cid = tr.begin_cycle("noisy")
+        for ph in ("observe", "think", "vet", "act"):
+            tr.record("noisy", ph, {"x": 1}, cycle=cid)
+    tr.flush()
+
+    per_cycle = {}
+    for _, _, span in mem.rows:
+        per_cycle[span["cycle_id"]] = per_cycle.get(span["cycle_id"], 0) + 1
+    assert set(per_cycle.values()) == {4}
+    assert 30 <= len(per_cycle) <= 90
+    assert tr.stats()["sampled_out"] == 200 - len(per_cycle)
+
+
+def test_oversize_payload_is_replaced_by_digest_and_blob(tmp_path):
+    mem = _Mem(tmp_path)
+    tr = Tracer(mem, max_payload=1_000)
+    big = [{"resume": "x" * 100, "id": i} for i in range(100)]
+    tr.record("talent", "observe", big)
+    tr.record("talent", "think", {"small": True})
+    tr.flush()
+
+    (_, kind, span), (_, _, small) = mem.rows
+    stub = span["payload"]
+    assert kind == "trace:observe" and stub["truncated"] and stub["bytes"] > 1_000
+    blob = stub["ref"].removeprefix("blob:")
+    assert json.loads(gzip.open(blob).read()) == big
+    assert small["payload"] == {"small": True}
+    assert tr.stats()["truncated"] == 1
+
+
+def test_full_queue_drops_and_counts(monkeypatch, tmp_path):
+    writer = tracer_mod._Writer(1)
+    monkeypatch.setattr(writer, "_thread", object())  # no consumer: queue stays full
+    monkeypatch.setattr(tracer_mod, "_WRITER", writer)
+    tr = Tracer(_Mem(tmp_path))
+    for i in range(3):
+        tr.record("a", "observe", i)
+    assert tr.stats() == {"dropped": 2}
+
+
+def test_spans_reach_memory_encoded_once_and_bad_payloads_are_dropped(monkeypatch, tmp_path):
+    mem = Memory(tmp_path, fsync="none")
+    monkeypatch.setattr(mem, "write", None)  # every span must arrive pre-encoded
+    tr = Tracer(mem, max_payload=0)
+
+    class _Mutating:  # changes size while being encoded
+        def to_bytes(self):
+            raise RuntimeError("dictionary changed size during iteration")
+
+    tr.record("a", "observe", {"n": [1, 2]}, timing={"wall_ms": 1.0})
+    tr.record("a", "think", _Mutating(), timing={"wall_ms": 1.0})
+    tr.record("a", "act", "plain text")
+    tr.flush()
+
+    (obs, act) = [r["data"] for r in mem.query(agent="a")]
+    assert obs["payload"] == {"n": [1, 2]} and obs["timing"]["payload_bytes"] == len(b'{"n":[1,2]}')
+    assert act["payload"] == "plain text"
+    assert tr.stats() == {"written": 2, "dropped": 1}
+    mem.close()
@@ -9,6 +9,7 @@ def index(): return render_template('index.html')
 @app.route('/api/logs')
 def logs():
     limit=int(request.args.get('limit',100))
-    return jsonify(mem.query(limit))
+    a=request.args
+    return jsonify(mem.query(agent=a.get('agent'),kind=a.get('kind'),since=a.get('since'),until=a.get('until'),limit=limit))
 if __name__=='__main__':
     app.run(port=3000,host='0.0.0.0')